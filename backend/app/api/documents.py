@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+import hashlib
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
 
 from ..config import Settings
 from ..dependencies import get_document_service, get_settings
-from ..schemas import DocumentSummary, UploadResponse
-from ..services.documents import DocumentService
+from ..schemas import DocumentDetail, DocumentSummary, ReindexResponse, UploadResponse
+from ..services.documents import DocumentBusyError, DocumentService
 
 router = APIRouter(tags=["documents"])
 
@@ -26,6 +28,95 @@ async def upload_documents(
 
 @router.get("/documents", response_model=list[DocumentSummary])
 def list_documents(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = None,
+    status: str | None = None,
+    file_type: str | None = None,
+    language: str | None = None,
+    service: DocumentService = Depends(get_document_service),
+) -> list[DocumentSummary] | Response:
+    # The catalog version changes with every document write, so it (plus the query) is a
+    # complete validator: polling clients get 304 without the listing query running.
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.items()))
+    query_hash = hashlib.sha1(query.encode()).hexdigest()[:12]
+    etag = f'W/"{service.catalog_version()}-{query_hash}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in _parse_if_none_match(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        documents, next_cursor = service.list_documents(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            file_type=file_type,
+            language=language,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    response.headers.update(headers)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return documents
+
+
+@router.get("/documents/{document_id}", response_model=DocumentDetail)
+def get_document(
+    document_id: str,
+    service: DocumentService = Depends(get_document_service),
+) -> DocumentDetail:
+    document = service.get_document(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Belge bulunamadi.")
+    return document
+
+
+@router.delete("/documents/{document_id}", status_code=204)
+def delete_document(
+    document_id: str,
     service: DocumentService = Depends(get_document_service),
-) -> list[DocumentSummary]:
-    return service.list_documents()
+) -> Response:
+    try:
+        deleted = service.delete_document(document_id)
+    except DocumentBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Belge bulunamadi.")
+    return Response(status_code=204)
+
+
+@router.post("/documents/reindex", response_model=ReindexResponse, status_code=202)
+def reindex_documents(
+    full: bool = False,
+    service: DocumentService = Depends(get_document_service),
+) -> ReindexResponse:
+    queued, skipped = service.reindex_documents(full=full)
+    return ReindexResponse(document_ids=queued, skipped_document_ids=skipped)
+
+
+@router.post("/documents/{document_id}/reindex", response_model=DocumentDetail, status_code=202)
+def reindex_document(
+    document_id: str,
+    full: bool = False,
+    service: DocumentService = Depends(get_document_service),
+) -> DocumentDetail:
+    try:
+        document = service.reindex_document(document_id, full=full)
+    except DocumentBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=410, detail=str(exc)) from exc
+    if document is None:
+        raise HTTPException(status_code=404, detail="Belge bulunamadi.")
+    return document
+
+
+def _parse_if_none_match(header: str | None) -> set[str]:
+    if not header:
+        return set()
+    tags = {tag.strip() for tag in header.split(",")}
+    # Weak comparison: W/"x" and "x" match each other.
+    return tags | {f"W/{tag}" for tag in tags if not tag.startswith("W/")}
@@ -4,8 +4,16 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from ..dependencies import get_db_session, get_settings, get_vector_store
+from ..dependencies import (
+    get_answer_cache,
+    get_db_session,
+    get_embedding_cache,
+    get_settings,
+    get_vector_store,
+)
 from ..schemas import HealthResponse
+from ..services.answer_cache import AnswerCache
+from ..services.embedding_cache import EmbeddingCache
 from ..services.vector_store import VectorStoreProtocol
 
 router = APIRouter(tags=["health"])
@@ -16,6 +24,8 @@ def health(
     session: Session = Depends(get_db_session),
     settings=Depends(get_settings),
     vector_store: VectorStoreProtocol = Depends(get_vector_store),
+    embedding_cache: EmbeddingCache | None = Depends(get_embedding_cache),
+    answer_cache: AnswerCache | None = Depends(get_answer_cache),
 ) -> HealthResponse:
     status = "ok"
     services = {
@@ -33,4 +43,10 @@ def health(
     if services["vector_store"] != "ok":
         status = "degraded"
 
-    return HealthResponse(status=status, services=services)
+    caches: dict[str, dict[str, int]] = {}
+    if embedding_cache is not None:
+        caches["embeddings"] = embedding_cache.stats()
+    if answer_cache is not None:
+        caches["answers"] = answer_cache.stats()
+
+    return HealthResponse(status=status, services=services, caches=caches)
@@ -1,21 +1,90 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
 
-from ..dependencies import get_qa_service
-from ..schemas import AskRequest, AskResponse
-from ..services.qa import QAService
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..config import Settings
+from ..dependencies import get_qa_service, get_settings
+from ..schemas import AskRequest, AskResponse, BatchAskRequest
+from ..services.qa import QAService, QAStreamEvent
 
 router = APIRouter(tags=["questions"])
+logger = logging.getLogger(__name__)
 
 
 @router.post("/questions", response_model=AskResponse)
-def ask_question(
+async def ask_question(
     payload: AskRequest,
     service: QAService = Depends(get_qa_service),
 ) -> AskResponse:
-    return service.ask(
+    return await service.aask(
         question=payload.question,
         document_ids=payload.document_ids,
         top_k=payload.top_k,
     )
+
+
+@router.post("/questions/stream")
+async def ask_question_stream(
+    payload: AskRequest,
+    service: QAService = Depends(get_qa_service),
+) -> StreamingResponse:
+    events = await service.aask_stream(
+        question=payload.question,
+        document_ids=payload.document_ids,
+        top_k=payload.top_k,
+    )
+    return StreamingResponse(
+        _encode_sse(events),
+        media_type="text/event-stream",
+        # Keep reverse proxies (nginx) from buffering the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/questions/batch")
+async def ask_questions_batch(
+    payload: BatchAskRequest,
+    service: QAService = Depends(get_qa_service),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    if len(payload.questions) > settings.qa_batch_max_questions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tek seferde en fazla {settings.qa_batch_max_questions} soru sorulabilir.",
+        )
+    results = await service.aask_batch(
+        questions=payload.questions,
+        document_ids=payload.document_ids,
+        top_k=payload.top_k,
+    )
+    return StreamingResponse(
+        _encode_ndjson(results),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _encode_ndjson(results: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for item in results:
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+    except Exception:
+        logger.exception("QA toplu cevap akisi sirasinda hata")
+        yield json.dumps({"error": "Cevap uretilirken hata olustu."}, ensure_ascii=False) + "\n"
+
+
+async def _encode_sse(events: AsyncIterator[QAStreamEvent]) -> AsyncIterator[str]:
+    try:
+        async for name, data in events:
+            yield f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    except Exception:
+        # Headers are already sent, so report failures in-band instead of as a 5xx.
+        logger.exception("QA stream sirasinda hata")
+        detail = json.dumps({"detail": "Cevap uretilirken hata olustu."}, ensure_ascii=False)
+        yield f"event: error\ndata: {detail}\n\n"
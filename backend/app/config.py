@@ -19,16 +19,61 @@ class Settings:
     gemini_embedding_model: str
     gemini_use_system_proxy: bool
     pdf_min_chars_before_ocr: int
-    chunk_size: int
-    chunk_overlap: int
+    chunk_max_tokens: int
+    chunk_overlap_tokens: int
     retrieval_max_distance: float
     max_files_per_request: int
     max_upload_file_size_bytes: int
+    ingestion_workers: int = 2
+    ingestion_shutdown_timeout_seconds: float = 30.0
+    cpu_workers: int = 2
+    blocking_io_workers: int = 32
+    ocr_max_concurrency: int = 4
+    embed_max_concurrency: int = 4
+    embed_requests_per_minute: int = 0
+    embed_tokens_per_minute: int = 0
+    embed_max_retries: int = 4
+    gemini_timeout_seconds: int = 120
+    ocr_timeout_seconds: int = 0
+    gemini_max_concurrency: int = 16
+    embedding_cache_max_entries: int = 50_000
+    chunk_across_pages: bool = True
+    retrieval_mode: str = "hybrid"
+    vector_exact_search_max_chunks: int = 200
+    embedding_dimensions: int = 0
+    vector_storage_dtype: str = "float32"
+    vector_rescore: bool = True
+    retrieval_context_max_tokens: int = 4000
+    reranker: str = "lexical_mmr"
+    rerank_top_n: int = 0
+    rerank_mmr_lambda: float = 0.7
+    query_embedding_timeout_seconds: float = 5.0
+    answer_cache_max_entries: int = 1000
+    answer_cache_ttl_seconds: int = 3600
+    answer_cache_semantic_max_distance: float = 0.0
+    qa_batch_max_questions: int = 500
+    qa_batch_concurrency: int = 8
+    # Overrides the SQLite file at database_path, e.g. postgresql+psycopg://... for multi-node.
+    external_database_url: str | None = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    sqlite_busy_timeout_ms: int = 5000
 
     @property
     def database_url(self) -> str:
+        if self.external_database_url:
+            return self.external_database_url
         return f"sqlite:///{self.database_path.as_posix()}"
 
+    @property
+    def embedding_cache_path(self) -> Path:
+        return self.data_dir / "embedding_cache.db"
+
+    @property
+    def lexical_index_path(self) -> Path:
+        return self.data_dir / "lexical_index.db"
+
     @property
     def allowed_extensions(self) -> set[str]:
         return {".pdf", ".jpg", ".jpeg", ".png"}
@@ -61,8 +106,22 @@ class Settings:
                 default=False,
             ),
             pdf_min_chars_before_ocr=int(os.getenv("PDF_MIN_CHARS_BEFORE_OCR", "40")),
-            chunk_size=int(os.getenv("CHUNK_SIZE", "900")),
-            chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "180")),
+            # CHUNK_SIZE / CHUNK_OVERLAP are the older character-based settings (~4 chars/token).
+            chunk_max_tokens=max(
+                16,
+                _read_int(
+                    os.getenv("CHUNK_MAX_TOKENS"),
+                    default=_read_int(os.getenv("CHUNK_SIZE"), default=1024) // 4,
+                ),
+            ),
+            chunk_overlap_tokens=max(
+                0,
+                _read_int(
+                    os.getenv("CHUNK_OVERLAP_TOKENS"),
+                    default=_read_int(os.getenv("CHUNK_OVERLAP"), default=192) // 4,
+                ),
+            ),
+            chunk_across_pages=_read_bool(os.getenv("CHUNK_ACROSS_PAGES"), default=True),
             retrieval_max_distance=float(os.getenv("RETRIEVAL_MAX_DISTANCE", "0.45")),
             max_files_per_request=_read_int(
                 os.getenv("MAX_FILES_PER_REQUEST"),
@@ -73,6 +132,106 @@ class Settings:
                 mb_raw=os.getenv("MAX_UPLOAD_FILE_SIZE_MB"),
                 default_bytes=50 * 1024 * 1024,
             ),
+            ingestion_workers=max(
+                1,
+                _read_int(os.getenv("INGESTION_WORKERS"), default=2),
+            ),
+            ingestion_shutdown_timeout_seconds=max(
+                0.0,
+                float(os.getenv("INGESTION_SHUTDOWN_TIMEOUT_SECONDS", "30")),
+            ),
+            cpu_workers=max(
+                0,
+                _read_int(os.getenv("CPU_WORKERS"), default=2),
+            ),
+            blocking_io_workers=max(
+                1,
+                _read_int(os.getenv("BLOCKING_IO_WORKERS"), default=32),
+            ),
+            ocr_max_concurrency=max(
+                1,
+                _read_int(os.getenv("OCR_MAX_CONCURRENCY"), default=4),
+            ),
+            embed_max_concurrency=max(
+                1,
+                _read_int(os.getenv("EMBED_MAX_CONCURRENCY"), default=4),
+            ),
+            embed_requests_per_minute=max(
+                0,
+                _read_int(os.getenv("EMBED_REQUESTS_PER_MINUTE"), default=0),
+            ),
+            embed_tokens_per_minute=max(
+                0,
+                _read_int(os.getenv("EMBED_TOKENS_PER_MINUTE"), default=0),
+            ),
+            embed_max_retries=max(
+                0,
+                _read_int(os.getenv("EMBED_MAX_RETRIES"), default=4),
+            ),
+            gemini_timeout_seconds=max(
+                0,
+                _read_int(os.getenv("GEMINI_TIMEOUT_SECONDS"), default=120),
+            ),
+            ocr_timeout_seconds=max(
+                0,
+                _read_int(os.getenv("OCR_TIMEOUT_SECONDS"), default=0),
+            ),
+            gemini_max_concurrency=max(
+                1,
+                _read_int(os.getenv("GEMINI_MAX_CONCURRENCY"), default=16),
+            ),
+            embedding_cache_max_entries=max(
+                0,
+                _read_int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES"), default=50_000),
+            ),
+            retrieval_mode=os.getenv("RETRIEVAL_MODE", "hybrid").strip().lower(),
+            retrieval_context_max_tokens=max(
+                0,
+                _read_int(os.getenv("RETRIEVAL_CONTEXT_MAX_TOKENS"), default=4000),
+            ),
+            reranker=os.getenv("RERANKER", "lexical_mmr").strip().lower(),
+            rerank_top_n=max(0, _read_int(os.getenv("RERANK_TOP_N"), default=0)),
+            rerank_mmr_lambda=float(os.getenv("RERANK_MMR_LAMBDA", "0.7")),
+            vector_exact_search_max_chunks=max(
+                0,
+                _read_int(os.getenv("VECTOR_EXACT_SEARCH_MAX_CHUNKS"), default=200),
+            ),
+            embedding_dimensions=max(0, _read_int(os.getenv("EMBEDDING_DIMENSIONS"), default=0)),
+            vector_storage_dtype=os.getenv("VECTOR_STORAGE_DTYPE", "float32").strip().lower(),
+            vector_rescore=_read_bool(os.getenv("VECTOR_RESCORE"), default=True),
+            query_embedding_timeout_seconds=float(
+                os.getenv("QUERY_EMBEDDING_TIMEOUT_SECONDS", "5")
+            ),
+            answer_cache_max_entries=max(
+                0,
+                _read_int(os.getenv("ANSWER_CACHE_MAX_ENTRIES"), default=1000),
+            ),
+            answer_cache_ttl_seconds=max(
+                1,
+                _read_int(os.getenv("ANSWER_CACHE_TTL_SECONDS"), default=3600),
+            ),
+            answer_cache_semantic_max_distance=float(
+                os.getenv("ANSWER_CACHE_SEMANTIC_MAX_DISTANCE", "0")
+            ),
+            qa_batch_max_questions=max(
+                1,
+                _read_int(os.getenv("QA_BATCH_MAX_QUESTIONS"), default=500),
+            ),
+            qa_batch_concurrency=max(
+                1,
+                _read_int(os.getenv("QA_BATCH_CONCURRENCY"), default=8),
+            ),
+            external_database_url=(os.getenv("DATABASE_URL") or "").strip() or None,
+            db_pool_size=max(1, _read_int(os.getenv("DB_POOL_SIZE"), default=5)),
+            db_max_overflow=max(0, _read_int(os.getenv("DB_MAX_OVERFLOW"), default=10)),
+            db_pool_timeout_seconds=max(
+                1,
+                _read_int(os.getenv("DB_POOL_TIMEOUT_SECONDS"), default=30),
+            ),
+            sqlite_busy_timeout_ms=max(
+                0,
+                _read_int(os.getenv("SQLITE_BUSY_TIMEOUT_MS"), default=5000),
+            ),
         )
 
     def ensure_directories(self) -> None:
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from collections.abc import Generator
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 
@@ -11,12 +13,45 @@ class Base(DeclarativeBase):
 
 
 class Database:
-    def __init__(self, database_url: str) -> None:
-        self.engine = create_engine(
-            database_url,
-            connect_args={"check_same_thread": False},
-            future=True,
-        )
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout_seconds: float = 30.0,
+        sqlite_busy_timeout_ms: int = 5000,
+        sqlite_mmap_size_bytes: int = 256 * 1024 * 1024,
+        sqlite_cache_size_kib: int = 64 * 1024,
+    ) -> None:
+        url = make_url(database_url)
+        self.is_sqlite = url.get_backend_name() == "sqlite"
+        in_memory = self.is_sqlite and url.database in (None, "", ":memory:")
+
+        engine_options: dict[str, Any] = {"future": True}
+        if self.is_sqlite:
+            engine_options["connect_args"] = {
+                "check_same_thread": False,
+                "timeout": sqlite_busy_timeout_ms / 1000,
+            }
+        else:
+            engine_options["pool_pre_ping"] = True
+        if not in_memory:
+            engine_options.update(
+                pool_size=max(1, pool_size),
+                max_overflow=max(0, max_overflow),
+                pool_timeout=pool_timeout_seconds,
+            )
+
+        self.engine = create_engine(database_url, **engine_options)
+        if self.is_sqlite:
+            self._install_sqlite_pragmas(
+                busy_timeout_ms=sqlite_busy_timeout_ms,
+                mmap_size_bytes=sqlite_mmap_size_bytes,
+                cache_size_kib=sqlite_cache_size_kib,
+                wal=not in_memory,
+            )
+
         self.session_factory = sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -26,6 +61,7 @@ class Database:
 
     def init_schema(self) -> None:
         Base.metadata.create_all(self.engine)
+        self._upgrade_schema()
 
     def session(self) -> Generator[Session, None, None]:
         session = self.session_factory()
@@ -33,3 +69,72 @@ class Database:
             yield session
         finally:
             session.close()
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+    def _install_sqlite_pragmas(
+        self,
+        *,
+        busy_timeout_ms: int,
+        mmap_size_bytes: int,
+        cache_size_kib: int,
+        wal: bool,
+    ) -> None:
+        @event.listens_for(self.engine, "connect")
+        def _set_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                # WAL lets readers proceed while a writer commits; NORMAL sync is durable
+                # across application crashes in WAL mode and avoids an fsync per commit.
+                if wal:
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+                cursor.execute(f"PRAGMA mmap_size={int(mmap_size_bytes)}")
+                # Negative cache_size is in KiB rather than pages.
+                cursor.execute(f"PRAGMA cache_size=-{int(cache_size_kib)}")
+                cursor.execute("PRAGMA temp_store=MEMORY")
+            finally:
+                cursor.close()
+
+    def _upgrade_schema(self) -> None:
+        # create_all never alters existing tables; add columns/indexes introduced after release.
+        inspector = inspect(self.engine)
+        columns = {column["name"] for column in inspector.get_columns("documents")}
+        chunk_columns = {column["name"] for column in inspector.get_columns("document_chunks")}
+        with self.engine.begin() as connection:
+            if "page_end" not in chunk_columns:
+                connection.execute(text("ALTER TABLE document_chunks ADD COLUMN page_end INTEGER"))
+            if "content_hash" not in chunk_columns:
+                connection.execute(
+                    text("ALTER TABLE document_chunks ADD COLUMN content_hash VARCHAR(64)")
+                )
+            if "content_hash" not in columns:
+                connection.execute(
+                    text("ALTER TABLE documents ADD COLUMN content_hash VARCHAR(64)")
+                )
+                connection.execute(
+                    text(
+                        "CREATE UNIQUE INDEX IF NOT EXISTS ix_documents_content_hash "
+                        "ON documents (content_hash)"
+                    )
+                )
+            connection.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_documents_status_created_at "
+                    "ON documents (status, created_at)"
+                )
+            )
+            connection.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_documents_created_at_id "
+                    "ON documents (created_at, id)"
+                )
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO document_catalog_state (id, version) "
+                    "SELECT 1, 0 WHERE NOT EXISTS (SELECT 1 FROM document_catalog_state)"
+                )
+            )
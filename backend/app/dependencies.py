@@ -4,15 +4,22 @@ from collections.abc import Generator
 
 from fastapi import Depends, HTTPException, Request
 from sqlalchemy.orm import Session
+from starlette.datastructures import State
 
 from .config import Settings
 from .database import Database
 from .repositories import ChunkRepository, DocumentRepository, SegmentRepository
 from .services.chunking import ChunkBuilder
 from .services.documents import DocumentService
+from .services.answer_cache import AnswerCache
+from .services.embedding_cache import EmbeddingCache
+from .services.executors import ExecutorPools
 from .services.extraction import DocumentExtractor
 from .services.gemini import GeminiClient, MissingApiKeyError, MissingDependencyError
+from .services.ingestion import IngestionQueue
+from .services.lexical_index import LexicalIndex
 from .services.qa import QAService
+from .services.reranking import create_reranker
 from .services.storage import FileStorageService
 from .services.vector_store import VectorStoreProtocol
 
@@ -33,6 +40,18 @@ def get_vector_store(request: Request) -> VectorStoreProtocol:
     return request.app.state.vector_store
 
 
+def get_embedding_cache(request: Request) -> EmbeddingCache | None:
+    return request.app.state.embedding_cache
+
+
+def get_lexical_index(request: Request) -> LexicalIndex | None:
+    return request.app.state.lexical_index
+
+
+def get_answer_cache(request: Request) -> AnswerCache | None:
+    return request.app.state.answer_cache
+
+
 def get_db_session(database: Database = Depends(get_database)) -> Generator[Session, None, None]:
     yield from database.session()
 
@@ -55,37 +74,65 @@ def get_chunk_repository(
     return ChunkRepository(session)
 
 
-def get_gemini_client(request: Request, settings: Settings = Depends(get_settings)) -> GeminiClient:
-    cached_client = getattr(request.app.state, "gemini_client", None)
+def get_ingestion_queue(request: Request) -> IngestionQueue:
+    return request.app.state.ingestion_queue
+
+
+def resolve_gemini_client(state: State) -> GeminiClient:
+    cached_client = getattr(state, "gemini_client", None)
     if cached_client is not None:
         return cached_client
 
+    settings: Settings = state.settings
+    client = GeminiClient(
+        api_key=settings.gemini_api_key or "",
+        model_name=settings.gemini_model,
+        embedding_model=settings.gemini_embedding_model,
+        use_system_proxy=settings.gemini_use_system_proxy,
+        embed_max_concurrency=settings.embed_max_concurrency,
+        embed_requests_per_minute=settings.embed_requests_per_minute,
+        embed_tokens_per_minute=settings.embed_tokens_per_minute,
+        embed_max_retries=settings.embed_max_retries,
+        embedding_cache=state.embedding_cache,
+        request_timeout_seconds=settings.gemini_timeout_seconds,
+        ocr_timeout_seconds=settings.ocr_timeout_seconds,
+        max_concurrency=settings.gemini_max_concurrency,
+        embedding_dimensions=settings.embedding_dimensions,
+    )
+    state.gemini_client = client
+    return client
+
+
+def get_gemini_client(request: Request) -> GeminiClient:
     try:
-        client = GeminiClient(
-            api_key=settings.gemini_api_key or "",
-            model_name=settings.gemini_model,
-            embedding_model=settings.gemini_embedding_model,
-            use_system_proxy=settings.gemini_use_system_proxy,
-        )
+        return resolve_gemini_client(request.app.state)
     except (MissingApiKeyError, MissingDependencyError) as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
-    request.app.state.gemini_client = client
-    return client
+
+def get_executors(request: Request) -> ExecutorPools:
+    return request.app.state.executors
 
 
 def get_document_extractor(
     ai_client: GeminiClient = Depends(get_gemini_client),
     settings: Settings = Depends(get_settings),
+    executors: ExecutorPools = Depends(get_executors),
 ) -> DocumentExtractor:
     return DocumentExtractor(
         ai_client=ai_client,
         min_chars_before_ocr=settings.pdf_min_chars_before_ocr,
+        page_executor=executors.cpu,
+        ocr_max_concurrency=settings.ocr_max_concurrency,
     )
 
 
 def get_chunk_builder(settings: Settings = Depends(get_settings)) -> ChunkBuilder:
-    return ChunkBuilder(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
+    return ChunkBuilder(
+        max_tokens=settings.chunk_max_tokens,
+        overlap_tokens=settings.chunk_overlap_tokens,
+        across_pages=settings.chunk_across_pages,
+    )
 
 
 def get_document_service(
@@ -97,6 +144,10 @@ def get_document_service(
     chunk_builder: ChunkBuilder = Depends(get_chunk_builder),
     vector_store: VectorStoreProtocol = Depends(get_vector_store),
     ai_client: GeminiClient = Depends(get_gemini_client),
+    ingestion_queue: IngestionQueue = Depends(get_ingestion_queue),
+    lexical_index: LexicalIndex | None = Depends(get_lexical_index),
+    answer_cache: AnswerCache | None = Depends(get_answer_cache),
+    executors: ExecutorPools = Depends(get_executors),
     settings: Settings = Depends(get_settings),
 ) -> DocumentService:
     return DocumentService(
@@ -108,8 +159,38 @@ def get_document_service(
         chunk_builder=chunk_builder,
         vector_store=vector_store,
         ai_client=ai_client,
+        ingestion_queue=ingestion_queue,
+        allowed_extensions=settings.allowed_extensions,
+        max_upload_file_size_bytes=settings.max_upload_file_size_bytes,
+        lexical_index=lexical_index,
+        answer_cache=answer_cache,
+        executors=executors,
+    )
+
+
+def build_document_service(state: State, session: Session) -> DocumentService:
+    """Assemble a DocumentService outside of a request, e.g. for ingestion workers."""
+    settings: Settings = state.settings
+    ai_client = resolve_gemini_client(state)
+    return DocumentService(
+        repository=DocumentRepository(session),
+        segment_repository=SegmentRepository(session),
+        chunk_repository=ChunkRepository(session),
+        storage_service=state.storage_service,
+        extractor=get_document_extractor(
+            ai_client=ai_client,
+            settings=settings,
+            executors=state.executors,
+        ),
+        chunk_builder=get_chunk_builder(settings=settings),
+        vector_store=state.vector_store,
+        ai_client=ai_client,
+        ingestion_queue=state.ingestion_queue,
         allowed_extensions=settings.allowed_extensions,
         max_upload_file_size_bytes=settings.max_upload_file_size_bytes,
+        lexical_index=state.lexical_index,
+        answer_cache=state.answer_cache,
+        executors=state.executors,
     )
 
 
@@ -117,6 +198,8 @@ def get_qa_service(
     repository: DocumentRepository = Depends(get_document_repository),
     vector_store: VectorStoreProtocol = Depends(get_vector_store),
     ai_client: GeminiClient = Depends(get_gemini_client),
+    lexical_index: LexicalIndex | None = Depends(get_lexical_index),
+    answer_cache: AnswerCache | None = Depends(get_answer_cache),
     settings: Settings = Depends(get_settings),
 ) -> QAService:
     return QAService(
@@ -124,4 +207,16 @@ def get_qa_service(
         vector_store=vector_store,
         ai_client=ai_client,
         retrieval_max_distance=settings.retrieval_max_distance,
+        lexical_index=lexical_index,
+        retrieval_mode=settings.retrieval_mode,
+        query_embedding_timeout=settings.query_embedding_timeout_seconds,
+        answer_cache=answer_cache,
+        batch_concurrency=settings.qa_batch_concurrency,
+        context_max_tokens=settings.retrieval_context_max_tokens,
+        reranker=create_reranker(
+            settings.reranker,
+            vector_store=vector_store,
+            mmr_lambda=settings.rerank_mmr_lambda,
+        ),
+        rerank_top_n=settings.rerank_top_n,
     )
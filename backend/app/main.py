@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -14,11 +17,20 @@ from .api.health import router as health_router
 from .api.questions import router as questions_router
 from .config import Settings
 from .database import Database
+from .dependencies import build_document_service
+from .repositories import ChunkRepository, DocumentRepository
+from .services.answer_cache import AnswerCache
+from .services.chunking import ChunkPayload
+from .services.embedding_cache import EmbeddingCache
+from .services.executors import ExecutorPools
 from .services.gemini import GeminiClient
+from .services.ingestion import IngestionQueue
+from .services.lexical_index import LexicalIndex
+from .services.reranking import create_reranker
 from .services.storage import FileStorageService
 from .services.vector_store import (
     ChromaVectorStore,
-    LocalJsonVectorStore,
+    LocalVectorStore,
     UnavailableVectorStore,
     VectorStoreProtocol,
 )
@@ -39,13 +51,48 @@ def create_app(
     gemini_client: GeminiClient | None = None,
 ) -> FastAPI:
     settings = settings or Settings.from_env()
+    # QA services build their reranker per request; an unknown RERANKER fails here instead.
+    create_reranker(settings.reranker)
     settings.ensure_directories()
     configure_logging(settings.environment)
 
-    database = Database(settings.database_url)
+    database = Database(
+        settings.database_url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout_seconds=settings.db_pool_timeout_seconds,
+        sqlite_busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+    )
     database.init_schema()
 
-    app = FastAPI(title=settings.app_name, version="0.3.0")
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        app.state.executors.attach_loop(asyncio.get_running_loop())
+        app.state.executors.limit_framework_threads()
+        backfill_lexical_index(app)
+        resume_unfinished_ingestion(app)
+        try:
+            yield
+        finally:
+            ingestion_queue: IngestionQueue = app.state.ingestion_queue
+            ingestion_queue.shutdown()
+            # Running jobs still need the Gemini client and the executor pools; give them
+            # a grace period before closing those. Off the loop: the jobs await on it.
+            await app.state.executors.run_blocking(
+                ingestion_queue.join,
+                app.state.settings.ingestion_shutdown_timeout_seconds or None,
+            )
+            gemini_client = getattr(app.state, "gemini_client", None)
+            if gemini_client is not None:
+                await gemini_client.aclose()
+            app.state.executors.shutdown()
+            if app.state.embedding_cache is not None:
+                app.state.embedding_cache.close()
+            if app.state.lexical_index is not None:
+                app.state.lexical_index.close()
+            app.state.database.dispose()
+
+    app = FastAPI(title=settings.app_name, version="0.3.0", lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=[
@@ -55,6 +102,7 @@ def create_app(
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
     app.state.settings = settings
     app.state.database = database
@@ -63,20 +111,57 @@ def create_app(
         app.state.vector_store = vector_store
     else:
         try:
-            app.state.vector_store = ChromaVectorStore(settings.chroma_dir)
+            app.state.vector_store = ChromaVectorStore(
+                settings.chroma_dir,
+                exact_search_max_chunks=settings.vector_exact_search_max_chunks,
+            )
         except Exception as exc:
             logging.getLogger(__name__).warning(
-                "Chroma kullanilamadi, LocalJsonVectorStore devreye alindi: %s",
+                "Chroma kullanilamadi, LocalVectorStore devreye alindi: %s",
                 exc,
             )
             try:
-                app.state.vector_store = LocalJsonVectorStore(
-                    settings.data_dir / "local_vectors.json"
+                app.state.vector_store = LocalVectorStore(
+                    settings.data_dir / "local_vectors",
+                    legacy_json_path=settings.data_dir / "local_vectors.json",
+                    storage_dtype=settings.vector_storage_dtype,
+                    rescore=settings.vector_rescore,
                 )
             except Exception as inner_exc:
                 app.state.vector_store = UnavailableVectorStore(str(inner_exc))
+    app.state.embedding_cache = (
+        EmbeddingCache(
+            settings.embedding_cache_path,
+            max_entries=settings.embedding_cache_max_entries,
+        )
+        if settings.embedding_cache_max_entries > 0
+        else None
+    )
+    try:
+        app.state.lexical_index = LexicalIndex(settings.lexical_index_path)
+    except Exception as exc:
+        # e.g. an SQLite build without FTS5; retrieval falls back to vectors only.
+        logging.getLogger(__name__).warning("Lexical index kullanilamadi: %s", exc)
+        app.state.lexical_index = None
     if gemini_client is not None:
         app.state.gemini_client = gemini_client
+    app.state.executors = ExecutorPools(
+        cpu_workers=settings.cpu_workers,
+        blocking_io_workers=settings.blocking_io_workers,
+    )
+    app.state.ingestion_queue = IngestionQueue(
+        processor=lambda document_id: process_document_job(app, document_id),
+        max_workers=settings.ingestion_workers,
+    )
+    app.state.answer_cache = (
+        AnswerCache(
+            max_entries=settings.answer_cache_max_entries,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            semantic_max_distance=settings.answer_cache_semantic_max_distance,
+        )
+        if settings.answer_cache_max_entries > 0
+        else None
+    )
 
     app.include_router(health_router, prefix=settings.api_prefix)
     app.include_router(documents_router, prefix=settings.api_prefix)
@@ -93,4 +178,75 @@ def create_app(
     return app
 
 
+def process_document_job(app: FastAPI, document_id: str) -> None:
+    database: Database = app.state.database
+    session = database.session_factory()
+    try:
+        try:
+            service = build_document_service(app.state, session)
+        except Exception as exc:
+            # Typically a missing API key; leave a visible reason on the document.
+            DocumentRepository(session).update_status(
+                document_id,
+                status="failed",
+                error_message=str(exc),
+            )
+            return
+        service.process_document(document_id)
+    finally:
+        session.close()
+
+
+def backfill_lexical_index(app: FastAPI) -> int:
+    """Build the lexical index from stored chunks when it is missing (e.g. after upgrade)."""
+    lexical_index: LexicalIndex | None = app.state.lexical_index
+    if lexical_index is None or not lexical_index.is_empty():
+        return 0
+
+    database: Database = app.state.database
+    session = database.session_factory()
+    indexed = 0
+    try:
+        document_repository = DocumentRepository(session)
+        chunk_repository = ChunkRepository(session)
+        document_ids = document_repository.list_ids_by_status("indexed")
+        for document in document_repository.list_by_ids(document_ids):
+            chunks = [
+                ChunkPayload(
+                    id=chunk.id,
+                    document_id=chunk.document_id,
+                    filename=document.filename,
+                    chunk_index=chunk.chunk_index,
+                    page=chunk.page,
+                    text=chunk.text,
+                    page_end=chunk.page_end,
+                )
+                for chunk in chunk_repository.list_for_documents([document.id])
+            ]
+            lexical_index.replace_document(document.id, chunks)
+            indexed += 1
+    finally:
+        session.close()
+
+    if indexed:
+        logging.getLogger(__name__).info("Lexical index %d belge icin yeniden olusturuldu", indexed)
+    return indexed
+
+
+def resume_unfinished_ingestion(app: FastAPI) -> int:
+    """Re-enqueue documents left in `processing` by a previous run (crash/restart)."""
+    database: Database = app.state.database
+    session = database.session_factory()
+    try:
+        document_ids = DocumentRepository(session).list_ids_by_status("processing")
+    finally:
+        session.close()
+
+    queue: IngestionQueue = app.state.ingestion_queue
+    resumed = sum(1 for document_id in document_ids if queue.submit(document_id))
+    if resumed:
+        logging.getLogger(__name__).info("Yarim kalan %d ingestion isi kuyruga alindi", resumed)
+    return resumed
+
+
 app = create_app()
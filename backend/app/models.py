@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -10,6 +10,11 @@ from .database import Base
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination of the listing, optionally filtered by status.
+        Index("ix_documents_status_created_at", "status", "created_at"),
+        Index("ix_documents_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -17,6 +22,8 @@ class Document(Base):
     mime_type: Mapped[str] = mapped_column(String(64), nullable=False)
     storage_path: Mapped[str] = mapped_column(String(512), nullable=False)
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    # SHA-256 of the uploaded bytes; NULL for documents stored before hashing existed.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, unique=True)
     language: Mapped[str] = mapped_column(String(16), default="unknown", nullable=False)
     status: Mapped[str] = mapped_column(String(32), default="uploaded", nullable=False)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -34,6 +41,42 @@ class Document(Base):
         back_populates="document",
         cascade="all, delete-orphan",
     )
+    aliases: Mapped[list["DocumentAlias"]] = relationship(
+        back_populates="document",
+        cascade="all, delete-orphan",
+        order_by="DocumentAlias.created_at",
+    )
+
+
+class DocumentAlias(Base):
+    """Another filename the same content was uploaded under."""
+
+    __tablename__ = "document_aliases"
+    __table_args__ = (UniqueConstraint("document_id", "filename"),)
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    document_id: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        index=True,
+    )
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    document: Mapped[Document] = relationship(back_populates="aliases")
+
+
+class DocumentCatalogState(Base):
+    """Single row whose version changes whenever any document row changes (listing ETag)."""
+
+    __tablename__ = "document_catalog_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
 
 class DocumentSegment(Base):
@@ -68,7 +111,9 @@ class DocumentChunk(Base):
     )
     chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
     page: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    page_end: Mapped[int | None] = mapped_column(Integer, nullable=True)
     text: Mapped[str] = mapped_column(Text, nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     char_count: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -1,14 +1,28 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import islice
+from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import delete, select
+from sqlalchemy import and_, delete, insert, or_, select, update
 from sqlalchemy.orm import Session
 
-from .models import Document, DocumentChunk, DocumentSegment
+from .database import Base
+from .models import (
+    Document,
+    DocumentAlias,
+    DocumentCatalogState,
+    DocumentChunk,
+    DocumentSegment,
+)
 from .services.chunking import ChunkPayload
 from .services.extraction import ExtractedSegment
 
+# Rows per executemany round trip; bounds memory when callers stream rows in.
+_BULK_INSERT_BATCH_SIZE = 1000
+
 
 class DocumentRepository:
     def __init__(self, session: Session) -> None:
@@ -16,20 +30,91 @@ class DocumentRepository:
 
     def create(self, document: Document) -> Document:
         self.session.add(document)
+        self._bump_catalog_version()
         self.session.commit()
         self.session.refresh(document)
         return document
 
-    def list_all(self) -> list[Document]:
-        statement = select(Document).order_by(Document.created_at.desc())
+    def get(self, document_id: str) -> Document | None:
+        return self.session.get(Document, document_id)
+
+    def get_by_content_hash(self, content_hash: str) -> Document | None:
+        statement = select(Document).where(Document.content_hash == content_hash)
+        return self.session.scalars(statement).first()
+
+    def add_alias(self, document: Document, filename: str) -> bool:
+        """Record ``filename`` as another name for ``document``. Returns False if known."""
+        if filename == document.filename or any(alias.filename == filename for alias in document.aliases):
+            return False
+        self.session.add(DocumentAlias(id=uuid4().hex, document_id=document.id, filename=filename))
+        self._bump_catalog_version()
+        self.session.commit()
+        return True
+
+    def set_storage_path(self, document: Document, storage_path: str) -> None:
+        document.storage_path = storage_path
+        self.session.commit()
+
+    def list_ids_by_status(self, status: str) -> list[str]:
+        statement = (
+            select(Document.id)
+            .where(Document.status == status)
+            .order_by(Document.created_at.asc())
+        )
+        return list(self.session.scalars(statement))
+
+    def list_page(
+        self,
+        *,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+        status: str | None = None,
+        file_type: str | None = None,
+        language: str | None = None,
+    ) -> list[Document]:
+        """Newest first; ``after`` is the (created_at, id) of the last row already returned."""
+        statement = select(Document)
+        if status is not None:
+            statement = statement.where(Document.status == status)
+        if file_type is not None:
+            statement = statement.where(Document.file_type == file_type)
+        if language is not None:
+            statement = statement.where(Document.language == language)
+        if after is not None:
+            created_at, document_id = after
+            statement = statement.where(
+                or_(
+                    Document.created_at < created_at,
+                    and_(Document.created_at == created_at, Document.id < document_id),
+                )
+            )
+        statement = statement.order_by(Document.created_at.desc(), Document.id.desc()).limit(limit)
         return list(self.session.scalars(statement))
 
+    def catalog_version(self) -> int:
+        version = self.session.scalar(
+            select(DocumentCatalogState.version).where(DocumentCatalogState.id == 1)
+        )
+        return int(version or 0)
+
     def list_by_ids(self, document_ids: list[str]) -> list[Document]:
         if not document_ids:
             return []
         statement = select(Document).where(Document.id.in_(document_ids))
         return list(self.session.scalars(statement))
 
+    def delete(self, document_id: str) -> bool:
+        # SQLite does not enforce ON DELETE CASCADE without a pragma; delete children explicitly.
+        self.session.execute(delete(DocumentChunk).where(DocumentChunk.document_id == document_id))
+        self.session.execute(
+            delete(DocumentSegment).where(DocumentSegment.document_id == document_id)
+        )
+        self.session.execute(delete(DocumentAlias).where(DocumentAlias.document_id == document_id))
+        result = self.session.execute(delete(Document).where(Document.id == document_id))
+        self._bump_catalog_version()
+        self.session.commit()
+        return bool(result.rowcount)
+
     def update_status(
         self,
         document_id: str,
@@ -46,57 +131,114 @@ class DocumentRepository:
         if language is not None:
             document.language = language
         document.error_message = error_message
+        self._bump_catalog_version()
         self.session.commit()
 
+    def _bump_catalog_version(self) -> None:
+        # Same transaction as the document change, so the listing ETag can never go stale.
+        self.session.execute(
+            update(DocumentCatalogState)
+            .where(DocumentCatalogState.id == 1)
+            .values(version=DocumentCatalogState.version + 1)
+        )
+
 
 class SegmentRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def replace_for_document(self, document_id: str, segments: list[ExtractedSegment]) -> None:
+    def replace_for_document(
+        self,
+        document_id: str,
+        segments: Iterable[ExtractedSegment],
+        *,
+        commit: bool = True,
+    ) -> int:
         self.session.execute(
             delete(DocumentSegment).where(DocumentSegment.document_id == document_id)
         )
-        for segment in segments:
-            self.session.add(
-                DocumentSegment(
-                    id=uuid4().hex,
-                    document_id=document_id,
-                    page=segment.page,
-                    source=segment.source,
-                    text=segment.text,
-                )
-            )
-        self.session.commit()
+        rows = (
+            {
+                "id": uuid4().hex,
+                "document_id": document_id,
+                "page": segment.page,
+                "source": segment.source,
+                "text": segment.text,
+            }
+            for segment in segments
+        )
+        inserted = _bulk_insert(self.session, DocumentSegment, rows)
+        if commit:
+            self.session.commit()
+        return inserted
 
     def list_for_document(self, document_id: str) -> list[DocumentSegment]:
-        statement = select(DocumentSegment).where(DocumentSegment.document_id == document_id)
+        statement = (
+            select(DocumentSegment)
+            .where(DocumentSegment.document_id == document_id)
+            # Page order; a page-less segment (whole-file OCR) sorts last.
+            .order_by(DocumentSegment.page.is_(None), DocumentSegment.page)
+        )
         return list(self.session.scalars(statement))
 
+    def has_segments(self, document_id: str) -> bool:
+        statement = select(DocumentSegment.id).where(DocumentSegment.document_id == document_id)
+        return self.session.scalars(statement.limit(1)).first() is not None
+
 
 class ChunkRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def replace_for_document(self, document_id: str, chunks: list[ChunkPayload]) -> None:
+    def replace_for_document(
+        self,
+        document_id: str,
+        chunks: Iterable[ChunkPayload],
+        *,
+        commit: bool = True,
+    ) -> int:
         self.session.execute(
             delete(DocumentChunk).where(DocumentChunk.document_id == document_id)
         )
-        for chunk in chunks:
-            self.session.add(
-                DocumentChunk(
-                    id=chunk.id,
-                    document_id=chunk.document_id,
-                    chunk_index=chunk.chunk_index,
-                    page=chunk.page,
-                    text=chunk.text,
-                    char_count=len(chunk.text),
-                )
-            )
-        self.session.commit()
+        rows = (
+            {
+                "id": chunk.id,
+                "document_id": chunk.document_id,
+                "chunk_index": chunk.chunk_index,
+                "page": chunk.page,
+                "page_end": chunk.page_end,
+                "text": chunk.text,
+                "content_hash": chunk.content_hash,
+                "char_count": len(chunk.text),
+            }
+            for chunk in chunks
+        )
+        inserted = _bulk_insert(self.session, DocumentChunk, rows)
+        if commit:
+            self.session.commit()
+        return inserted
 
     def list_for_documents(self, document_ids: list[str]) -> list[DocumentChunk]:
         if not document_ids:
             return []
         statement = select(DocumentChunk).where(DocumentChunk.document_id.in_(document_ids))
         return list(self.session.scalars(statement))
+
+    def ids_by_content_hash(self, document_id: str) -> dict[str, str]:
+        """Map content hash -> chunk id for the document's hashed chunks."""
+        statement = select(DocumentChunk.content_hash, DocumentChunk.id).where(
+            DocumentChunk.document_id == document_id,
+            DocumentChunk.content_hash.is_not(None),
+        )
+        return {content_hash: chunk_id for content_hash, chunk_id in self.session.execute(statement)}
+
+
+def _bulk_insert(session: Session, model: type[Base], rows: Iterable[dict[str, Any]]) -> int:
+    """executemany-style Core insert in fixed-size batches; consumes ``rows`` lazily."""
+    statement = insert(model)
+    inserted = 0
+    iterator = iter(rows)
+    while batch := list(islice(iterator, _BULK_INSERT_BATCH_SIZE)):
+        session.execute(statement, batch)
+        inserted += len(batch)
+    return inserted
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -15,6 +15,7 @@ class AcceptedFile(BaseModel):
     document_id: str
     filename: str
     status: str
+    duplicate: bool = False
 
 
 class UploadResponse(BaseModel):
@@ -23,6 +24,12 @@ class UploadResponse(BaseModel):
     rejected_files: list[RejectedFile]
 
 
+class ReindexResponse(BaseModel):
+    document_ids: list[str]
+    # Documents still being processed, or whose file is gone and must be re-uploaded.
+    skipped_document_ids: list[str]
+
+
 class DocumentSummary(BaseModel):
     id: str
     filename: str
@@ -32,9 +39,17 @@ class DocumentSummary(BaseModel):
     created_at: datetime
 
 
+class DocumentDetail(DocumentSummary):
+    file_size: int
+    error_message: str | None
+    queued: bool
+    aliases: list[str] = Field(default_factory=list)
+
+
 class HealthResponse(BaseModel):
     status: str
     services: dict[str, str]
+    caches: dict[str, dict[str, int]] = Field(default_factory=dict)
 
 
 class AskRequest(BaseModel):
@@ -43,12 +58,20 @@ class AskRequest(BaseModel):
     top_k: int = Field(default=5, ge=1, le=15)
 
 
+class BatchAskRequest(BaseModel):
+    questions: list[Annotated[str, Field(min_length=3, max_length=2000)]] = Field(min_length=1)
+    document_ids: list[str] = Field(min_length=1)
+    top_k: int = Field(default=5, ge=1, le=15)
+
+
 class Citation(BaseModel):
     document_id: str
     filename: str
+    # First cited page; page_end is set when the chunk runs onto later pages.
     page: int | None
     chunk_id: str
     snippet: str
+    page_end: int | None = None
 
 
 class AskResponse(BaseModel):
@@ -57,3 +80,4 @@ class AskResponse(BaseModel):
     citations: list[Citation]
     confidence: float
     used_chunks: int
+    cached: bool = False
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..schemas import AskResponse
+from .lexical_index import fold_text
+
+# (sorted document ids, top_k, model); answers are only reused within the same scope.
+AnswerScope = tuple[tuple[str, ...], int, str]
+
+
+@dataclass
+class _CachedAnswer:
+    scope: AnswerScope
+    response: AskResponse
+    expires_at: float
+    query_embedding: np.ndarray | None
+
+
+class AnswerCache:
+    """In-process TTL + LRU cache for QA answers.
+
+    Exact hits match the normalized question within a scope. With ``semantic_max_distance``
+    above zero, a question whose embedding is within that cosine distance of a cached
+    question in the same scope is also served from the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600.0,
+        semantic_max_distance: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.semantic_max_distance = max(0.0, float(semantic_max_distance))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, AnswerScope], _CachedAnswer] = OrderedDict()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_max_distance > 0
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        return " ".join(fold_text(question).split()).rstrip(" ?!.")
+
+    @staticmethod
+    def make_scope(document_ids: Iterable[str], top_k: int, model: str) -> AnswerScope:
+        return tuple(sorted(set(document_ids))), int(top_k), model
+
+    def get(self, question: str, scope: AnswerScope) -> AskResponse | None:
+        key = (self.normalize_question(question), scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                if not self.semantic_enabled:
+                    # In semantic mode the miss is counted by find_similar instead.
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.response
+
+    def find_similar(self, query_embedding: list[float], scope: AnswerScope) -> AskResponse | None:
+        query = _unit(query_embedding)
+        now = self._clock()
+        with self._lock:
+            best_key = None
+            best_distance = self.semantic_max_distance
+            for key, entry in self._entries.items():
+                if entry.scope != scope or entry.query_embedding is None or entry.expires_at <= now:
+                    continue
+                if entry.query_embedding.shape != query.shape:
+                    continue
+                distance = 1.0 - float(entry.query_embedding @ query)
+                if distance <= best_distance:
+                    best_key, best_distance = key, distance
+
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            return self._entries[best_key].response
+
+    def put(
+        self,
+        question: str,
+        scope: AnswerScope,
+        response: AskResponse,
+        query_embedding: list[float] | None = None,
+    ) -> None:
+        key = (self.normalize_question(question), scope)
+        embedding = _unit(query_embedding) if query_embedding is not None else None
+        with self._lock:
+            self._entries[key] = _CachedAnswer(
+                scope=scope,
+                response=response,
+                expires_at=self._clock() + self.ttl_seconds,
+                query_embedding=embedding,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_documents(self, document_ids: Iterable[str]) -> int:
+        targets = set(document_ids)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if targets.intersection(entry.scope[0])]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
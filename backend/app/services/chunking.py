@@ -1,10 +1,27 @@
 from __future__ import annotations
 
+import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from uuid import uuid4
 
 from .extraction import ExtractedSegment
 
+_MARKDOWN_HEADING = re.compile(r"#{1,6}\s+\S")
+# "2.1 Kapsam", "3.4.1. Yontem"; a lone "1." is treated as a list item instead.
+_NUMBERED_HEADING = re.compile(r"\d+(?:\.\d+)+\.?\s+\S")
+_LIST_ITEM = re.compile(r"(?:[-*•▪◦–]|\d{1,3}[.)]|[a-zA-Z][.)])\s+\S")
+_CELL_SEPARATOR = re.compile(r"[\t|]")
+_SENTENCE_END = ".!?…:;"
+_SENTENCE_BREAK = re.compile(rf"(?<=[{_SENTENCE_END}])\s+")
+_HEADING_MAX_CHARS = 80
+_PAGE_BREAK = "\f"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate model tokens: about one per four characters of each word, at least one."""
+    return sum((len(word) + 3) // 4 for word in text.split())
+
 
 @dataclass
 class ChunkPayload:
@@ -12,16 +29,50 @@ class ChunkPayload:
     document_id: str
     filename: str
     chunk_index: int
+    # First page of the chunk; page_end is the last one when the chunk spans a page break.
     page: int | None
     text: str
+    page_end: int | None = None
+    # Hash of the embedded text and embedding setup; lets a re-index reuse stored vectors.
+    content_hash: str | None = None
+
+
+@dataclass
+class _Piece:
+    # Separator placed before the text when it follows another piece in the same chunk.
+    separator: str
+    text: str
+    tokens: int
+    # Headings and page breaks start a new chunk (once the current one has some content).
+    starts_section: bool = False
+    page: int | None = None
 
 
 class ChunkBuilder:
-    def __init__(self, chunk_size: int = 900, chunk_overlap: int = 180) -> None:
-        if chunk_overlap >= chunk_size:
-            raise ValueError("chunk_overlap, chunk_size degerinden kucuk olmali")
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
+    """Packs extracted text into chunks of at most ``max_tokens`` approximate tokens.
+
+    Text is scanned once into structural pieces (headings, paragraph sentences, list
+    items, table rows, page breaks) which are packed greedily. Chunks break at piece
+    boundaries, prefer to start at headings, and repeat up to ``overlap_tokens`` of
+    trailing pieces from the previous chunk within the same section.
+
+    With ``across_pages`` the scan streams over all segments of a document, so text
+    continuing onto the next page and runs of short pages share chunks; each chunk
+    records the page range it covers. Otherwise every segment is chunked on its own.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 256,
+        overlap_tokens: int = 48,
+        *,
+        across_pages: bool = True,
+    ) -> None:
+        if overlap_tokens >= max_tokens:
+            raise ValueError("chunk_overlap_tokens, chunk_max_tokens degerinden kucuk olmali")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = max(0, overlap_tokens)
+        self.across_pages = across_pages
 
     def build(
         self,
@@ -30,48 +81,194 @@ class ChunkBuilder:
         filename: str,
         segments: list[ExtractedSegment],
     ) -> list[ChunkPayload]:
-        chunks: list[ChunkPayload] = []
-        chunk_index = 0
+        if self.across_pages:
+            packed = self._pack(self._document_pieces(segments))
+        else:
+            packed = (
+                chunk
+                for segment in segments
+                for chunk in self._pack(self._pieces(segment.text, segment.page))
+            )
 
-        for segment in segments:
-            for text_piece in self._split_text(segment.text):
-                chunks.append(
-                    ChunkPayload(
-                        id=uuid4().hex,
-                        document_id=document_id,
-                        filename=filename,
-                        chunk_index=chunk_index,
-                        page=segment.page,
-                        text=text_piece,
-                    )
-                )
-                chunk_index += 1
-
-        return chunks
+        return [
+            ChunkPayload(
+                id=uuid4().hex,
+                document_id=document_id,
+                filename=filename,
+                chunk_index=chunk_index,
+                page=page_start,
+                text=text,
+                page_end=page_end,
+            )
+            for chunk_index, (text, page_start, page_end) in enumerate(packed)
+        ]
 
     def _split_text(self, text: str) -> list[str]:
-        normalized = " ".join(text.split())
-        if not normalized:
-            return []
-
-        parts: list[str] = []
-        start = 0
-        text_len = len(normalized)
-
-        while start < text_len:
-            end = min(start + self.chunk_size, text_len)
-            if end < text_len:
-                breakpoint_index = normalized.rfind(" ", start, end)
-                if breakpoint_index > start + (self.chunk_size // 2):
-                    end = breakpoint_index
-
-            piece = normalized[start:end].strip()
-            if piece:
-                parts.append(piece)
-
-            if end >= text_len:
+        return [chunk_text for chunk_text, _, _ in self._pack(self._pieces(text, None))]
+
+    def _pack(self, pieces: Iterable[_Piece]) -> Iterator[tuple[str, int | None, int | None]]:
+        """Yield (text, first page, last page) per chunk."""
+        current: list[_Piece] = []
+        current_tokens = 0
+        # Small sections are merged with their neighbours instead of becoming tiny chunks.
+        section_min_tokens = self.max_tokens // 4
+
+        for piece in pieces:
+            if piece.starts_section and current_tokens >= section_min_tokens:
+                yield _emit(current)
+                current, current_tokens = [], 0
+            elif current_tokens and current_tokens + piece.tokens > self.max_tokens:
+                yield _emit(current)
+                current = self._overlap_tail(current, room=self.max_tokens - piece.tokens)
+                current_tokens = sum(carried.tokens for carried in current)
+            current.append(piece)
+            current_tokens += piece.tokens
+
+        if current_tokens:
+            yield _emit(current)
+
+    def _overlap_tail(self, pieces: list[_Piece], *, room: int) -> list[_Piece]:
+        budget = min(self.overlap_tokens, room)
+        start = len(pieces)
+        carried = 0
+        # Walks back at most `budget` pieces, so overlap never makes the scan quadratic. A
+        # section's heading may be carried, but nothing before it.
+        while start > 0:
+            candidate = pieces[start - 1]
+            if carried + candidate.tokens > budget:
+                break
+            carried += candidate.tokens
+            start -= 1
+            if candidate.starts_section:
                 break
+        return pieces[start:]
+
+    def _document_pieces(self, segments: list[ExtractedSegment]) -> Iterator[_Piece]:
+        last_text = ""
+        for segment in segments:
+            first = True
+            for piece in self._pieces(segment.text, segment.page):
+                if (
+                    first
+                    and last_text
+                    and last_text[-1] not in _SENTENCE_END
+                    and piece.text[:1].islower()
+                    and not piece.starts_section
+                ):
+                    # The previous page stopped mid-sentence; continue it instead of
+                    # starting a new paragraph.
+                    piece.separator = " "
+                first = False
+                if piece.text:
+                    last_text = piece.text
+                yield piece
+
+    def _pieces(self, text: str, page: int | None) -> Iterator[_Piece]:
+        for page_number, page_text in enumerate(text.split(_PAGE_BREAK)):
+            if page_number:
+                yield _Piece(separator="\n\n", text="", tokens=0, starts_section=True, page=page)
+            for piece in self._page_pieces(page_text):
+                piece.page = page
+                yield piece
+
+    def _page_pieces(self, text: str) -> Iterator[_Piece]:
+        paragraph: list[str] = []
+        # Kind of the previous block, so list items and table rows stay on adjacent lines.
+        previous_kind = ""
+
+        for raw_line in text.splitlines():
+            line = " ".join(raw_line.split())
+            kind = self._line_kind(raw_line, line)
+            if kind == "text":
+                # Wrapped lines of one paragraph are re-joined with a space.
+                paragraph.append(line)
+                continue
+
+            if paragraph:
+                yield from self._sentence_pieces(" ".join(paragraph), "\n\n")
+                paragraph = []
+                previous_kind = "paragraph"
+            if kind == "blank":
+                previous_kind = ""
+                continue
+
+            separator = "\n" if kind == previous_kind and kind in ("item", "row") else "\n\n"
+            if kind == "heading":
+                yield _Piece(separator, line, estimate_tokens(line), starts_section=True)
+            elif kind == "row":
+                # Table rows keep their cell separators and are never split on sentences.
+                cells = (" ".join(cell.split()) for cell in _CELL_SEPARATOR.split(raw_line))
+                row = " | ".join(cell for cell in cells if cell)
+                yield from self._bounded(_Piece(separator, row, estimate_tokens(row)))
+            else:
+                yield from self._sentence_pieces(line, separator)
+            previous_kind = kind
+
+        if paragraph:
+            yield from self._sentence_pieces(" ".join(paragraph), "\n\n")
+
+    @staticmethod
+    def _line_kind(raw_line: str, line: str) -> str:
+        if not line:
+            return "blank"
+        if "|" in line or "\t" in raw_line.strip():
+            return "row"
+        if len(line) <= _HEADING_MAX_CHARS and line[-1] not in ".,;:":
+            if _MARKDOWN_HEADING.match(line) or _NUMBERED_HEADING.match(line):
+                return "heading"
+            if line.isupper() and sum(char.isalpha() for char in line) >= 3:
+                return "heading"
+        if _LIST_ITEM.match(line):
+            return "item"
+        return "text"
+
+    def _sentence_pieces(self, text: str, separator: str) -> Iterator[_Piece]:
+        for sentence in _SENTENCE_BREAK.split(text):
+            if sentence:
+                yield from self._bounded(_Piece(separator, sentence, estimate_tokens(sentence)))
+                separator = " "
+
+    def _bounded(self, piece: _Piece) -> Iterator[_Piece]:
+        """Yield ``piece`` as is, or as word windows when it alone exceeds the budget."""
+        if piece.tokens <= self.max_tokens:
+            yield piece
+            return
+
+        # Windows leave room for the overlap carried in front of them.
+        window_tokens = self.max_tokens - self.overlap_tokens
+        # Runs without spaces (URLs, base64, CJK or OCR runs) are cut at the same
+        # four characters per token that estimate_tokens assumes.
+        window_chars = window_tokens * 4
+        separator = piece.separator
+        text = ""
+        tokens = 0
+        for word in piece.text.split(" "):
+            for offset in range(0, max(1, len(word)), window_chars):
+                fragment = word[offset : offset + window_chars]
+                fragment_tokens = max(1, (len(fragment) + 3) // 4)
+                # The rest of a cut word continues without a space.
+                joiner = "" if offset else " "
+                if text and tokens + fragment_tokens > window_tokens:
+                    yield _Piece(separator, text, tokens)
+                    separator, text, tokens = joiner, fragment, fragment_tokens
+                    continue
+                text = f"{text}{joiner}{fragment}" if text else fragment
+                tokens += fragment_tokens
+        if text:
+            yield _Piece(separator, text, tokens)
+
+
+def _emit(pieces: list[_Piece]) -> tuple[str, int | None, int | None]:
+    pages = [piece.page for piece in pieces if piece.text and piece.page is not None]
+    return _join(pieces), (pages[0] if pages else None), (pages[-1] if pages else None)
 
-            start = max(0, end - self.chunk_overlap)
 
-        return parts
+def _join(pieces: list[_Piece]) -> str:
+    parts: list[str] = []
+    for piece in pieces:
+        if not piece.text:
+            continue
+        if parts:
+            parts.append(piece.separator)
+        parts.append(piece.text)
+    return "".join(parts)
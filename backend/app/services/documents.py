@@ -1,22 +1,53 @@
 from __future__ import annotations
 
+import base64
+import hashlib
 import logging
+from collections.abc import Callable
+from datetime import datetime
 from pathlib import Path
+from typing import Any, TypeVar
 from uuid import uuid4
 
 from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 
 from ..models import Document
 from ..repositories import ChunkRepository, DocumentRepository, SegmentRepository
-from ..schemas import AcceptedFile, DocumentSummary, RejectedFile, UploadResponse
-from .chunking import ChunkBuilder
-from .extraction import DocumentExtractor
+from ..schemas import (
+    AcceptedFile,
+    DocumentDetail,
+    DocumentSummary,
+    RejectedFile,
+    UploadResponse,
+)
+from .answer_cache import AnswerCache
+from .chunking import ChunkBuilder, ChunkPayload
+from .executors import ExecutorPools
+from .extraction import DocumentExtractor, ExtractedSegment
 from .gemini import GeminiClient
-from .storage import FileStorageService
+from .ingestion import IngestionQueue
+from .lexical_index import LexicalIndex
+from .storage import FileStorageService, StagedUpload
 from .vector_store import VectorStoreProtocol
 
 logger = logging.getLogger(__name__)
 
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Below this much text, shipping segments to a worker process costs more than chunking.
+_CHUNK_IN_PROCESS_MIN_CHARS = 500_000
+
+T = TypeVar("T")
+
+
+class DocumentBusyError(RuntimeError):
+    pass
+
+
+def _content_hash(signature: str, text: str) -> str:
+    return hashlib.sha256(f"{signature}\0{text}".encode()).hexdigest()
+
 
 class DocumentService:
     def __init__(
@@ -29,8 +60,12 @@ class DocumentService:
         chunk_builder: ChunkBuilder,
         vector_store: VectorStoreProtocol,
         ai_client: GeminiClient,
+        ingestion_queue: IngestionQueue,
         allowed_extensions: set[str],
         max_upload_file_size_bytes: int,
+        lexical_index: LexicalIndex | None = None,
+        answer_cache: AnswerCache | None = None,
+        executors: ExecutorPools | None = None,
     ) -> None:
         self.repository = repository
         self.segment_repository = segment_repository
@@ -40,8 +75,12 @@ class DocumentService:
         self.chunk_builder = chunk_builder
         self.vector_store = vector_store
         self.ai_client = ai_client
+        self.ingestion_queue = ingestion_queue
         self.allowed_extensions = {value.lower() for value in allowed_extensions}
         self.max_upload_file_size_bytes = max(1, int(max_upload_file_size_bytes))
+        self.lexical_index = lexical_index
+        self.answer_cache = answer_cache
+        self.executors = executors
 
     async def upload_documents(self, files: list[UploadFile]) -> UploadResponse:
         document_ids: list[str] = []
@@ -58,89 +97,42 @@ class DocumentService:
                 )
                 continue
 
-            content = await self._read_upload_file_limited(
-                file,
-                max_bytes=self.max_upload_file_size_bytes,
-            )
-            if content is None:
-                rejected_files.append(
-                    RejectedFile(
-                        filename=filename,
-                        reason=(
-                            "Dosya cok buyuk "
-                            f"(max {self.max_upload_file_size_bytes // (1024 * 1024)} MB)"
-                        ),
-                    )
-                )
-                continue
-            if not content:
-                rejected_files.append(RejectedFile(filename=filename, reason="Dosya bos"))
-                continue
-
-            document_id = uuid4().hex
-            saved = self.storage_service.save(document_id, filename, content)
-            logger.info("Dosya kaydedildi: %s (%s)", filename, document_id)
-            document = Document(
-                id=document_id,
-                filename=filename,
-                file_type=suffix.lstrip("."),
-                mime_type=file.content_type or "application/octet-stream",
-                storage_path=str(saved.storage_path),
-                file_size=saved.file_size,
-                status="processing",
-                language="unknown",
-            )
-            self.repository.create(document)
-
+            staged = self.storage_service.stage()
             try:
-                segments = self.extractor.extract(saved.storage_path, document.file_type)
-                if not segments:
-                    raise ValueError("Metin cikarimi basarisiz")
-
-                self.segment_repository.replace_for_document(document_id, segments)
-                chunks = self.chunk_builder.build(
-                    document_id=document_id,
-                    filename=filename,
-                    segments=segments,
+                within_limit = await self._stream_upload_file(
+                    file,
+                    staged,
+                    max_bytes=self.max_upload_file_size_bytes,
                 )
-                if not chunks:
-                    raise ValueError("Chunk olusturulamadi")
-
-                embeddings = self.ai_client.embed_texts(
-                    [chunk.text for chunk in chunks],
-                    task_type="retrieval_document",
-                )
-                self.chunk_repository.replace_for_document(document_id, chunks)
-                self.vector_store.upsert(chunks, embeddings)
-
-                full_text = "\n".join(segment.text for segment in segments)
-                language = self._detect_language(full_text)
-                self.repository.update_status(
-                    document_id,
-                    status="indexed",
-                    language=language,
-                    error_message=None,
-                )
-                logger.info("Belge indexlendi: %s (%s)", filename, document_id)
-
-                document_ids.append(document_id)
-                accepted_files.append(
-                    AcceptedFile(
-                        document_id=document_id,
-                        filename=filename,
-                        status="indexed",
+                if not within_limit:
+                    staged.discard()
+                    rejected_files.append(
+                        RejectedFile(
+                            filename=filename,
+                            reason=(
+                                "Dosya cok buyuk "
+                                f"(max {self.max_upload_file_size_bytes // (1024 * 1024)} MB)"
+                            ),
+                        )
                     )
+                    continue
+                if staged.size == 0:
+                    staged.discard()
+                    rejected_files.append(RejectedFile(filename=filename, reason="Dosya bos"))
+                    continue
+
+                # Hash lookup, rename and DB insert all block; do them off the event loop.
+                await self._run_blocking(
+                    self._store_upload,
+                    staged,
+                    filename,
+                    file.content_type,
+                    document_ids,
+                    accepted_files,
                 )
-            except Exception as exc:
-                logger.exception("Belge isleme hatasi: %s (%s)", filename, document_id)
-                self.repository.update_status(
-                    document_id,
-                    status="failed",
-                    error_message=str(exc),
-                )
-                rejected_files.append(
-                    RejectedFile(filename=filename, reason=f"Isleme hatasi: {exc}")
-                )
+            except BaseException:
+                staged.discard()
+                raise
 
         return UploadResponse(
             document_ids=document_ids,
@@ -148,35 +140,373 @@ class DocumentService:
             rejected_files=rejected_files,
         )
 
+    def _store_upload(
+        self,
+        staged: StagedUpload,
+        filename: str,
+        content_type: str | None,
+        document_ids: list[str],
+        accepted_files: list[AcceptedFile],
+    ) -> None:
+        existing = self.repository.get_by_content_hash(staged.sha256)
+        if existing is not None:
+            if self._needs_upload_for_retry(existing):
+                saved = staged.commit(existing.id, existing.filename)
+                self.repository.set_storage_path(existing, str(saved.storage_path))
+            else:
+                staged.discard()
+            self._accept_duplicate(existing, filename, document_ids, accepted_files)
+            return
+
+        document_id = uuid4().hex
+        saved = staged.commit(document_id, filename)
+        logger.info("Dosya kaydedildi: %s (%s)", filename, document_id)
+        document = Document(
+            id=document_id,
+            filename=filename,
+            file_type=Path(filename).suffix.lower().lstrip("."),
+            mime_type=content_type or "application/octet-stream",
+            storage_path=str(saved.storage_path),
+            file_size=saved.file_size,
+            content_hash=saved.sha256,
+            status="processing",
+            language="unknown",
+        )
+        try:
+            self.repository.create(document)
+        except IntegrityError:
+            # A concurrent request stored the same content between lookup and insert.
+            self.repository.session.rollback()
+            existing = self.repository.get_by_content_hash(saved.sha256)
+            if existing is not None and self._needs_upload_for_retry(existing):
+                self.repository.set_storage_path(existing, str(saved.storage_path))
+            else:
+                self.storage_service.delete(saved.storage_path)
+            if existing is None:
+                raise
+            self._accept_duplicate(existing, filename, document_ids, accepted_files)
+            return
+        self.ingestion_queue.submit(document_id)
+
+        document_ids.append(document_id)
+        accepted_files.append(
+            AcceptedFile(
+                document_id=document_id,
+                filename=filename,
+                status=document.status,
+            )
+        )
+
+    async def _run_blocking(self, func: Callable[..., T], /, *args: Any) -> T:
+        if self.executors is not None:
+            return await self.executors.run_blocking(func, *args)
+        return await run_in_threadpool(func, *args)
+
     @staticmethod
-    async def _read_upload_file_limited(file: UploadFile, *, max_bytes: int) -> bytes | None:
-        # Read incrementally to avoid loading arbitrarily large uploads into memory.
-        buffer = bytearray()
+    def _needs_upload_for_retry(existing: Document) -> bool:
+        """A failed document retried without its stored file; the identical upload replaces it."""
+        return existing.status == "failed" and not Path(existing.storage_path).exists()
+
+    def _accept_duplicate(
+        self,
+        existing: Document,
+        filename: str,
+        document_ids: list[str],
+        accepted_files: list[AcceptedFile],
+    ) -> None:
+        if self.repository.add_alias(existing, filename):
+            logger.info("Ayni icerik yeni adla yuklendi: %s -> %s", filename, existing.id)
+        else:
+            logger.info("Ayni icerik tekrar yuklendi: %s (%s)", filename, existing.id)
+
+        if existing.status == "failed":
+            # Uploading the content again is how users retry a failed document.
+            logger.info("Basarisiz belge tekrar yuklendi, yeniden isleniyor: %s", existing.id)
+            try:
+                self.reindex_document(existing.id, full=True)
+            except (DocumentBusyError, FileNotFoundError) as exc:
+                logger.warning("Basarisiz belge yeniden kuyruga alinamadi: %s (%s)", existing.id, exc)
+
+        if existing.id not in document_ids:
+            document_ids.append(existing.id)
+        accepted_files.append(
+            AcceptedFile(
+                document_id=existing.id,
+                filename=filename,
+                status=existing.status,
+                duplicate=True,
+            )
+        )
+
+    def process_document(self, document_id: str) -> None:
+        """Run extract -> chunk -> embed -> upsert for a stored document.
+
+        Called from the ingestion workers; failures are recorded on the document row. When
+        the document already has extracted segments they are re-chunked instead of
+        extracting the file again, and chunks whose text did not change keep their vectors.
+        """
+        document = self.repository.get(document_id)
+        if document is None:
+            logger.warning("Islenecek belge bulunamadi: %s", document_id)
+            return
+
+        filename = document.filename
+        try:
+            stored_segments = self.segment_repository.list_for_document(document_id)
+            if stored_segments:
+                segments = [
+                    ExtractedSegment(page=segment.page, source=segment.source, text=segment.text)
+                    for segment in stored_segments
+                ]
+            else:
+                segments = self._extract_segments(document)
+            if not segments:
+                raise ValueError("Metin cikarimi basarisiz")
+
+            chunks = self._build_chunks(document_id, filename, segments)
+            if not chunks:
+                raise ValueError("Chunk olusturulamadi")
+
+            embeddings = self._chunk_embeddings(document_id, chunks)
+            # Unchanged chunks keep their ids, new ones get fresh ids; replacing the whole
+            # document drops vectors of chunks that no longer exist.
+            self.vector_store.delete([document_id])
+            self.vector_store.upsert(chunks, embeddings)
+            if self.lexical_index is not None:
+                self.lexical_index.replace_document(document_id, chunks)
+
+            full_text = "\n".join(segment.text for segment in segments)
+            language = self._detect_language(full_text)
+            # Segments, chunks and the status flip land in one transaction, written only after
+            # the slow extract/embed steps so the write lock is held briefly.
+            if not stored_segments:
+                self.segment_repository.replace_for_document(document_id, segments, commit=False)
+            self.chunk_repository.replace_for_document(document_id, chunks, commit=False)
+            self.repository.update_status(
+                document_id,
+                status="indexed",
+                language=language,
+                error_message=None,
+            )
+            logger.info("Belge indexlendi: %s (%s)", filename, document_id)
+        except Exception as exc:
+            self.repository.session.rollback()
+            if self.ingestion_queue.stopping:
+                # Cut short by shutdown; leaving it "processing" lets the next start resume it.
+                logger.warning("Belge isleme kapanis nedeniyle yarida kaldi: %s (%s)", filename, document_id)
+                return
+            logger.exception("Belge isleme hatasi: %s (%s)", filename, document_id)
+            self.repository.update_status(
+                document_id,
+                status="failed",
+                error_message=str(exc),
+            )
+        finally:
+            # Answers computed while the document was missing or stale must not outlive it.
+            self._invalidate_answers(document_id)
+
+    def _extract_segments(self, document: Document) -> list[ExtractedSegment]:
+        report = self.extractor.extract_with_report(Path(document.storage_path), document.file_type)
+        if report.page_timings:
+            slowest = max(
+                report.page_timings,
+                key=lambda timing: timing.native_seconds + timing.ocr_seconds,
+            )
+            logger.info(
+                "Extraction tamamlandi: %s sayfa=%d ocr=%d sure=%.2fs en_yavas_sayfa=%d",
+                document.id,
+                len(report.page_timings),
+                sum(1 for timing in report.page_timings if timing.source == "ocr"),
+                report.total_seconds,
+                slowest.page,
+            )
+        return report.segments
+
+    def _chunk_embeddings(self, document_id: str, chunks: list[ChunkPayload]) -> list[list[float]]:
+        """Embed only chunks whose content hash is new; reuse stored vectors for the rest."""
+        signature = self._embedding_signature()
+        for chunk in chunks:
+            chunk.content_hash = _content_hash(signature, chunk.text)
+
+        previous = self.chunk_repository.ids_by_content_hash(document_id)
+        reused_ids: list[str] = []
+        for chunk in chunks:
+            # pop: repeated identical chunks share one stored vector but need their own ids.
+            previous_id = previous.pop(chunk.content_hash, None)
+            if previous_id is not None:
+                chunk.id = previous_id
+                reused_ids.append(previous_id)
+
+        stored: dict[str, list[float]] = {}
+        if reused_ids:
+            try:
+                stored = self.vector_store.get_embeddings(reused_ids)
+            except Exception:
+                logger.warning("Kayitli vektorler okunamadi, tum chunklar embed edilecek: %s", document_id)
+
+        missing = [chunk for chunk in chunks if chunk.id not in stored]
+        if missing:
+            fresh = self._embed_chunks([chunk.text for chunk in missing])
+            stored.update(zip((chunk.id for chunk in missing), fresh, strict=True))
+        logger.info(
+            "Chunk embedding: %s toplam=%d yeniden_kullanilan=%d embed_edilen=%d",
+            document_id,
+            len(chunks),
+            len(chunks) - len(missing),
+            len(missing),
+        )
+        return [stored[chunk.id] for chunk in chunks]
+
+    def _embedding_signature(self) -> str:
+        # Vectors are only reusable while the embedding model and output size are the same.
+        return str(
+            getattr(self.ai_client, "embedding_space", None)
+            or getattr(self.ai_client, "embedding_model", "")
+        )
+
+    def _build_chunks(
+        self,
+        document_id: str,
+        filename: str,
+        segments: list[ExtractedSegment],
+    ) -> list[ChunkPayload]:
+        total_chars = sum(len(segment.text) for segment in segments)
+        if self.executors is None or total_chars < _CHUNK_IN_PROCESS_MIN_CHARS:
+            return self.chunk_builder.build(
+                document_id=document_id,
+                filename=filename,
+                segments=segments,
+            )
+        # Splitting very large documents is pure-Python CPU work; keep it off the GIL that
+        # API threads share.
+        return self.executors.run_cpu(
+            self.chunk_builder.build,
+            document_id=document_id,
+            filename=filename,
+            segments=segments,
+        )
+
+    def _embed_chunks(self, texts: list[str]) -> list[list[float]]:
+        if self.executors is None or self.executors.event_loop is None:
+            return self.ai_client.embed_texts(texts, task_type="retrieval_document")
+        # Batches fan out on the app loop over the shared Gemini connection pool instead
+        # of holding a thread per in-flight batch.
+        return self.executors.run_coroutine(
+            self.ai_client.aio.embed_texts(texts, task_type="retrieval_document")
+        )
+
+    def delete_document(self, document_id: str) -> bool:
+        document = self.repository.get(document_id)
+        if document is None:
+            return False
+        if self.ingestion_queue.is_pending(document_id):
+            raise DocumentBusyError("Belge hala isleniyor; islem bitince tekrar deneyin.")
+
+        # Vectors first: if this fails the document stays visible and can be retried.
+        self.vector_store.delete([document_id])
+        if self.lexical_index is not None:
+            self.lexical_index.delete([document_id])
+        storage_path = Path(document.storage_path)
+        self.repository.delete(document_id)
+        self.storage_service.delete(storage_path)
+        self._invalidate_answers(document_id)
+        logger.info("Belge silindi: %s (%s)", document.filename, document_id)
+        return True
+
+    def reindex_document(self, document_id: str, *, full: bool = False) -> DocumentDetail | None:
+        """Queue the document for indexing again.
+
+        By default the stored segments are re-chunked and only changed chunks are embedded;
+        ``full`` extracts the uploaded file again (needed after extractor/OCR changes).
+        """
+        document = self.repository.get(document_id)
+        if document is None:
+            return None
+        if self.ingestion_queue.is_pending(document_id):
+            raise DocumentBusyError("Belge zaten isleniyor.")
+        needs_file = full or not self.segment_repository.has_segments(document_id)
+        if needs_file and not Path(document.storage_path).exists():
+            raise FileNotFoundError("Belgenin yuklenen dosyasi bulunamadi; yeniden yukleyin.")
+
+        if full:
+            # Without stored segments the worker extracts the file again; committed together
+            # with the status flip below.
+            self.segment_repository.replace_for_document(document_id, [], commit=False)
+        self.repository.update_status(document_id, status="processing", error_message=None)
+        self._invalidate_answers(document_id)
+        self.ingestion_queue.submit(document_id)
+        return self.get_document(document_id)
+
+    def reindex_documents(self, *, full: bool = False) -> tuple[list[str], list[str]]:
+        """Queue every indexed or failed document; returns (queued ids, skipped ids)."""
+        queued: list[str] = []
+        skipped: list[str] = []
+        for status in ("indexed", "failed"):
+            for document_id in self.repository.list_ids_by_status(status):
+                try:
+                    self.reindex_document(document_id, full=full)
+                except (DocumentBusyError, FileNotFoundError):
+                    skipped.append(document_id)
+                    continue
+                queued.append(document_id)
+        logger.info("Toplu reindex: kuyruga=%d atlanan=%d", len(queued), len(skipped))
+        return queued, skipped
+
+    def _invalidate_answers(self, document_id: str) -> None:
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate_documents([document_id])
+
+    async def _stream_upload_file(
+        self,
+        file: UploadFile,
+        staged: StagedUpload,
+        *,
+        max_bytes: int,
+    ) -> bool:
+        """Copy the upload into ``staged`` chunk by chunk. Returns False once it exceeds max_bytes."""
         remaining = max(1, int(max_bytes))
-        chunk_size = min(1024 * 1024, remaining)
+        chunk_size = min(_UPLOAD_CHUNK_BYTES, remaining)
 
         while True:
             chunk = await file.read(chunk_size)
             if not chunk:
-                break
+                return True
 
             if len(chunk) > remaining:
-                return None
+                return False
 
-            buffer.extend(chunk)
+            await self._run_blocking(staged.write, chunk)
             remaining -= len(chunk)
             if remaining <= 0:
                 # Exactly at the limit: allow, but reject if the upload continues.
-                chunk = await file.read(1)
-                if chunk:
-                    return None
-                break
+                return not await file.read(1)
+
+    def catalog_version(self) -> int:
+        return self.repository.catalog_version()
 
-        return bytes(buffer)
+    def list_documents(
+        self,
+        *,
+        limit: int = 100,
+        cursor: str | None = None,
+        status: str | None = None,
+        file_type: str | None = None,
+        language: str | None = None,
+    ) -> tuple[list[DocumentSummary], str | None]:
+        """Return one page (newest first) and the cursor for the next page, if any."""
+        records = self.repository.list_page(
+            limit=limit + 1,
+            after=self._decode_cursor(cursor) if cursor else None,
+            status=status,
+            file_type=file_type.lower().lstrip(".") if file_type else None,
+            language=language,
+        )
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = self._encode_cursor(records[-1])
 
-    def list_documents(self) -> list[DocumentSummary]:
-        records = self.repository.list_all()
-        return [
+        summaries = [
             DocumentSummary(
                 id=record.id,
                 filename=record.filename,
@@ -187,6 +517,38 @@ class DocumentService:
             )
             for record in records
         ]
+        return summaries, next_cursor
+
+    @staticmethod
+    def _encode_cursor(record: Document) -> str:
+        raw = f"{record.created_at.isoformat()}|{record.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            created_at, document_id = raw.split("|", 1)
+            return datetime.fromisoformat(created_at), document_id
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ValueError("Gecersiz sayfa imleci.") from exc
+
+    def get_document(self, document_id: str) -> DocumentDetail | None:
+        record = self.repository.get(document_id)
+        if record is None:
+            return None
+        return DocumentDetail(
+            id=record.id,
+            filename=record.filename,
+            file_type=record.file_type,
+            language=record.language,
+            status=record.status,
+            created_at=record.created_at,
+            file_size=record.file_size,
+            error_message=record.error_message,
+            queued=self.ingestion_queue.is_pending(record.id),
+            aliases=[alias.filename for alias in record.aliases],
+        )
 
     @staticmethod
     def _detect_language(text: str) -> str:
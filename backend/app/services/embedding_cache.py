@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+# SQLite's default host-parameter limit is 999 on older builds; stay well below it.
+_LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache keyed by (model, task type, text hash).
+
+    Entries carry a last-used timestamp; once the table grows past ``max_entries`` the
+    least recently used rows are evicted. Vectors are stored as packed float32 blobs.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 50_000) -> None:
+        self.db_path = db_path
+        self.max_entries = max(1, int(max_entries))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, task_type: str, text: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, task_type, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get_many(self, model: str, task_type: str, texts: list[str]) -> list[list[float] | None]:
+        keys = [self.make_key(model, task_type, text) for text in texts]
+        found: dict[str, list[float]] = {}
+
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for offset in range(0, len(unique_keys), _LOOKUP_BATCH_SIZE):
+                batch = unique_keys[offset : offset + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+
+            if found:
+                now = time.time()
+                self._connection.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._connection.commit()
+
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(
+        self,
+        model: str,
+        task_type: str,
+        texts: list[str],
+        vectors: list[list[float]],
+    ) -> None:
+        if len(texts) != len(vectors):
+            raise ValueError("Metin sayisi ile embedding sayisi esit olmali")
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (self.make_key(model, task_type, text), array("f", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors, strict=True)
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows,
+            )
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                self._connection.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    " SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._connection.commit()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": self._count(),
+                "max_entries": self.max_entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _count(self) -> int:
+        return int(self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
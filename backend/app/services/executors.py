@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
+import anyio.to_thread
+
+T = TypeVar("T")
+
+
+class ExecutorPools:
+    """Shared executors that keep CPU-bound and blocking work off the event loop.
+
+    ``cpu`` is a process pool for pypdf parsing and chunking of large documents (None
+    when ``cpu_workers`` is 0, in which case that work runs inline). ``io`` is a bounded
+    thread pool for blocking DB, disk and network calls made from async code.
+    """
+
+    def __init__(self, cpu_workers: int = 2, blocking_io_workers: int = 32) -> None:
+        self.cpu_workers = max(0, int(cpu_workers))
+        self.blocking_io_workers = max(1, int(blocking_io_workers))
+        # "spawn" avoids forking a process that already runs ingestion threads; workers
+        # start lazily on the first submit.
+        self.cpu: Executor | None = (
+            ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if self.cpu_workers > 0
+            else None
+        )
+        self.io = ThreadPoolExecutor(
+            max_workers=self.blocking_io_workers,
+            thread_name_prefix="blocking-io",
+        )
+        # The app's event loop, attached in the lifespan; lets worker threads await
+        # coroutines (e.g. the async Gemini client) on the loop that owns its resources.
+        self.event_loop: asyncio.AbstractEventLoop | None = None
+
+    def run_cpu(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``func`` in the process pool and wait for it; arguments must be picklable."""
+        if self.cpu is None:
+            return func(*args, **kwargs)
+        return self.cpu.submit(func, *args, **kwargs).result()
+
+    async def run_blocking(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io, partial(func, *args, **kwargs))
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.event_loop = loop
+
+    def run_coroutine(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run ``coro`` on the attached event loop from a worker thread and wait for it."""
+        loop = self.event_loop
+        if loop is None or loop.is_closed():
+            coro.close()
+            raise RuntimeError("Event loop bagli degil")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            # Blocking here would deadlock the loop the coroutine needs.
+            coro.close()
+            raise RuntimeError("run_coroutine event loop icinden cagrilamaz")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def limit_framework_threads(self) -> None:
+        """Bound the thread pool FastAPI uses for sync endpoints to the same size.
+
+        Must be called from inside the running event loop (e.g. the app lifespan).
+        """
+        anyio.to_thread.current_default_thread_limiter().total_tokens = self.blocking_io_workers
+
+    def shutdown(self) -> None:
+        self.event_loop = None
+        if self.cpu is not None:
+            self.cpu.shutdown(cancel_futures=True)
+        self.io.shutdown(wait=False, cancel_futures=True)
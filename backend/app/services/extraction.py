@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from pypdf import PdfReader
+from pypdf import PageObject, PdfReader
 
 from .gemini import GeminiClient
 
+logger = logging.getLogger(__name__)
+
+# Pages handed to a single process-pool task. Each task reopens the PDF, so keep ranges
+# large enough that the per-task parse cost stays small next to text extraction.
+_PAGES_PER_TASK = 16
+
 
 @dataclass
 class ExtractedSegment:
@@ -15,84 +24,207 @@ class ExtractedSegment:
     text: str
 
 
+@dataclass
+class PageTiming:
+    page: int
+    source: str
+    native_seconds: float
+    ocr_seconds: float = 0.0
+
+
+@dataclass
+class ExtractionReport:
+    segments: list[ExtractedSegment]
+    page_timings: list[PageTiming] = field(default_factory=list)
+    total_seconds: float = 0.0
+
+
+@dataclass
+class _PageScan:
+    page: int
+    native_text: str
+    image: tuple[bytes, str] | None
+    native_seconds: float
+
+
 class DocumentExtractor:
-    def __init__(self, ai_client: GeminiClient, min_chars_before_ocr: int = 40) -> None:
+    def __init__(
+        self,
+        ai_client: GeminiClient,
+        min_chars_before_ocr: int = 40,
+        *,
+        page_executor: Executor | None = None,
+        parallel_min_pages: int = _PAGES_PER_TASK,
+        ocr_max_concurrency: int = 4,
+    ) -> None:
         self.ai_client = ai_client
         self.min_chars_before_ocr = min_chars_before_ocr
+        self.page_executor = page_executor
+        self.parallel_min_pages = max(1, parallel_min_pages)
+        self.ocr_max_concurrency = max(1, ocr_max_concurrency)
 
     def extract(self, file_path: Path, file_type: str) -> list[ExtractedSegment]:
+        return self.extract_with_report(file_path, file_type).segments
+
+    def extract_with_report(self, file_path: Path, file_type: str) -> ExtractionReport:
+        started = time.perf_counter()
         normalized = file_type.lower()
         if normalized == "pdf":
-            return self._extract_from_pdf(file_path)
-        if normalized in {"jpg", "jpeg", "png"}:
-            content = file_path.read_bytes()
+            report = self._extract_from_pdf(file_path)
+        elif normalized in {"jpg", "jpeg", "png"}:
             text = self.ai_client.extract_text_from_image(
-                image_bytes=content,
+                image_bytes=file_path,
                 mime_type=f"image/{'jpeg' if normalized in {'jpg', 'jpeg'} else 'png'}",
             )
-            return [ExtractedSegment(page=1, source="ocr", text=text)] if text else []
-
-        raise ValueError(f"Desteklenmeyen dosya tipi: {file_type}")
+            elapsed = time.perf_counter() - started
+            report = ExtractionReport(
+                segments=[ExtractedSegment(page=1, source="ocr", text=text)] if text else [],
+                page_timings=[PageTiming(page=1, source="ocr", native_seconds=0.0, ocr_seconds=elapsed)],
+            )
+        else:
+            raise ValueError(f"Desteklenmeyen dosya tipi: {file_type}")
 
-    def _extract_from_pdf(self, file_path: Path) -> list[ExtractedSegment]:
-        segments: list[ExtractedSegment] = []
-        reader = PdfReader(str(file_path))
+        report.total_seconds = time.perf_counter() - started
+        return report
 
-        for page_index, page in enumerate(reader.pages, start=1):
-            native_text = (page.extract_text() or "").strip()
+    def _extract_from_pdf(self, file_path: Path) -> ExtractionReport:
+        scans = self._scan_pdf(file_path)
+        ocr_results = self._run_ocr([scan for scan in scans if scan.image is not None])
 
+        segments: list[ExtractedSegment] = []
+        page_timings: list[PageTiming] = []
+        for scan in scans:
             # Never drop a page that has extractable text, even if it is short.
-            chosen_text = native_text
+            chosen_text = scan.native_text
             chosen_source = "native"
 
-            should_try_ocr = len(native_text) < self.min_chars_before_ocr
-            if should_try_ocr:
-                image_payload = self._extract_page_image(page)
-                if image_payload is not None:
-                    image_bytes, mime_type = image_payload
-                    ocr_text = self.ai_client.extract_text_from_image(
-                        image_bytes=image_bytes,
-                        mime_type=mime_type,
-                    ).strip()
-                    if ocr_text and len(ocr_text) > len(native_text):
-                        chosen_text = ocr_text
-                        chosen_source = "ocr"
+            ocr_text, ocr_seconds = ocr_results.get(scan.page, ("", 0.0))
+            if ocr_text and len(ocr_text) > len(scan.native_text):
+                chosen_text = ocr_text
+                chosen_source = "ocr"
 
             if chosen_text:
                 segments.append(
                     ExtractedSegment(
-                        page=page_index,
+                        page=scan.page,
                         source=chosen_source,
                         text=chosen_text,
                     )
                 )
+            page_timings.append(
+                PageTiming(
+                    page=scan.page,
+                    source=chosen_source,
+                    native_seconds=scan.native_seconds,
+                    ocr_seconds=ocr_seconds,
+                )
+            )
 
         if segments:
-            return segments
+            return ExtractionReport(segments=segments, page_timings=page_timings)
 
         # Some PDFs contain no extractable text or page images for pypdf;
         # in that case ask Gemini to parse the raw PDF bytes directly.
-        pdf_text = self.ai_client.extract_text_from_pdf(file_path.read_bytes())
+        pdf_text = self.ai_client.extract_text_from_pdf(file_path)
         if pdf_text:
             segments.append(ExtractedSegment(page=None, source="ocr_pdf", text=pdf_text))
 
-        return segments
+        return ExtractionReport(segments=segments, page_timings=page_timings)
+
+    def _scan_pdf(self, file_path: Path) -> list[_PageScan]:
+        path = str(file_path)
+        if self.page_executor is None:
+            return _scan_pdf_pages(path, 0, None, self.min_chars_before_ocr)
+
+        page_count = len(PdfReader(path).pages)
+        if page_count < self.parallel_min_pages:
+            return _scan_pdf_pages(path, 0, page_count, self.min_chars_before_ocr)
+
+        futures = [
+            self.page_executor.submit(
+                _scan_pdf_pages,
+                path,
+                start,
+                min(start + _PAGES_PER_TASK, page_count),
+                self.min_chars_before_ocr,
+            )
+            for start in range(0, page_count, _PAGES_PER_TASK)
+        ]
+        # Futures are consumed in submission order, so pages come back in document order.
+        scans: list[_PageScan] = []
+        for future in futures:
+            scans.extend(future.result())
+        return scans
+
+    def _run_ocr(self, scans: list[_PageScan]) -> dict[int, tuple[str, float]]:
+        if not scans:
+            return {}
+
+        workers = min(self.ocr_max_concurrency, len(scans))
+        if workers <= 1:
+            return {scan.page: self._ocr_page(scan) for scan in scans}
+
+        # Executor.map keeps at most `workers` Gemini calls in flight and preserves order.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as pool:
+            results = list(pool.map(self._ocr_page, scans))
+        return {scan.page: result for scan, result in zip(scans, results, strict=True)}
+
+    def _ocr_page(self, scan: _PageScan) -> tuple[str, float]:
+        assert scan.image is not None
+        image_bytes, mime_type = scan.image
+        started = time.perf_counter()
+        text = self.ai_client.extract_text_from_image(
+            image_bytes=image_bytes,
+            mime_type=mime_type,
+        ).strip()
+        return text, time.perf_counter() - started
+
+
+def _scan_pdf_pages(
+    file_path: str,
+    start: int,
+    stop: int | None,
+    min_chars_before_ocr: int,
+) -> list[_PageScan]:
+    # Module-level so it can run inside a process pool; PdfReader objects are not picklable.
+    reader = PdfReader(file_path)
+    pages = reader.pages
+    stop = len(pages) if stop is None else stop
+
+    scans: list[_PageScan] = []
+    for page_index in range(start, stop):
+        started = time.perf_counter()
+        page = pages[page_index]
+        native_text = (page.extract_text() or "").strip()
+        image = None
+        if len(native_text) < min_chars_before_ocr:
+            image = _extract_page_image(page)
+        scans.append(
+            _PageScan(
+                page=page_index + 1,
+                native_text=native_text,
+                image=image,
+                native_seconds=time.perf_counter() - started,
+            )
+        )
+    return scans
+
 
-    def _extract_page_image(self, page) -> tuple[bytes, str] | None:
-        images = getattr(page, "images", None)
-        if not images:
-            return None
+def _extract_page_image(page: PageObject) -> tuple[bytes, str] | None:
+    images = getattr(page, "images", None)
+    if not images:
+        return None
 
-        image_file = images[0]
-        image_name = getattr(image_file, "name", "") or ""
-        suffix = Path(image_name).suffix.lower()
+    image_file = images[0]
+    image_name = getattr(image_file, "name", "") or ""
+    suffix = Path(image_name).suffix.lower()
 
-        mime_type = "image/png"
-        if suffix in {".jpg", ".jpeg"}:
-            mime_type = "image/jpeg"
+    mime_type = "image/png"
+    if suffix in {".jpg", ".jpeg"}:
+        mime_type = "image/jpeg"
 
-        data = getattr(image_file, "data", None)
-        if not data:
-            return None
+    data = getattr(image_file, "data", None)
+    if not data:
+        return None
 
-        return data, mime_type
+    return data, mime_type
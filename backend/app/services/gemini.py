@@ -1,17 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 from pydantic import BaseModel, Field
 
+from .embedding_cache import EmbeddingCache
+
 try:
+    import httpx
     from google import genai
     from google.genai import types
 except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
     genai = None  # type: ignore[assignment]
     types = None  # type: ignore[assignment]
 
@@ -31,6 +44,13 @@ class GeminiResponseParseError(RuntimeError):
 logger = logging.getLogger(__name__)
 
 _EMBED_BATCH_SIZE = 100
+_RATE_WINDOW_SECONDS = 60.0
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_MAX_SECONDS = 30.0
+
+
+# Inline request parts are capped at 20 MB after base64 encoding (~4/3 growth).
+_INLINE_FILE_MAX_BYTES = 14 * 1024 * 1024
 
 
 class _AnswerPayload(BaseModel):
@@ -38,6 +58,112 @@ class _AnswerPayload(BaseModel):
     citation_ids: list[str] = Field(default_factory=list)
 
 
+def _build_answer_prompt(
+    question: str,
+    context_items: list[dict[str, Any]],
+    *,
+    citation_instruction: str,
+) -> str:
+    context_lines = []
+    for item in context_items:
+        pages = item["page"]
+        if item.get("page_end") not in (None, pages):
+            pages = f"{pages}-{item['page_end']}"
+        context_lines.append(
+            f"[{item['cid']}] dosya={item['filename']} sayfa={pages} metin={item['text']}"
+        )
+
+    return (
+        "Yalnizca asagidaki baglamdan yararlanarak soruyu cevapla. "
+        "Baglam disinda bilgi uretme. "
+        "Cevaplayamazsan tam olarak 'Bu bilgi belgede bulunamadi.' yaz.\n\n"
+        f"{citation_instruction}\n\n"
+        f"Soru: {question}\n\n"
+        "Baglam:\n"
+        + "\n".join(context_lines)
+    )
+
+
+_JSON_CITATION_INSTRUCTION = "Her iddia icin en az bir citation id ekle."
+_INLINE_CITATION_INSTRUCTION = (
+    "Her iddianin hemen arkasina dayandigi baglamin id'sini koseli parantez "
+    "icinde yaz, ornegin [C1]. JSON kullanma, duz metin yaz."
+)
+
+
+def _answer_config(http_options: Any) -> Any:
+    return types.GenerateContentConfig(
+        temperature=0.1,
+        response_mime_type="application/json",
+        response_schema=_AnswerPayload,
+        http_options=http_options,
+    )
+
+
+def _timeout_options(seconds: float) -> Any:
+    """Per-call HttpOptions carrying ``seconds`` as the request timeout; None when 0."""
+    if seconds <= 0:
+        return None
+    return types.HttpOptions(timeout=int(seconds * 1000))
+
+
+def _parse_answer(response: Any) -> dict[str, Any]:
+    parsed = getattr(response, "parsed", None)
+    if parsed is not None:
+        if isinstance(parsed, BaseModel):
+            return parsed.model_dump()
+        if isinstance(parsed, dict):
+            return parsed
+
+    raw_text = (getattr(response, "text", "") or "").strip()
+    if not raw_text:
+        raise GeminiResponseParseError("Gemini bos cevap dondurdu")
+
+    try:
+        return json.loads(raw_text)
+    except json.JSONDecodeError as exc:
+        raise GeminiResponseParseError("Gemini cevabi JSON parse edilemedi") from exc
+
+
+def _parse_embeddings(response: Any, expected: int) -> list[list[float]]:
+    embeddings = getattr(response, "embeddings", None) or []
+    if len(embeddings) != expected:
+        raise RuntimeError("Gemini embedding yaniti beklenen uzunlukta degil")
+
+    vectors: list[list[float]] = []
+    for embedding in embeddings:
+        values = getattr(embedding, "values", None)
+        if not values:
+            raise RuntimeError("Gemini embedding yaniti bos geldi")
+        vectors.append(list(values))
+    return vectors
+
+
+def _flatten_batches(batch_vectors: list[list[list[float]]], expected: int) -> list[list[float]]:
+    vectors = [vector for batch in batch_vectors for vector in batch]
+    if len(vectors) != expected:
+        raise RuntimeError("Gemini embedding yaniti beklenen uzunlukta degil")
+    return vectors
+
+
+def _missing_texts(texts: list[str], cached: list[list[float] | None]) -> list[str]:
+    # Identical texts (shared boilerplate pages, repeated questions) are embedded once.
+    return list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+
+
+def _merge_vectors(
+    texts: list[str],
+    cached: list[list[float] | None],
+    missing_texts: list[str],
+    fresh_vectors: list[list[float]],
+) -> list[list[float]]:
+    fresh_by_text = dict(zip(missing_texts, fresh_vectors, strict=True))
+    return [
+        vector if vector is not None else fresh_by_text[text]
+        for text, vector in zip(texts, cached, strict=True)
+    ]
+
+
 def _normalize_task_type(task_type: str) -> str:
     normalized = task_type.strip()
     lowered = normalized.lower()
@@ -51,12 +177,113 @@ def _normalize_task_type(task_type: str) -> str:
     return mapping.get(lowered, normalized)
 
 
+def _sleep(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def _async_sleep(seconds: float) -> None:
+    await asyncio.sleep(seconds)
+
+
+def _estimate_tokens(texts: list[str]) -> int:
+    # Rough heuristic (~4 chars per token); only used for client-side TPM pacing.
+    return max(1, sum(len(text) for text in texts) // 4)
+
+
+def _is_retryable_error(exc: Exception) -> bool:
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # google-genai lets httpx's own network and timeout errors through; they subclass
+    # neither builtin.
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if not isinstance(code, int):
+        return False
+    return code == 429 or 500 <= code < 600
+
+
+def _backoff_delay(attempt: int) -> float:
+    # Full jitter: spreads retries from concurrent batches instead of re-synchronizing them.
+    ceiling = min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * (2**attempt))
+    return random.uniform(0, ceiling)
+
+
+class _RateLimiter:
+    """Sliding one-minute window over request count and estimated tokens."""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.requests_per_minute = max(0, requests_per_minute)
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._events: deque[tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def acquire(self, tokens: int) -> None:
+        while (wait_seconds := self._try_acquire(tokens)) > 0:
+            _sleep(wait_seconds)
+
+    async def acquire_async(self, tokens: int) -> None:
+        while (wait_seconds := self._try_acquire(tokens)) > 0:
+            await _async_sleep(wait_seconds)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Record the request if it fits the window; otherwise return seconds to wait."""
+        if not self.enabled:
+            return 0.0
+
+        with self._lock:
+            now = self._clock()
+            while self._events and self._events[0][0] <= now - _RATE_WINDOW_SECONDS:
+                _, expired_tokens = self._events.popleft()
+                self._tokens_in_window -= expired_tokens
+
+            requests_ok = (
+                self.requests_per_minute <= 0
+                or len(self._events) < self.requests_per_minute
+            )
+            # A single batch larger than the whole budget is let through on an empty window.
+            tokens_ok = (
+                self.tokens_per_minute <= 0
+                or not self._events
+                or self._tokens_in_window + tokens <= self.tokens_per_minute
+            )
+            if requests_ok and tokens_ok:
+                self._events.append((now, tokens))
+                self._tokens_in_window += tokens
+                return 0.0
+
+            return max(self._events[0][0] + _RATE_WINDOW_SECONDS - now, 0.01)
+
+
 @dataclass
 class GeminiClient:
     api_key: str
     model_name: str
     embedding_model: str
     use_system_proxy: bool = False
+    embed_max_concurrency: int = 1
+    embed_requests_per_minute: int = 0
+    embed_tokens_per_minute: int = 0
+    embed_max_retries: int = 4
+    embedding_cache: EmbeddingCache | None = None
+    request_timeout_seconds: float = 120.0
+    # Multi-page OCR can legitimately take longer than embedding or answer calls; 0 = no limit.
+    ocr_timeout_seconds: float = 0.0
+    max_concurrency: int = 16
+    # Truncated (Matryoshka) embedding size sent as output_dimensionality; 0 = model default.
+    embedding_dimensions: int = 0
 
     def __post_init__(self) -> None:
         if not self.api_key:
@@ -71,41 +298,91 @@ class GeminiClient:
         if not self.use_system_proxy:
             self._clear_proxy_environment()
 
-        self._client = genai.Client(api_key=self.api_key)
+        # One keep-alive pool for every async call; its size doubles as the concurrency cap.
+        # Timeouts are set per call (see _request_options / _ocr_options), not on the pool.
+        self._async_http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max(1, self.max_concurrency),
+                max_keepalive_connections=max(1, self.max_concurrency),
+            ),
+            timeout=None,
+        )
+        self._client = genai.Client(
+            api_key=self.api_key,
+            http_options=types.HttpOptions(httpx_async_client=self._async_http),
+        )
+        self._request_options = _timeout_options(self.request_timeout_seconds)
+        self._ocr_options = _timeout_options(self.ocr_timeout_seconds)
+        self._embed_limiter = _RateLimiter(
+            self.embed_requests_per_minute,
+            self.embed_tokens_per_minute,
+        )
+        self.aio = AsyncGeminiClient(self)
+
+    @property
+    def embedding_space(self) -> str:
+        """Model and output size; vectors are only comparable within the same space."""
+        if self.embedding_dimensions > 0:
+            return f"{self.embedding_model}@{self.embedding_dimensions}"
+        return self.embedding_model
+
+    def _embed_config(self, normalized_task: str) -> Any:
+        return types.EmbedContentConfig(
+            task_type=normalized_task,
+            output_dimensionality=self.embedding_dimensions or None,
+            http_options=self._request_options,
+        )
 
     def close(self) -> None:
         close = getattr(self._client, "close", None)
         if callable(close):
             close()
 
-    def extract_text_from_image(self, image_bytes: bytes, mime_type: str) -> str:
+    async def aclose(self) -> None:
+        await self._async_http.aclose()
+        self.close()
+
+    def extract_text_from_image(self, image_bytes: bytes | Path, mime_type: str) -> str:
         prompt = (
             "Bu gorseldeki tum metni eksiksiz olarak cikar. "
             "Yorum ekleme, sadece metni dondur."
         )
-        response = self._client.models.generate_content(
-            model=self.model_name,
-            contents=[
-                prompt,
-                types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-            ],
-            config=types.GenerateContentConfig(temperature=0.0),
-        )
-        return (getattr(response, "text", "") or "").strip()
+        return self._extract_text(prompt, image_bytes, mime_type)
 
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
+    def extract_text_from_pdf(self, pdf_bytes: bytes | Path) -> str:
         prompt = (
             "Bu PDF belgesindeki tum metni eksiksiz cikar. "
             "Yorum ekleme, sadece metni dondur."
         )
-        response = self._client.models.generate_content(
-            model=self.model_name,
-            contents=[
-                prompt,
-                types.Part.from_bytes(data=pdf_bytes, mime_type="application/pdf"),
-            ],
-            config=types.GenerateContentConfig(temperature=0.0),
-        )
+        return self._extract_text(prompt, pdf_bytes, "application/pdf")
+
+    def _extract_text(self, prompt: str, source: bytes | Path, mime_type: str) -> str:
+        uploaded = None
+        if isinstance(source, Path):
+            if source.stat().st_size > _INLINE_FILE_MAX_BYTES:
+                # Too large for an inline request; the Files API streams it from disk.
+                uploaded = self._client.files.upload(
+                    file=str(source),
+                    config=types.UploadFileConfig(mime_type=mime_type, http_options=self._ocr_options),
+                )
+                part = uploaded
+            else:
+                part = types.Part.from_bytes(data=source.read_bytes(), mime_type=mime_type)
+        else:
+            part = types.Part.from_bytes(data=source, mime_type=mime_type)
+
+        try:
+            response = self._client.models.generate_content(
+                model=self.model_name,
+                contents=[prompt, part],
+                config=types.GenerateContentConfig(temperature=0.0, http_options=self._ocr_options),
+            )
+        finally:
+            if uploaded is not None:
+                try:
+                    self._client.files.delete(name=uploaded.name)
+                except Exception:
+                    logger.warning("Gemini gecici dosyasi silinemedi: %s", uploaded.name)
         return (getattr(response, "text", "") or "").strip()
 
     def embed_texts(
@@ -118,78 +395,78 @@ class GeminiClient:
             return []
 
         normalized_task = _normalize_task_type(task_type)
-        vectors: list[list[float]] = []
-
+        cache = self.embedding_cache
+        if cache is None:
+            return self._embed_uncached(texts, normalized_task)
+
+        cached = cache.get_many(self.embedding_space, normalized_task, texts)
+        missing_texts = _missing_texts(texts, cached)
+        if not missing_texts:
+            return _merge_vectors(texts, cached, [], [])
+        fresh_vectors = self._embed_uncached(missing_texts, normalized_task)
+        cache.put_many(self.embedding_space, normalized_task, missing_texts, fresh_vectors)
+        return _merge_vectors(texts, cached, missing_texts, fresh_vectors)
+
+    def _embed_uncached(self, texts: list[str], normalized_task: str) -> list[list[float]]:
         # Gemini batch embedding endpoint has a hard limit on the number of
         # requests per call (100). Split large inputs deterministically.
-        for offset in range(0, len(texts), _EMBED_BATCH_SIZE):
-            batch = texts[offset : offset + _EMBED_BATCH_SIZE]
-            response = self._client.models.embed_content(
-                model=self.embedding_model,
-                contents=batch,
-                config=types.EmbedContentConfig(task_type=normalized_task),
-            )
-            embeddings = getattr(response, "embeddings", None) or []
-            if len(embeddings) != len(batch):
-                raise RuntimeError("Gemini embedding yaniti beklenen uzunlukta degil")
-
-            for embedding in embeddings:
-                values = getattr(embedding, "values", None)
-                if not values:
-                    raise RuntimeError("Gemini embedding yaniti bos geldi")
-                vectors.append(list(values))
-
-        if len(vectors) != len(texts):
-            raise RuntimeError("Gemini embedding yaniti beklenen uzunlukta degil")
-
-        return vectors
+        batches = [
+            texts[offset : offset + _EMBED_BATCH_SIZE]
+            for offset in range(0, len(texts), _EMBED_BATCH_SIZE)
+        ]
+        workers = min(max(1, self.embed_max_concurrency), len(batches))
+        if workers == 1:
+            batch_vectors = [self._embed_batch(batch, normalized_task) for batch in batches]
+        else:
+            # Executor.map keeps `workers` batches in flight and yields results in input order.
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+                batch_vectors = list(
+                    pool.map(lambda batch: self._embed_batch(batch, normalized_task), batches)
+                )
+
+        return _flatten_batches(batch_vectors, len(texts))
+
+    def _embed_batch(self, batch: list[str], normalized_task: str) -> list[list[float]]:
+        estimated_tokens = _estimate_tokens(batch)
+        attempt = 0
+        while True:
+            self._embed_limiter.acquire(estimated_tokens)
+            try:
+                response = self._client.models.embed_content(
+                    model=self.embedding_model,
+                    contents=batch,
+                    config=self._embed_config(normalized_task),
+                )
+            except Exception as exc:
+                if attempt >= self.embed_max_retries or not _is_retryable_error(exc):
+                    raise
+                delay = _backoff_delay(attempt)
+                attempt += 1
+                logger.warning(
+                    "Gemini embedding istegi tekrar denenecek (deneme %d, %.1fs): %s",
+                    attempt,
+                    delay,
+                    exc,
+                )
+                _sleep(delay)
+                continue
+            return _parse_embeddings(response, len(batch))
 
     def answer_question(
         self,
         question: str,
         context_items: list[dict[str, Any]],
     ) -> dict[str, Any]:
-        context_lines = []
-        for item in context_items:
-            context_lines.append(
-                f"[{item['cid']}] dosya={item['filename']} sayfa={item['page']} metin={item['text']}"
-            )
-
-        prompt = (
-            "Yalnizca asagidaki baglamdan yararlanarak soruyu cevapla. "
-            "Baglam disinda bilgi uretme. "
-            "Cevaplayamazsan tam olarak 'Bu bilgi belgede bulunamadi.' yaz.\n\n"
-            "Her iddia icin en az bir citation id ekle.\n\n"
-            f"Soru: {question}\n\n"
-            "Baglam:\n"
-            + "\n".join(context_lines)
-        )
-
         response = self._client.models.generate_content(
             model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.1,
-                response_mime_type="application/json",
-                response_schema=_AnswerPayload,
+            contents=_build_answer_prompt(
+                question,
+                context_items,
+                citation_instruction=_JSON_CITATION_INSTRUCTION,
             ),
+            config=_answer_config(self._request_options),
         )
-
-        parsed = getattr(response, "parsed", None)
-        if parsed is not None:
-            if isinstance(parsed, BaseModel):
-                return parsed.model_dump()
-            if isinstance(parsed, dict):
-                return parsed
-
-        raw_text = (getattr(response, "text", "") or "").strip()
-        if not raw_text:
-            raise GeminiResponseParseError("Gemini bos cevap dondurdu")
-
-        try:
-            return json.loads(raw_text)
-        except json.JSONDecodeError as exc:
-            raise GeminiResponseParseError("Gemini cevabi JSON parse edilemedi") from exc
+        return _parse_answer(response)
 
     def _clear_proxy_environment(self) -> None:
         for key in (
@@ -201,3 +478,208 @@ class GeminiClient:
             "all_proxy",
         ):
             os.environ.pop(key, None)
+
+
+class AsyncGeminiClient:
+    """Awaitable counterpart of ``GeminiClient``, reached as ``GeminiClient.aio``.
+
+    Shares the parent's configuration, embedding cache and rate limiter, and sends
+    requests through the SDK's ``client.aio`` surface over one keep-alive connection
+    pool. At most ``max_concurrency`` calls are in flight; embedding and answer calls
+    are bounded by ``request_timeout_seconds`` and OCR calls by ``ocr_timeout_seconds``.
+    The semaphore is bound to the event
+    loop that first uses it, so use one client per loop (the app loop).
+    """
+
+    def __init__(self, parent: GeminiClient) -> None:
+        self._parent = parent
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def _models(self) -> Any:
+        return self._parent._client.aio.models
+
+    async def extract_text_from_image(self, image_bytes: bytes | Path, mime_type: str) -> str:
+        prompt = (
+            "Bu gorseldeki tum metni eksiksiz olarak cikar. "
+            "Yorum ekleme, sadece metni dondur."
+        )
+        return await self._extract_text(prompt, image_bytes, mime_type)
+
+    async def extract_text_from_pdf(self, pdf_bytes: bytes | Path) -> str:
+        prompt = (
+            "Bu PDF belgesindeki tum metni eksiksiz cikar. "
+            "Yorum ekleme, sadece metni dondur."
+        )
+        return await self._extract_text(prompt, pdf_bytes, "application/pdf")
+
+    async def _extract_text(self, prompt: str, source: bytes | Path, mime_type: str) -> str:
+        files = self._parent._client.aio.files
+        uploaded = None
+        if isinstance(source, Path):
+            if source.stat().st_size > _INLINE_FILE_MAX_BYTES:
+                async with self._slot(timeout_seconds=self._parent.ocr_timeout_seconds):
+                    uploaded = await files.upload(
+                        file=str(source),
+                        config=types.UploadFileConfig(
+                            mime_type=mime_type,
+                            http_options=self._parent._ocr_options,
+                        ),
+                    )
+                part = uploaded
+            else:
+                data = await asyncio.to_thread(source.read_bytes)
+                part = types.Part.from_bytes(data=data, mime_type=mime_type)
+        else:
+            part = types.Part.from_bytes(data=source, mime_type=mime_type)
+
+        try:
+            async with self._slot(timeout_seconds=self._parent.ocr_timeout_seconds):
+                response = await self._models.generate_content(
+                    model=self._parent.model_name,
+                    contents=[prompt, part],
+                    config=types.GenerateContentConfig(
+                        temperature=0.0,
+                        http_options=self._parent._ocr_options,
+                    ),
+                )
+        finally:
+            if uploaded is not None:
+                try:
+                    await files.delete(name=uploaded.name)
+                except Exception:
+                    logger.warning("Gemini gecici dosyasi silinemedi: %s", uploaded.name)
+        return (getattr(response, "text", "") or "").strip()
+
+    async def embed_texts(
+        self,
+        texts: list[str],
+        *,
+        task_type: str = "retrieval_document",
+    ) -> list[list[float]]:
+        if not texts:
+            return []
+
+        parent = self._parent
+        normalized_task = _normalize_task_type(task_type)
+        cache = parent.embedding_cache
+        if cache is None:
+            return await self._embed_uncached(texts, normalized_task)
+
+        # The cache is a local SQLite file; keep its I/O off the event loop.
+        cached = await asyncio.to_thread(
+            cache.get_many, parent.embedding_space, normalized_task, texts
+        )
+        missing_texts = _missing_texts(texts, cached)
+        if not missing_texts:
+            return _merge_vectors(texts, cached, [], [])
+        fresh_vectors = await self._embed_uncached(missing_texts, normalized_task)
+        await asyncio.to_thread(
+            cache.put_many, parent.embedding_space, normalized_task, missing_texts, fresh_vectors
+        )
+        return _merge_vectors(texts, cached, missing_texts, fresh_vectors)
+
+    async def _embed_uncached(self, texts: list[str], normalized_task: str) -> list[list[float]]:
+        batches = [
+            texts[offset : offset + _EMBED_BATCH_SIZE]
+            for offset in range(0, len(texts), _EMBED_BATCH_SIZE)
+        ]
+        per_call = asyncio.Semaphore(max(1, self._parent.embed_max_concurrency))
+
+        async def embed(batch: list[str]) -> list[list[float]]:
+            async with per_call:
+                return await self._embed_batch(batch, normalized_task)
+
+        # gather returns results in input order regardless of completion order.
+        batch_vectors = await asyncio.gather(*(embed(batch) for batch in batches))
+        return _flatten_batches(list(batch_vectors), len(texts))
+
+    async def _embed_batch(self, batch: list[str], normalized_task: str) -> list[list[float]]:
+        estimated_tokens = _estimate_tokens(batch)
+        attempt = 0
+        while True:
+            await self._parent._embed_limiter.acquire_async(estimated_tokens)
+            try:
+                async with self._slot():
+                    response = await self._models.embed_content(
+                        model=self._parent.embedding_model,
+                        contents=batch,
+                        config=self._parent._embed_config(normalized_task),
+                    )
+            except Exception as exc:
+                if attempt >= self._parent.embed_max_retries or not _is_retryable_error(exc):
+                    raise
+                delay = _backoff_delay(attempt)
+                attempt += 1
+                logger.warning(
+                    "Gemini embedding istegi tekrar denenecek (deneme %d, %.1fs): %s",
+                    attempt,
+                    delay,
+                    exc,
+                )
+                await _async_sleep(delay)
+                continue
+            return _parse_embeddings(response, len(batch))
+
+    async def answer_question(
+        self,
+        question: str,
+        context_items: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        async with self._slot():
+            response = await self._models.generate_content(
+                model=self._parent.model_name,
+                contents=_build_answer_prompt(
+                    question,
+                    context_items,
+                    citation_instruction=_JSON_CITATION_INSTRUCTION,
+                ),
+                config=_answer_config(self._parent._request_options),
+            )
+        return _parse_answer(response)
+
+    async def stream_answer(
+        self,
+        question: str,
+        context_items: list[dict[str, Any]],
+    ) -> AsyncIterator[str]:
+        # The slot is held for the whole stream; the HTTP read timeout bounds stalls.
+        async with self._slot(timeout_seconds=0):
+            stream = await self._models.generate_content_stream(
+                model=self._parent.model_name,
+                contents=_build_answer_prompt(
+                    question,
+                    context_items,
+                    citation_instruction=_INLINE_CITATION_INSTRUCTION,
+                ),
+                config=types.GenerateContentConfig(
+                    temperature=0.1,
+                    http_options=self._parent._request_options,
+                ),
+            )
+            async for chunk in stream:
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+
+    async def aclose(self) -> None:
+        await self._parent.aclose()
+
+    @asynccontextmanager
+    async def _slot(self, *, timeout_seconds: float | None = None) -> AsyncIterator[None]:
+        """Concurrency slot bounded by ``timeout_seconds`` (default: the request timeout; 0 = none)."""
+        seconds = self._parent.request_timeout_seconds if timeout_seconds is None else timeout_seconds
+        async with self._limiter():
+            if seconds > 0:
+                async with asyncio.timeout(seconds):
+                    yield
+            else:
+                yield
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(max(1, self._parent.max_concurrency))
+            self._semaphore_loop = loop
+        return self._semaphore
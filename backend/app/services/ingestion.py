@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionQueue:
+    """Bounded worker pool that runs the document ingestion pipeline off the request path.
+
+    The queue only knows document ids; ``processor`` is responsible for opening its own
+    DB session and running extract -> chunk -> embed -> upsert for that document.
+    """
+
+    def __init__(self, processor: Callable[[str], None], max_workers: int = 2) -> None:
+        self.processor = processor
+        self.max_workers = max(1, int(max_workers))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="ingestion",
+        )
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future[None]] = {}
+        self._stopping = threading.Event()
+
+    def submit(self, document_id: str) -> bool:
+        with self._lock:
+            if self._stopping.is_set():
+                return False
+            if document_id in self._futures:
+                # Already queued or running (e.g. recovery racing a fresh upload).
+                return False
+            future = self._executor.submit(self._run, document_id)
+            self._futures[document_id] = future
+        future.add_done_callback(lambda _: self._forget(document_id))
+        return True
+
+    def is_pending(self, document_id: str) -> bool:
+        with self._lock:
+            return document_id in self._futures
+
+    @property
+    def stopping(self) -> bool:
+        """True once shutdown started; jobs failing after this were cut short, not broken."""
+        return self._stopping.is_set()
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Block until every submitted job has finished. Returns False on timeout."""
+        with self._lock:
+            futures = list(self._futures.values())
+        if not futures:
+            return True
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def shutdown(self, *, wait_for_jobs: bool = False) -> None:
+        """Stop accepting jobs and drop queued ones; running jobs finish unless waited on.
+
+        Dropped documents stay ``processing`` in the DB and are resumed on the next start.
+        """
+        self._stopping.set()
+        self._executor.shutdown(wait=wait_for_jobs, cancel_futures=not wait_for_jobs)
+
+    def _run(self, document_id: str) -> None:
+        try:
+            self.processor(document_id)
+        except Exception:
+            # The processor records failures on the document row; this only guards the worker.
+            logger.exception("Ingestion isi beklenmedik sekilde sonlandi: %s", document_id)
+
+    def _forget(self, document_id: str) -> None:
+        with self._lock:
+            self._futures.pop(document_id, None)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from .chunking import ChunkPayload
+from .vector_store import RetrievedChunk
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# unicode61/remove_diacritics folds c/g/o/s/u variants but not the dotless i.
+_FOLD_TABLE = str.maketrans({"ı": "i", "İ": "i"})
+_MAX_QUERY_TOKENS = 32
+
+
+def fold_text(text: str) -> str:
+    return text.translate(_FOLD_TABLE).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(fold_text(text))
+
+
+class LexicalIndex:
+    """BM25 keyword index over document chunks backed by an SQLite FTS5 table.
+
+    Lives in its own SQLite file next to the app DB so it does not tie the main
+    database to SQLite. Only ``content`` is tokenized; the other columns are stored so
+    lexical hits can be returned without touching the main DB.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(chunk_fts)")}
+        if columns and not {"page_end", "chunk_index"} <= columns:
+            # FTS5 tables cannot be altered; the startup backfill rebuilds the dropped index.
+            self._connection.execute("DROP TABLE chunk_fts")
+        self._connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunk_fts USING fts5("
+            " content,"
+            " chunk_id UNINDEXED,"
+            " document_id UNINDEXED,"
+            " filename UNINDEXED,"
+            " page UNINDEXED,"
+            " page_end UNINDEXED,"
+            " chunk_index UNINDEXED,"
+            " text UNINDEXED,"
+            " tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self._connection.commit()
+
+    def replace_document(self, document_id: str, chunks: Iterable[ChunkPayload]) -> None:
+        rows = [
+            (
+                fold_text(chunk.text),
+                chunk.id,
+                chunk.document_id,
+                chunk.filename,
+                chunk.page,
+                chunk.page_end,
+                chunk.chunk_index,
+                chunk.text,
+            )
+            for chunk in chunks
+        ]
+        with self._lock:
+            self._connection.execute("DELETE FROM chunk_fts WHERE document_id = ?", (document_id,))
+            self._connection.executemany(
+                "INSERT INTO chunk_fts"
+                " (content, chunk_id, document_id, filename, page, page_end, chunk_index, text)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.commit()
+
+    def delete(self, document_ids: list[str]) -> None:
+        if not document_ids:
+            return
+        with self._lock:
+            self._connection.executemany(
+                "DELETE FROM chunk_fts WHERE document_id = ?",
+                [(document_id,) for document_id in document_ids],
+            )
+            self._connection.commit()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM chunk_fts LIMIT 1").fetchone() is None
+
+    def search(self, query: str, document_ids: list[str], top_k: int) -> list[RetrievedChunk]:
+        tokens = list(dict.fromkeys(tokenize(query)))[:_MAX_QUERY_TOKENS]
+        if not tokens or not document_ids or top_k <= 0:
+            return []
+
+        # OR of quoted terms: bm25 rewards chunks matching more (and rarer) terms, and quoting
+        # keeps FTS5 operators in user input from being interpreted.
+        match = " OR ".join(f'"{token}"' for token in tokens)
+        placeholders = ",".join("?" for _ in document_ids)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT chunk_id, document_id, filename, page, page_end, chunk_index, text,"
+                " bm25(chunk_fts)"
+                " FROM chunk_fts"
+                f" WHERE chunk_fts MATCH ? AND document_id IN ({placeholders})"
+                " ORDER BY bm25(chunk_fts) LIMIT ?",
+                (match, *document_ids, top_k),
+            ).fetchall()
+
+        return [
+            RetrievedChunk(
+                chunk_id=str(chunk_id),
+                document_id=str(document_id),
+                filename=str(filename),
+                page=int(page) if page is not None else None,
+                text=str(text),
+                # FTS5 bm25 is negative (lower is better); it is not a cosine distance and is
+                # replaced by the caller when fused with vector hits.
+                distance=float(score),
+                page_end=int(page_end) if page_end is not None else None,
+                chunk_index=int(chunk_index) if chunk_index is not None else None,
+            )
+            for chunk_id, document_id, filename, page, page_end, chunk_index, text, score in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[RetrievedChunk]],
+    *,
+    k: int = 60,
+) -> list[tuple[RetrievedChunk, float]]:
+    """Fuse ranked lists by summing 1 / (k + rank); the first list wins ties and payloads."""
+    scores: dict[str, float] = {}
+    chunks: dict[str, RetrievedChunk] = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            scores[chunk.chunk_id] = scores.get(chunk.chunk_id, 0.0) + 1.0 / (k + rank)
+            chunks.setdefault(chunk.chunk_id, chunk)
+
+    ordered = sorted(scores, key=lambda chunk_id: scores[chunk_id], reverse=True)
+    return [(chunks[chunk_id], scores[chunk_id]) for chunk_id in ordered]
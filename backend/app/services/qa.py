@@ -1,15 +1,55 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from statistics import mean
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
 
 from ..repositories import DocumentRepository
 from ..schemas import AskResponse, Citation
+from .answer_cache import AnswerCache, AnswerScope
+from .chunking import estimate_tokens
 from .gemini import GeminiClient
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from .reranking import Reranker
 from .vector_store import RetrievedChunk, VectorStoreProtocol
 
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_MODES = ("hybrid", "vector", "lexical")
+
+# The first retrieval pass fetches top_k * _FETCH_FACTOR hits; a second pass of up to
+# top_k * _WIDE_FETCH_FACTOR runs only when the cut-off still passed the distance threshold
+# but near-duplicates left fewer than top_k distinct chunks.
+_FETCH_FACTOR = 2
+_WIDE_FETCH_FACTOR = 6
+_MAX_FETCH = 90
+# A chunk sharing this fraction of its words with a better-ranked chunk adds nothing new.
+_NEAR_DUPLICATE_OVERLAP = 0.9
+# Adjacent chunks repeat at most this much text (ChunkBuilder overlap); longer is not searched.
+_MAX_OVERLAP_CHARS = 4000
+_MIN_OVERLAP_CHARS = 16
+
+# Streamed answers cite context inline, e.g. "[C1]" or "[C1, C3]".
+_CITATION_MARKER = re.compile(r"\[(C\d+(?:\s*,\s*C\d+)*)\]")
+
+# (event name, JSON payload) pairs produced by QAService.aask_stream.
+QAStreamEvent = tuple[str, dict[str, Any]]
+
+
+@dataclass
+class _AnswerContext:
+    chunks: list[RetrievedChunk]
+    context_items: list[dict[str, Any]]
+    citation_map: dict[str, Citation]
+
 
 class QAService:
     NO_EVIDENCE_ANSWER = "Bu bilgi belgede bulunamadi."
@@ -20,32 +60,415 @@ class QAService:
         vector_store: VectorStoreProtocol,
         ai_client: GeminiClient,
         retrieval_max_distance: float,
+        lexical_index: LexicalIndex | None = None,
+        retrieval_mode: str = "hybrid",
+        query_embedding_timeout: float = 0.0,
+        answer_cache: AnswerCache | None = None,
+        batch_concurrency: int = 8,
+        context_max_tokens: int = 0,
+        reranker: Reranker | None = None,
+        rerank_top_n: int = 0,
     ) -> None:
         self.document_repository = document_repository
         self.vector_store = vector_store
         self.ai_client = ai_client
         self.retrieval_max_distance = retrieval_max_distance
+        self.lexical_index = lexical_index
+        self.retrieval_mode = retrieval_mode if retrieval_mode in RETRIEVAL_MODES else "hybrid"
+        self.query_embedding_timeout = max(0.0, query_embedding_timeout)
+        self.answer_cache = answer_cache
+        self.batch_concurrency = max(1, int(batch_concurrency))
+        self.context_max_tokens = max(0, int(context_max_tokens))
+        self.reranker = reranker
+        # Context keeps at most this many chunks after reranking; 0 means top_k.
+        self.rerank_top_n = max(0, int(rerank_top_n))
 
-    def ask(self, question: str, document_ids: list[str], top_k: int) -> AskResponse:
-        documents = self.document_repository.list_by_ids(document_ids)
-        indexed_docs = {document.id: document for document in documents if document.status == "indexed"}
+    async def aask(self, question: str, document_ids: list[str], top_k: int) -> AskResponse:
+        """Awaits Gemini directly and runs DB/index lookups in the threadpool."""
+        scope = self._cache_scope(document_ids, top_k)
+        cached, query_embedding = await self._alookup_cache(question, scope)
+        if cached is not None:
+            return cached
+
+        timings: dict[str, float] = {}
+        context = await self._abuild_context(question, document_ids, top_k, query_embedding, timings)
+        if isinstance(context, AskResponse):
+            _log_timings(timings)
+            return self._remember(question, scope, context, query_embedding)
+
+        with _timed(timings, "generation"):
+            model_output = await self.ai_client.aio.answer_question(question, context.context_items)
+        _log_timings(timings)
+        response = self._finalize_output(model_output, context)
+        return self._remember(question, scope, response, query_embedding)
+
+    async def aask_stream(
+        self,
+        question: str,
+        document_ids: list[str],
+        top_k: int,
+    ) -> AsyncIterator[QAStreamEvent]:
+        """Retrieve eagerly, then return an event iterator: citations, tokens, done.
+
+        Retrieval is awaited before the iterator is handed out so DB/vector errors surface
+        as normal HTTP errors and the first event is ready as soon as retrieval finishes.
+        """
+        scope = self._cache_scope(document_ids, top_k)
+        cached, query_embedding = await self._alookup_cache(question, scope)
+        if cached is not None:
+            return _single_event(("done", cached.model_dump()))
+
+        timings: dict[str, float] = {}
+        context = await self._abuild_context(question, document_ids, top_k, query_embedding, timings)
+        return self._astream_events(question, context, scope, query_embedding, timings)
+
+    async def aask_batch(
+        self,
+        questions: list[str],
+        document_ids: list[str],
+        top_k: int,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Answer many questions over the same documents; results are yielded as they finish.
+
+        Retrieval is shared: one embedding call for all uncached questions and one
+        multi-query vector search. Generations then run concurrently, at most
+        ``batch_concurrency`` at a time. Every result carries the question's ``index``.
+        """
+        scope = self._cache_scope(document_ids, top_k)
+        ready: list[dict[str, Any]] = []
+        pending: list[tuple[int, str]] = []
+        for index, question in enumerate(questions):
+            cached = self._exact_cache_hit(question, scope)
+            if cached is not None:
+                ready.append(_batch_item(index, question, cached))
+            else:
+                pending.append((index, question))
+
+        jobs: list[_BatchJob] = []
+        if pending:
+            indexed_ids = await run_in_threadpool(self._indexed_document_ids, document_ids)
+            if not indexed_ids:
+                logger.info("QA no_evidence: indexed belge bulunamadi")
+                ready.extend(
+                    _batch_item(index, question, self._no_evidence_response())
+                    for index, question in pending
+                )
+            else:
+                jobs = await self._aretrieve_batch(pending, indexed_ids, top_k, scope)
+
+        generations: list[_BatchJob] = []
+        for job in jobs:
+            if not isinstance(job.context, AskResponse):
+                generations.append(job)
+                continue
+            response = job.context
+            if not response.cached:
+                response = self._remember(job.question, scope, response, job.query_embedding)
+            ready.append(_batch_item(job.index, job.question, response))
+        return self._abatch_events(ready, generations, scope)
+
+    async def _aretrieve_batch(
+        self,
+        pending: list[tuple[int, str]],
+        document_ids: list[str],
+        top_k: int,
+        scope: AnswerScope | None,
+    ) -> list[_BatchJob]:
+        jobs = [_BatchJob(index=index, question=question) for index, question in pending]
+        # Totals for the whole batch; stages run once for all questions.
+        timings: dict[str, float] = {}
+        if self.retrieval_mode != "lexical":
+            try:
+                with _timed(timings, "embedding"):
+                    embeddings = await self.ai_client.aio.embed_texts(
+                        [job.question for job in jobs],
+                        task_type="retrieval_query",
+                    )
+            except Exception as exc:
+                logger.warning("QA toplu soru embedding'i alinamadi, lexical sonuclarla devam: %r", exc)
+            else:
+                for job, embedding in zip(jobs, embeddings, strict=True):
+                    job.query_embedding = embedding
+                    if self._semantic_lookup_enabled(scope):
+                        job.context = self._semantic_cache_hit(embedding, scope)
+
+        searching = [job for job in jobs if job.context is None]
+        count = top_k * _FETCH_FACTOR
+        await self._asearch_batch(searching, document_ids, count, timings)
+        widening = [
+            job
+            for job in searching
+            if job.retrieved is not None
+            and self._needs_wider_fetch(job.retrieved, job.vector_hits, count, top_k)
+        ]
+        if widening:
+            await self._asearch_batch(widening, document_ids, self._wide_fetch_count(top_k), timings)
+
+        def assemble() -> None:
+            for job in searching:
+                # Same fallback as a single question: without any hits the question fails.
+                if job.retrieved is not None:
+                    job.context = self._assemble_context(job.question, job.retrieved, top_k, timings)
+
+        await run_in_threadpool(assemble)
+        _log_timings(timings)
+        return jobs
+
+    async def _asearch_batch(
+        self,
+        jobs: list[_BatchJob],
+        document_ids: list[str],
+        count: int,
+        timings: dict[str, float],
+    ) -> None:
+        """Set ``retrieved`` on every job from one multi-query vector search plus lexical hits."""
+        if not jobs:
+            return
+        with _timed(timings, "lexical"):
+            lexical_hits = await run_in_threadpool(
+                lambda: [self._lexical_hits(job.question, document_ids, count) for job in jobs]
+            )
+        embedded = [job for job in jobs if job.query_embedding is not None]
+        vector_hits: dict[int, list[RetrievedChunk]] = {}
+        if embedded and self.retrieval_mode != "lexical":
+            try:
+                with _timed(timings, "vector"):
+                    results = await run_in_threadpool(
+                        self.vector_store.query_many,
+                        [job.query_embedding for job in embedded],
+                        document_ids,
+                        count,
+                    )
+            except Exception as exc:
+                logger.warning("QA toplu vector retrieval kullanilamadi, lexical sonuclarla devam: %r", exc)
+            else:
+                vector_hits = {job.index: hits for job, hits in zip(embedded, results, strict=True)}
+
+        for job, hits in zip(jobs, lexical_hits, strict=True):
+            job.vector_hits = vector_hits.get(job.index)
+            if job.index in vector_hits:
+                job.retrieved = self._fuse(vector_hits[job.index], hits, count)
+            elif self.retrieval_mode == "lexical" or (hits and job.retrieved is None):
+                job.retrieved = self._as_lexical_evidence(hits)
 
-        if not indexed_docs:
+    async def _abatch_events(
+        self,
+        ready: list[dict[str, Any]],
+        jobs: list[_BatchJob],
+        scope: AnswerScope | None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        for item in ready:
+            yield item
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        tasks = [asyncio.ensure_future(self._abatch_answer(job, scope, semaphore)) for job in jobs]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # The client went away: do not keep generating answers nobody will read.
+            for task in tasks:
+                task.cancel()
+
+    async def _abatch_answer(
+        self,
+        job: _BatchJob,
+        scope: AnswerScope | None,
+        semaphore: asyncio.Semaphore,
+    ) -> dict[str, Any]:
+        context = job.context
+        timings: dict[str, float] = {}
+        try:
+            if not isinstance(context, _AnswerContext):
+                raise RuntimeError("Soru icin retrieval yapilamadi")
+            async with semaphore:
+                with _timed(timings, "generation"):
+                    model_output = await self.ai_client.aio.answer_question(job.question, context.context_items)
+            response = self._finalize_output(model_output, context)
+        except Exception:
+            logger.exception("QA toplu cevap hatasi (soru %d)", job.index)
+            return {"index": job.index, "question": job.question, "error": "Cevap uretilirken hata olustu."}
+        _log_timings(timings)
+        response = self._remember(job.question, scope, response, job.query_embedding)
+        return _batch_item(job.index, job.question, response)
+
+    async def _astream_events(
+        self,
+        question: str,
+        context: _AnswerContext | AskResponse,
+        scope: AnswerScope | None,
+        query_embedding: list[float] | None,
+        timings: dict[str, float],
+    ) -> AsyncIterator[QAStreamEvent]:
+        if isinstance(context, AskResponse):
+            _log_timings(timings)
+            yield "done", self._remember(question, scope, context, query_embedding).model_dump()
+            return
+
+        yield "citations", self._citations_event(context)
+
+        parts: list[str] = []
+        started = time.perf_counter()
+        async for text in self.ai_client.aio.stream_answer(question, context.context_items):
+            if not parts:
+                timings["first_token"] = time.perf_counter() - started
+            parts.append(text)
+            yield "token", {"text": text}
+        timings["generation"] = time.perf_counter() - started
+        _log_timings(timings)
+
+        response = self._finalize_stream("".join(parts), context)
+        yield "done", self._remember(question, scope, response, query_embedding).model_dump()
+
+    @staticmethod
+    def _citations_event(context: _AnswerContext) -> dict[str, Any]:
+        return {
+            "used_chunks": len(context.chunks),
+            "citations": [
+                {"cid": cid, **citation.model_dump()} for cid, citation in context.citation_map.items()
+            ],
+        }
+
+    def _cache_scope(self, document_ids: list[str], top_k: int) -> AnswerScope | None:
+        if self.answer_cache is None:
+            return None
+        model = str(getattr(self.ai_client, "model_name", ""))
+        return self.answer_cache.make_scope(document_ids, top_k, model)
+
+    async def _alookup_cache(
+        self,
+        question: str,
+        scope: AnswerScope | None,
+    ) -> tuple[AskResponse | None, list[float] | None]:
+        """Return (cached answer, query embedding computed for the semantic lookup)."""
+        cached = self._exact_cache_hit(question, scope)
+        if cached is not None or not self._semantic_lookup_enabled(scope):
+            return cached, None
+
+        try:
+            query_embedding = await self._aembed_query(question, allow_timeout=False)
+        except Exception as exc:
+            # Retrieval will try again (and may fall back to lexical hits).
+            logger.warning("QA semantic cache icin embedding alinamadi: %r", exc)
+            return None, None
+        return self._semantic_cache_hit(query_embedding, scope), query_embedding
+
+    def _exact_cache_hit(self, question: str, scope: AnswerScope | None) -> AskResponse | None:
+        if self.answer_cache is None or scope is None:
+            return None
+        cached = self.answer_cache.get(question, scope)
+        if cached is None:
+            return None
+        logger.info("QA answer cache hit")
+        return cached.model_copy(update={"cached": True})
+
+    def _semantic_lookup_enabled(self, scope: AnswerScope | None) -> bool:
+        return (
+            self.answer_cache is not None
+            and scope is not None
+            and self.answer_cache.semantic_enabled
+            and self.retrieval_mode != "lexical"
+        )
+
+    def _semantic_cache_hit(self, query_embedding: list[float], scope: AnswerScope) -> AskResponse | None:
+        cached = self.answer_cache.find_similar(query_embedding, scope) if self.answer_cache else None
+        if cached is None:
+            return None
+        logger.info("QA answer cache semantic hit")
+        return cached.model_copy(update={"cached": True})
+
+    def _remember(
+        self,
+        question: str,
+        scope: AnswerScope | None,
+        response: AskResponse,
+        query_embedding: list[float] | None,
+    ) -> AskResponse:
+        if self.answer_cache is not None and scope is not None:
+            self.answer_cache.put(question, scope, response, query_embedding)
+        return response
+
+    async def _abuild_context(
+        self,
+        question: str,
+        document_ids: list[str],
+        top_k: int,
+        query_embedding: list[float] | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> _AnswerContext | AskResponse:
+        indexed_ids = await run_in_threadpool(self._indexed_document_ids, document_ids)
+        if not indexed_ids:
             logger.info("QA no_evidence: indexed belge bulunamadi")
             return self._no_evidence_response()
 
-        query_embedding = self.ai_client.embed_texts(
-            [question],
-            task_type="retrieval_query",
-        )[0]
-        # Fetch more than requested so we still have enough chunks after distance filtering.
-        retrieval_count = top_k * 2
-        retrieved = self.vector_store.query(
+        # Fetch more than requested so we still have enough chunks after filtering, and
+        # widen once (reusing the query embedding) only if too few distinct chunks remain.
+        count = top_k * _FETCH_FACTOR
+        retrieval = await self._aretrieve(
+            question,
+            indexed_ids,
+            count,
             query_embedding=query_embedding,
-            document_ids=list(indexed_docs.keys()),
-            top_k=retrieval_count,
+            timings=timings,
         )
+        if self._needs_wider_fetch(retrieval.hits, retrieval.vector_hits, count, top_k):
+            retrieval = await self._aretrieve(
+                question,
+                indexed_ids,
+                self._wide_fetch_count(top_k),
+                query_embedding=retrieval.query_embedding,
+                timings=timings,
+            )
+        # Reranking may read stored vectors (disk/Chroma), so it stays off the event loop.
+        return await run_in_threadpool(self._assemble_context, question, retrieval.hits, top_k, timings)
+
+    def _needs_wider_fetch(
+        self,
+        retrieved: list[RetrievedChunk],
+        vector_hits: list[RetrievedChunk] | None,
+        count: int,
+        top_k: int,
+    ) -> bool:
+        """Whether a wider pass can add distinct passing chunks.
+
+        ``retrieved`` is in fused (RRF) order with lexical hits placed at the threshold, so
+        saturation and the cut-off are judged on the distance-ranked vector hits alone.
+        """
+        if not retrieved or count >= self._wide_fetch_count(top_k):
+            return False
+        if self.retrieval_mode == "lexical":
+            ranked = retrieved
+        elif vector_hits is None:
+            # Vector search failed; retrying it wider would only fail again.
+            return False
+        else:
+            ranked = vector_hits
+            if max((chunk.distance for chunk in ranked), default=0.0) > self.retrieval_max_distance:
+                # Hits further out than the current ones would be filtered too.
+                return False
+        if len(ranked) < count:
+            # Everything selectable was already returned.
+            return False
+        # More usable hits may follow; widen only if repeats leave fewer than top_k
+        # distinct passing chunks.
+        passing = [chunk for chunk in retrieved if chunk.distance <= self.retrieval_max_distance]
+        return len(_drop_near_duplicates(passing, limit=top_k)) < top_k
+
+    @staticmethod
+    def _wide_fetch_count(top_k: int) -> int:
+        return min(top_k * _WIDE_FETCH_FACTOR, _MAX_FETCH)
 
+    def _indexed_document_ids(self, document_ids: list[str]) -> list[str]:
+        documents = self.document_repository.list_by_ids(document_ids)
+        return [document.id for document in documents if document.status == "indexed"]
+
+    def _assemble_context(
+        self,
+        question: str,
+        retrieved: list[RetrievedChunk],
+        top_k: int,
+        timings: dict[str, float] | None = None,
+    ) -> _AnswerContext | AskResponse:
         if not retrieved:
             logger.info("QA no_evidence: retrieval hic sonuc dondurmedi")
             return self._no_evidence_response()
@@ -53,8 +476,6 @@ class QAService:
         # Prefer high-quality chunks within the configured distance threshold, but avoid false
         # negatives by falling back to the best-ranked chunks when everything is filtered out.
         passing_chunks = [chunk for chunk in retrieved if chunk.distance <= self.retrieval_max_distance]
-        filtered_chunks = (passing_chunks[:top_k] if passing_chunks else retrieved[:top_k])
-
         if not passing_chunks:
             distances = [chunk.distance for chunk in retrieved]
             min_distance = min(distances) if distances else float("inf")
@@ -65,6 +486,26 @@ class QAService:
                 self.retrieval_max_distance,
             )
 
+        candidates = passing_chunks or retrieved
+        limit = min(top_k, self.rerank_top_n) if self.rerank_top_n else top_k
+        if self.reranker is None:
+            selected = _drop_near_duplicates(candidates, limit=limit)
+        else:
+            with _timed(timings, "rerank"):
+                distinct = _drop_near_duplicates(candidates, limit=len(candidates))
+                selected = self.reranker.rerank(question, distinct, limit)
+        merged = _merge_adjacent(selected)
+        filtered_chunks = self._within_token_budget(merged)
+        if len(filtered_chunks) != len(candidates[:limit]):
+            logger.info(
+                "QA context plani: aday=%d esik_gecen=%d secilen=%d birlesik=%d butce_sonrasi=%d",
+                len(retrieved),
+                len(passing_chunks),
+                len(selected),
+                len(merged),
+                len(filtered_chunks),
+            )
+
         context_items = []
         citation_map: dict[str, Citation] = {}
         for index, chunk in enumerate(filtered_chunks, start=1):
@@ -76,6 +517,7 @@ class QAService:
                     "document_id": chunk.document_id,
                     "filename": chunk.filename,
                     "page": chunk.page,
+                    "page_end": chunk.page_end,
                     "text": chunk.text,
                 }
             )
@@ -85,34 +527,154 @@ class QAService:
                 page=chunk.page,
                 chunk_id=chunk.chunk_id,
                 snippet=self._snippet(chunk.text),
+                page_end=chunk.page_end,
             )
 
-        model_output = self.ai_client.answer_question(question, context_items)
+        return _AnswerContext(
+            chunks=filtered_chunks,
+            context_items=context_items,
+            citation_map=citation_map,
+        )
+
+    def _within_token_budget(self, chunks: list[RetrievedChunk]) -> list[RetrievedChunk]:
+        """Keep chunks in rank order while they fit ``context_max_tokens``; the best one always."""
+        if self.context_max_tokens <= 0:
+            return chunks
+        kept: list[RetrievedChunk] = []
+        used = 0
+        for chunk in chunks:
+            tokens = estimate_tokens(chunk.text)
+            if kept and used + tokens > self.context_max_tokens:
+                continue
+            kept.append(chunk)
+            used += tokens
+        return kept
+
+    def _finalize_output(self, model_output: dict[str, Any], context: _AnswerContext) -> AskResponse:
         answer = str(model_output.get("answer", "")).strip()
         selected_ids = model_output.get("citation_ids", [])
 
         if not isinstance(selected_ids, list):
             selected_ids = []
 
-        citations = [citation_map[cid] for cid in selected_ids if cid in citation_map]
+        return self._finalize(answer, selected_ids, context)
+
+    def _finalize_stream(self, raw_answer: str, context: _AnswerContext) -> AskResponse:
+        selected_ids = list(
+            dict.fromkeys(
+                cid
+                for group in _CITATION_MARKER.findall(raw_answer)
+                for cid in re.split(r"\s*,\s*", group)
+            )
+        )
+        answer = _CITATION_MARKER.sub("", raw_answer)
+        answer = re.sub(r"\s+([.,;:!?])", r"\1", " ".join(answer.split()))
+        return self._finalize(answer, selected_ids, context)
+
+    def _finalize(
+        self,
+        answer: str,
+        selected_ids: list[object],
+        context: _AnswerContext,
+    ) -> AskResponse:
+        citations = [context.citation_map[cid] for cid in selected_ids if cid in context.citation_map]
+        used_chunks = len(context.chunks)
 
         if not citations or not answer:
             logger.info("QA no_evidence: citation veya cevap bos")
-            return self._no_evidence_response(used_chunks=len(filtered_chunks))
+            return self._no_evidence_response(used_chunks=used_chunks)
 
         if answer.lower() == self.NO_EVIDENCE_ANSWER.lower():
             logger.info("QA no_evidence: model baglam disi oldugunu bildirdi")
-            return self._no_evidence_response(used_chunks=len(filtered_chunks))
+            return self._no_evidence_response(used_chunks=used_chunks)
 
-        confidence = self._calculate_confidence(filtered_chunks, citations)
+        confidence = self._calculate_confidence(context.chunks, citations)
 
         return AskResponse(
             answer=answer,
             mode="grounded_answer",
             citations=citations,
             confidence=confidence,
-            used_chunks=len(filtered_chunks),
+            used_chunks=used_chunks,
+        )
+
+    async def _aretrieve(
+        self,
+        question: str,
+        document_ids: list[str],
+        count: int,
+        *,
+        query_embedding: list[float] | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> _Retrieval:
+        with _timed(timings, "lexical"):
+            lexical_hits = await run_in_threadpool(self._lexical_hits, question, document_ids, count)
+        if self.retrieval_mode == "lexical":
+            return _Retrieval(hits=self._as_lexical_evidence(lexical_hits))
+
+        try:
+            if query_embedding is None:
+                with _timed(timings, "embedding"):
+                    query_embedding = await self._aembed_query(question, allow_timeout=bool(lexical_hits))
+            with _timed(timings, "vector"):
+                vector_hits = await run_in_threadpool(
+                    self.vector_store.query,
+                    query_embedding=query_embedding,
+                    document_ids=document_ids,
+                    top_k=count,
+                )
+        except Exception as exc:
+            if not lexical_hits:
+                raise
+            logger.warning("QA vector retrieval kullanilamadi, lexical sonuclarla devam: %r", exc)
+            return _Retrieval(hits=self._as_lexical_evidence(lexical_hits))
+
+        return _Retrieval(
+            hits=self._fuse(vector_hits, lexical_hits, count),
+            query_embedding=query_embedding,
+            vector_hits=vector_hits,
+        )
+
+    def _lexical_hits(self, question: str, document_ids: list[str], count: int) -> list[RetrievedChunk]:
+        if self.lexical_index is None or self.retrieval_mode == "vector":
+            return []
+        try:
+            return self.lexical_index.search(question, document_ids, count)
+        except Exception:
+            logger.exception("QA lexical retrieval basarisiz")
+            return []
+
+    def _fuse(
+        self,
+        vector_hits: list[RetrievedChunk],
+        lexical_hits: list[RetrievedChunk],
+        count: int,
+    ) -> list[RetrievedChunk]:
+        if not lexical_hits:
+            return vector_hits
+
+        vector_ids = {chunk.chunk_id for chunk in vector_hits}
+        fused = reciprocal_rank_fusion([vector_hits, lexical_hits])
+        return [
+            chunk if chunk.chunk_id in vector_ids else self._as_lexical_evidence([chunk])[0]
+            for chunk, _ in fused[:count]
+        ]
+
+    async def _aembed_query(self, question: str, *, allow_timeout: bool) -> list[float]:
+        embedding = asyncio.ensure_future(
+            self.ai_client.aio.embed_texts([question], task_type="retrieval_query")
         )
+        if not allow_timeout or self.query_embedding_timeout <= 0:
+            return (await embedding)[0]
+
+        # Shielded: an abandoned call still finishes and warms the embedding cache.
+        embedding.add_done_callback(_consume_result)
+        return (await asyncio.wait_for(asyncio.shield(embedding), self.query_embedding_timeout))[0]
+
+    def _as_lexical_evidence(self, chunks: list[RetrievedChunk]) -> list[RetrievedChunk]:
+        # Keyword-only hits have no cosine distance; place them exactly at the threshold so
+        # they pass filtering but rank behind (and score lower than) close vector hits.
+        return [replace(chunk, distance=self.retrieval_max_distance) for chunk in chunks]
 
     def _calculate_confidence(
         self,
@@ -145,3 +707,142 @@ class QAService:
     def _snippet(text: str, size: int = 220) -> str:
         compact = " ".join(text.split())
         return compact[:size]
+
+
+@dataclass
+class _Retrieval:
+    # Fused ranking handed to context assembly.
+    hits: list[RetrievedChunk]
+    # Both None when vector search was skipped or failed.
+    query_embedding: list[float] | None = None
+    vector_hits: list[RetrievedChunk] | None = None
+
+
+@dataclass
+class _BatchJob:
+    index: int
+    question: str
+    query_embedding: list[float] | None = None
+    retrieved: list[RetrievedChunk] | None = None
+    vector_hits: list[RetrievedChunk] | None = None
+    context: _AnswerContext | AskResponse | None = None
+
+
+def _batch_item(index: int, question: str, response: AskResponse) -> dict[str, Any]:
+    return {"index": index, "question": question, **response.model_dump()}
+
+
+def _drop_near_duplicates(chunks: list[RetrievedChunk], *, limit: int) -> list[RetrievedChunk]:
+    """First ``limit`` chunks in rank order, skipping ones that repeat a better-ranked chunk."""
+    kept: list[RetrievedChunk] = []
+    kept_words: list[set[str]] = []
+    for chunk in chunks:
+        words = set(tokenize(chunk.text))
+        if any(_word_overlap(words, other) >= _NEAR_DUPLICATE_OVERLAP for other in kept_words):
+            continue
+        kept.append(chunk)
+        kept_words.append(words)
+        if len(kept) >= limit:
+            break
+    return kept
+
+
+def _word_overlap(left: set[str], right: set[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / min(len(left), len(right))
+
+
+def _merge_adjacent(chunks: list[RetrievedChunk]) -> list[RetrievedChunk]:
+    """Merge hits that are consecutive chunks of one document into a single item.
+
+    A merged item takes the place of its best-ranked member and its best distance, and
+    covers the members' page range.
+    """
+    runs: dict[str, list[RetrievedChunk]] = {}
+    run_of: dict[str, str] = {}
+    previous: RetrievedChunk | None = None
+    ordered = sorted(
+        (chunk for chunk in chunks if chunk.chunk_index is not None),
+        key=lambda chunk: (chunk.document_id, chunk.chunk_index),
+    )
+    for chunk in ordered:
+        if (
+            previous is not None
+            and previous.document_id == chunk.document_id
+            and chunk.chunk_index == previous.chunk_index + 1
+        ):
+            run_id = run_of[previous.chunk_id]
+            runs[run_id].append(chunk)
+        else:
+            run_id = chunk.chunk_id
+            runs[run_id] = [chunk]
+        run_of[chunk.chunk_id] = run_id
+        previous = chunk
+
+    merged: list[RetrievedChunk] = []
+    emitted: set[str] = set()
+    for chunk in chunks:
+        run_id = run_of.get(chunk.chunk_id)
+        if run_id is None:
+            merged.append(chunk)
+        elif run_id not in emitted:
+            emitted.add(run_id)
+            merged.append(_merge_run(runs[run_id]))
+    return merged
+
+
+def _merge_run(run: list[RetrievedChunk]) -> RetrievedChunk:
+    if len(run) == 1:
+        return run[0]
+    text = run[0].text
+    for chunk in run[1:]:
+        text = _join_overlapping(text, chunk.text)
+    last = run[-1]
+    return replace(
+        run[0],
+        text=text,
+        distance=min(chunk.distance for chunk in run),
+        page_end=last.page_end if last.page_end is not None else last.page,
+    )
+
+
+def _join_overlapping(left: str, right: str) -> str:
+    """Concatenate consecutive chunks, dropping the overlap ``right`` repeats from ``left``."""
+    if right:
+        first = right[0]
+        for position in range(max(0, len(left) - _MAX_OVERLAP_CHARS), len(left) - _MIN_OVERLAP_CHARS + 1):
+            # Carried overlap starts at a piece boundary, i.e. after whitespace.
+            if left[position] != first or (position and not left[position - 1].isspace()):
+                continue
+            if right.startswith(left[position:]):
+                return left + right[len(left) - position :]
+    return f"{left}\n\n{right}"
+
+
+@contextmanager
+def _timed(timings: dict[str, float] | None, stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def _log_timings(timings: dict[str, float]) -> None:
+    if timings:
+        logger.info(
+            "QA sureleri (ms): %s",
+            " ".join(f"{stage}={seconds * 1000:.0f}" for stage, seconds in timings.items()),
+        )
+
+
+async def _single_event(event: QAStreamEvent) -> AsyncIterator[QAStreamEvent]:
+    yield event
+
+
+def _consume_result(future: asyncio.Future[Any]) -> None:
+    # Marks the exception of an abandoned call as retrieved so asyncio does not log it.
+    if not future.cancelled():
+        future.exception()
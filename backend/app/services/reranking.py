@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+import math
+from collections import Counter
+from typing import Protocol
+
+import numpy as np
+
+from .lexical_index import tokenize
+from .vector_store import RetrievedChunk, VectorStoreProtocol
+
+logger = logging.getLogger(__name__)
+
+RERANKERS = ("lexical_mmr", "none")
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+class Reranker(Protocol):
+    name: str
+
+    def rerank(self, question: str, chunks: list[RetrievedChunk], limit: int) -> list[RetrievedChunk]: ...
+
+
+class PassthroughReranker:
+    """Keeps retrieval order; the stage costs nothing."""
+
+    name = "none"
+
+    def rerank(self, question: str, chunks: list[RetrievedChunk], limit: int) -> list[RetrievedChunk]:
+        return chunks[:limit]
+
+
+class LexicalMMRReranker:
+    """CPU-only reranker: BM25 against the question blended with vector similarity,
+    then Maximal Marginal Relevance so near-identical chunks do not fill the context.
+
+    BM25 statistics come from the candidate set itself. Diversity uses the chunks'
+    stored embeddings when the vector store can return them, word overlap otherwise.
+    """
+
+    name = "lexical_mmr"
+
+    def __init__(
+        self,
+        vector_store: VectorStoreProtocol | None = None,
+        *,
+        mmr_lambda: float = 0.7,
+        lexical_weight: float = 0.5,
+    ) -> None:
+        self.vector_store = vector_store
+        self.mmr_lambda = min(1.0, max(0.0, float(mmr_lambda)))
+        self.lexical_weight = min(1.0, max(0.0, float(lexical_weight)))
+
+    def rerank(self, question: str, chunks: list[RetrievedChunk], limit: int) -> list[RetrievedChunk]:
+        if limit <= 0:
+            return []
+        if len(chunks) <= 1:
+            return chunks[:limit]
+
+        tokens = [tokenize(chunk.text) for chunk in chunks]
+        relevance = self._relevance(question, chunks, tokens)
+        similarity = self._similarity(chunks, tokens)
+
+        selected: list[int] = []
+        # Highest similarity of each candidate to anything already selected.
+        redundancy = np.zeros(len(chunks), dtype=np.float32)
+        available = np.ones(len(chunks), dtype=bool)
+        while len(selected) < min(limit, len(chunks)):
+            scores = self.mmr_lambda * relevance - (1.0 - self.mmr_lambda) * redundancy
+            scores[~available] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            available[best] = False
+            redundancy = np.maximum(redundancy, similarity[best])
+        return [chunks[index] for index in selected]
+
+    def _relevance(
+        self,
+        question: str,
+        chunks: list[RetrievedChunk],
+        tokens: list[list[str]],
+    ) -> np.ndarray:
+        lexical = _bm25_scores(tokenize(question), tokens)
+        peak = float(lexical.max()) if lexical.size else 0.0
+        if peak > 0:
+            lexical = lexical / peak
+        vector = np.array([1.0 - chunk.distance for chunk in chunks], dtype=np.float32).clip(0.0, 1.0)
+        return self.lexical_weight * lexical + (1.0 - self.lexical_weight) * vector
+
+    def _similarity(self, chunks: list[RetrievedChunk], tokens: list[list[str]]) -> np.ndarray:
+        vectors = self._embeddings(chunks)
+        if vectors is not None:
+            return np.clip(vectors @ vectors.T, 0.0, 1.0)
+
+        word_sets = [set(chunk_tokens) for chunk_tokens in tokens]
+        similarity = np.zeros((len(chunks), len(chunks)), dtype=np.float32)
+        for row, left in enumerate(word_sets):
+            for column in range(row + 1, len(word_sets)):
+                right = word_sets[column]
+                union = len(left | right)
+                similarity[row, column] = similarity[column, row] = len(left & right) / union if union else 0.0
+        return similarity
+
+    def _embeddings(self, chunks: list[RetrievedChunk]) -> np.ndarray | None:
+        if self.vector_store is None:
+            return None
+        try:
+            stored = self.vector_store.get_embeddings([chunk.chunk_id for chunk in chunks])
+        except Exception as exc:
+            logger.warning("Rerank icin vektorler okunamadi, kelime benzerligi kullanilacak: %r", exc)
+            return None
+        if any(chunk.chunk_id not in stored for chunk in chunks):
+            return None
+        matrix = np.array([stored[chunk.chunk_id] for chunk in chunks], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+def create_reranker(
+    name: str,
+    *,
+    vector_store: VectorStoreProtocol | None = None,
+    mmr_lambda: float = 0.7,
+) -> Reranker:
+    if name == "none":
+        return PassthroughReranker()
+    if name == "lexical_mmr":
+        return LexicalMMRReranker(vector_store, mmr_lambda=mmr_lambda)
+    raise ValueError(f"Bilinmeyen reranker: {name!r} (gecerli degerler: {', '.join(RERANKERS)})")
+
+
+def _bm25_scores(query_tokens: list[str], documents: list[list[str]]) -> np.ndarray:
+    scores = np.zeros(len(documents), dtype=np.float32)
+    terms = set(query_tokens)
+    if not terms or not documents:
+        return scores
+
+    counts = [Counter(document) for document in documents]
+    average_length = sum(len(document) for document in documents) / len(documents) or 1.0
+    for term in terms:
+        frequency = sum(1 for document_counts in counts if term in document_counts)
+        if not frequency:
+            continue
+        idf = math.log(1.0 + (len(documents) - frequency + 0.5) / (frequency + 0.5))
+        for index, document_counts in enumerate(counts):
+            occurrences = document_counts.get(term, 0)
+            if not occurrences:
+                continue
+            length_norm = 1.0 - _BM25_B + _BM25_B * len(documents[index]) / average_length
+            scores[index] += idf * occurrences * (_BM25_K1 + 1.0) / (occurrences + _BM25_K1 * length_norm)
+    return scores
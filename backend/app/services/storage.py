@@ -1,27 +1,107 @@
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
+_STAGING_PREFIX = ".upload-"
+_STAGING_SUFFIX = ".part"
+
 
 @dataclass
 class SavedFile:
     storage_path: Path
     file_size: int
+    sha256: str = ""
+
+
+class StagedUpload:
+    """Upload being written to a temp file in the upload dir, hashed and sized on the fly.
+
+    ``commit`` renames it into place atomically; ``discard`` removes the partial file.
+    """
+
+    def __init__(self, storage: FileStorageService) -> None:
+        self._storage = storage
+        handle, path = tempfile.mkstemp(
+            dir=storage.upload_dir,
+            prefix=_STAGING_PREFIX,
+            suffix=_STAGING_SUFFIX,
+        )
+        self.temp_path = Path(path)
+        self._file = os.fdopen(handle, "wb")
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._digest.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self, document_id: str, filename: str) -> SavedFile:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        storage_path = self._storage.path_for(document_id, filename)
+        os.replace(self.temp_path, storage_path)
+        return SavedFile(storage_path=storage_path, file_size=self.size, sha256=self.sha256)
+
+    def discard(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        self.temp_path.unlink(missing_ok=True)
 
 
 class FileStorageService:
-    def __init__(self, upload_dir: Path) -> None:
+    def __init__(self, upload_dir: Path, stale_upload_seconds: float = 3600.0) -> None:
         self.upload_dir = upload_dir
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_uploads(stale_upload_seconds)
 
     def save(self, document_id: str, filename: str, content: bytes) -> SavedFile:
+        staged = self.stage()
+        try:
+            staged.write(content)
+            return staged.commit(document_id, filename)
+        except BaseException:
+            staged.discard()
+            raise
+
+    def stage(self) -> StagedUpload:
+        return StagedUpload(self)
+
+    def path_for(self, document_id: str, filename: str) -> Path:
         safe_name = self._sanitize_filename(filename)
-        storage_name = f"{document_id}_{safe_name}"
-        storage_path = self.upload_dir / storage_name
-        storage_path.write_bytes(content)
-        return SavedFile(storage_path=storage_path, file_size=len(content))
+        return self.upload_dir / f"{document_id}_{safe_name}"
+
+    def delete(self, storage_path: Path) -> bool:
+        path = Path(storage_path).resolve()
+        # Only ever remove files this service wrote.
+        if path.parent != self.upload_dir.resolve():
+            return False
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _remove_stale_uploads(self, max_age_seconds: float) -> None:
+        # Partial files left by a crashed worker; recent ones may belong to a live upload.
+        cutoff = time.time() - max_age_seconds
+        for path in self.upload_dir.glob(f"{_STAGING_PREFIX}*{_STAGING_SUFFIX}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
 
     def _sanitize_filename(self, filename: str) -> str:
         cleaned = re.sub(r"[^a-zA-Z0-9._-]", "_", filename).strip("._")
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
 import json
-import math
+import logging
 import os
+import threading
+from contextlib import nullcontext
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Protocol
 
+import numpy as np
+
 from .chunking import ChunkPayload
 
+logger = logging.getLogger(__name__)
+
+_COMPACTION_BATCH_ROWS = 4096
+
+VECTOR_STORAGE_DTYPES = ("float32", "float16", "int8")
+_STORAGE_SUFFIXES = {"float32": "f32", "float16": "f16", "int8": "i8"}
+# A quantized scan shortlists this many candidates per hit for the float32 rescoring pass.
+_RESCORE_FACTOR = 4
+
 
 @dataclass
 class RetrievedChunk:
@@ -18,6 +31,9 @@ class RetrievedChunk:
     page: int | None
     text: str
     distance: float
+    page_end: int | None = None
+    # Position within the document; lets adjacent hits be merged. None if the source lacks it.
+    chunk_index: int | None = None
 
 
 class VectorStoreProtocol(Protocol):
@@ -30,11 +46,35 @@ class VectorStoreProtocol(Protocol):
         top_k: int,
     ) -> list[RetrievedChunk]: ...
 
+    def query_many(
+        self,
+        query_embeddings: list[list[float]],
+        document_ids: list[str],
+        top_k: int,
+    ) -> list[list[RetrievedChunk]]: ...
+
+    def delete(self, document_ids: list[str]) -> None: ...
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, list[float]]: ...
+
     def ping(self) -> bool: ...
 
 
 class ChromaVectorStore:
-    def __init__(self, persist_dir: Path, collection_name: str = "document_chunks") -> None:
+    """Chroma HNSW collection with an exact-search fallback for small selections.
+
+    A document-filtered ANN search may return fewer than ``top_k`` hits when the selection
+    is a tiny part of the collection. Queries that come back short are scored exactly
+    against the selected documents' vectors, if the selection has at most
+    ``exact_search_max_chunks`` chunks; full HNSW results never pay for that fetch.
+    """
+
+    def __init__(
+        self,
+        persist_dir: Path,
+        collection_name: str = "document_chunks",
+        exact_search_max_chunks: int = 200,
+    ) -> None:
         # Chroma product telemetry can break noisily due to dependency mismatches (posthog SDK)
         # and is not needed for this case study MVP.
         os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
@@ -45,6 +85,7 @@ class ChromaVectorStore:
             name=collection_name,
             metadata={"hnsw:space": "cosine"},
         )
+        self.exact_search_max_chunks = max(0, int(exact_search_max_chunks))
 
     def upsert(self, chunks: list[ChunkPayload], embeddings: list[list[float]]) -> None:
         if not chunks:
@@ -64,6 +105,8 @@ class ChromaVectorStore:
             }
             if chunk.page is not None:
                 metadata["page"] = chunk.page
+            if chunk.page_end is not None:
+                metadata["page_end"] = chunk.page_end
             metadatas.append(metadata)
 
         self.collection.upsert(
@@ -79,39 +122,143 @@ class ChromaVectorStore:
         document_ids: list[str],
         top_k: int,
     ) -> list[RetrievedChunk]:
-        if not document_ids:
-            return []
+        return self.query_many([query_embedding], document_ids, top_k)[0]
 
+    def query_many(
+        self,
+        query_embeddings: list[list[float]],
+        document_ids: list[str],
+        top_k: int,
+    ) -> list[list[RetrievedChunk]]:
+        if not document_ids or not query_embeddings:
+            return [[] for _ in query_embeddings]
+
+        # One collection.query call answers every query embedding.
         result = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=top_k,
             where={"document_id": {"$in": document_ids}},
             include=["metadatas", "documents", "distances"],
         )
 
-        metadatas = result.get("metadatas", [[]])[0]
-        documents = result.get("documents", [[]])[0]
-        distances = result.get("distances", [[]])[0]
-        ids = result.get("ids", [[]])[0]
-
-        chunks: list[RetrievedChunk] = []
-        for index, chunk_id in enumerate(ids):
-            metadata = metadatas[index] if index < len(metadatas) else {}
-            text = documents[index] if index < len(documents) else ""
-            distance = distances[index] if index < len(distances) else 1.0
-
-            chunks.append(
-                RetrievedChunk(
-                    chunk_id=chunk_id,
-                    document_id=str(metadata.get("document_id", "")),
-                    filename=str(metadata.get("filename", "")),
-                    page=metadata.get("page"),
-                    text=text,
-                    distance=float(distance),
+        all_ids = result.get("ids") or []
+        all_metadatas = result.get("metadatas") or []
+        all_documents = result.get("documents") or []
+        all_distances = result.get("distances") or []
+
+        results: list[list[RetrievedChunk]] = []
+        for position in range(len(query_embeddings)):
+            ids = all_ids[position] if position < len(all_ids) else []
+            metadatas = all_metadatas[position] if position < len(all_metadatas) else []
+            documents = all_documents[position] if position < len(all_documents) else []
+            distances = all_distances[position] if position < len(all_distances) else []
+
+            chunks: list[RetrievedChunk] = []
+            for index, chunk_id in enumerate(ids):
+                metadata = metadatas[index] if index < len(metadatas) else {}
+                text = documents[index] if index < len(documents) else ""
+                distance = distances[index] if index < len(distances) else 1.0
+
+                chunks.append(
+                    RetrievedChunk(
+                        chunk_id=chunk_id,
+                        document_id=str(metadata.get("document_id", "")),
+                        filename=str(metadata.get("filename", "")),
+                        page=metadata.get("page"),
+                        text=text,
+                        distance=float(distance),
+                        page_end=metadata.get("page_end"),
+                        chunk_index=metadata.get("chunk_index"),
+                    )
                 )
+            results.append(chunks)
+
+        short = [position for position, chunks in enumerate(results) if len(chunks) < top_k]
+        if short:
+            selection = self._exact_search_selection(
+                document_ids,
+                min(len(results[position]) for position in short),
             )
+            if selection is not None:
+                short_queries = [query_embeddings[position] for position in short]
+                exact = self._exact_query_many(selection, short_queries, top_k)
+                for position, chunks in zip(short, exact, strict=True):
+                    results[position] = chunks
+
+        return results
+
+    def _exact_search_selection(self, document_ids: list[str], returned: int) -> dict[str, Any] | None:
+        """Vectors and payloads of the selected documents when HNSW missed some of them.
+
+        None when the selection is too large for exact search, or when it has no more
+        chunks than the shortest ANN result already returned.
+        """
+        if self.exact_search_max_chunks <= 0:
+            return None
+        where = {"document_id": {"$in": list(document_ids)}}
+        # Ids only, capped one past the limit: the count decides before any vector is read.
+        probe = self.collection.get(where=where, include=[], limit=self.exact_search_max_chunks + 1)
+        chunk_ids = list(probe.get("ids") or [])
+        if len(chunk_ids) > self.exact_search_max_chunks or len(chunk_ids) <= returned:
+            return None
+        return self.collection.get(ids=chunk_ids, include=["embeddings", "metadatas", "documents"])
+
+    @staticmethod
+    def _exact_query_many(
+        selection: dict[str, Any],
+        query_embeddings: list[list[float]],
+        top_k: int,
+    ) -> list[list[RetrievedChunk]]:
+        chunk_ids = list(selection.get("ids") or [])
+        if not chunk_ids or top_k <= 0:
+            return [[] for _ in query_embeddings]
+
+        metadatas = selection.get("metadatas") or [{} for _ in chunk_ids]
+        documents = selection.get("documents") or ["" for _ in chunk_ids]
+        vectors = _normalize_rows(np.array(selection["embeddings"], dtype=np.float32))
+        queries = _normalize_rows(np.array(query_embeddings, dtype=np.float32))
+        similarities = vectors @ queries.T
+
+        k = min(top_k, len(chunk_ids))
+        results: list[list[RetrievedChunk]] = []
+        for column in similarities.T:
+            best = np.argpartition(-column, k - 1)[:k] if k < len(chunk_ids) else np.arange(k)
+            best = best[np.argsort(-column[best], kind="stable")]
+            chunks: list[RetrievedChunk] = []
+            for position in best:
+                metadata = metadatas[position] or {}
+                chunks.append(
+                    RetrievedChunk(
+                        chunk_id=str(chunk_ids[position]),
+                        document_id=str(metadata.get("document_id", "")),
+                        filename=str(metadata.get("filename", "")),
+                        page=metadata.get("page"),
+                        text=documents[position] or "",
+                        # Same cosine distance Chroma reports for an "hnsw:space: cosine" collection.
+                        distance=float(np.clip(1.0 - column[position], 0.0, 2.0)),
+                        page_end=metadata.get("page_end"),
+                        chunk_index=metadata.get("chunk_index"),
+                    )
+                )
+            results.append(chunks)
+        return results
 
-        return chunks
+    def delete(self, document_ids: list[str]) -> None:
+        if not document_ids:
+            return
+        self.collection.delete(where={"document_id": {"$in": list(document_ids)}})
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, list[float]]:
+        if not chunk_ids:
+            return {}
+        result = self.collection.get(ids=list(chunk_ids), include=["embeddings"])
+        embeddings = result.get("embeddings")
+        if embeddings is None:
+            return {}
+        return {
+            str(chunk_id): [float(value) for value in embedding]
+            for chunk_id, embedding in zip(result.get("ids", []), embeddings, strict=False)
+        }
 
     def ping(self) -> bool:
         try:
@@ -121,28 +268,113 @@ class ChromaVectorStore:
             return False
 
 
-class LocalJsonVectorStore:
-    def __init__(self, persist_path: Path) -> None:
-        self.persist_path = persist_path
-        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
-        self._records: dict[str, dict[str, Any]] = {}
+class LocalVectorStore:
+    """Append-only, memory-mapped fallback vector store.
+
+    On-disk layout inside ``persist_dir`` (``<gen>`` is bumped by every compaction):
+
+    - ``manifest.json``: current generation, embedding dimension and storage dtype
+    - ``vectors-<gen>.f32``: raw float32 rows, L2-normalized, opened with ``np.memmap``;
+      ``.f16`` (float16) or ``.i8`` (int8 values plus a float32 scale per row) when
+      ``storage_dtype`` quantizes the scanned rows
+    - ``full-<gen>.f32``: float32 copy of quantized rows when ``rescore`` is on; only the
+      shortlisted rows of a query are read from it
+    - ``meta-<gen>.jsonl``: one JSON line per row; a later row with the same chunk id
+      supersedes the earlier one
+
+    Upserts only append to both files. Superseded rows stay on disk as dead rows until a
+    background compaction rewrites the live rows, grouped by document, into a new
+    generation. Rows of one upsert are contiguous, so each document maps to a short list
+    of ``[start, stop)`` row ranges and a query is one matrix-vector product over them.
+    """
+
+    def __init__(
+        self,
+        persist_dir: Path,
+        *,
+        legacy_json_path: Path | None = None,
+        compact_min_dead_rows: int = 1000,
+        compact_dead_ratio: float = 0.25,
+        storage_dtype: str = "float32",
+        rescore: bool = True,
+    ) -> None:
+        self.persist_dir = persist_dir
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        self.compact_min_dead_rows = max(1, compact_min_dead_rows)
+        self.compact_dead_ratio = compact_dead_ratio
+        self.storage_dtype = storage_dtype if storage_dtype in VECTOR_STORAGE_DTYPES else "float32"
+        self.rescore = rescore
+        self._lock = threading.RLock()
+        self._compaction_thread: threading.Thread | None = None
+        self._generation = 0
+        self._dimension = 0
+        self._dtype, self._full_precision = self._target_layout()
         self._load()
+        if self._dimension and (self._dtype, self._full_precision) != self._target_layout():
+            self._convert_layout()
+        if legacy_json_path is not None:
+            self._migrate_legacy_json(legacy_json_path)
+
+    @property
+    def row_count(self) -> int:
+        return len(self._row_meta)
+
+    @property
+    def dead_row_count(self) -> int:
+        return len(self._row_meta) - self._live_rows
+
+    @property
+    def vector_bytes(self) -> int:
+        """Size of the rows a query scans (excludes the float32 rescoring copy)."""
+        return self.row_count * _row_dtype(self._dtype, self._dimension).itemsize if self._dimension else 0
 
     def upsert(self, chunks: list[ChunkPayload], embeddings: list[list[float]]) -> None:
         if len(chunks) != len(embeddings):
             raise ValueError("Chunk sayisi ile embedding sayisi esit olmali")
+        if not chunks:
+            return
 
-        for chunk, embedding in zip(chunks, embeddings, strict=True):
-            self._records[chunk.id] = {
-                "chunk_id": chunk.id,
-                "document_id": chunk.document_id,
-                "filename": chunk.filename,
-                "page": chunk.page,
-                "text": chunk.text,
-                "embedding": embedding,
-            }
-
-        self._save()
+        matrix = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            if self._dimension and matrix.shape[1] != self._dimension:
+                logger.warning(
+                    "Embedding boyutu degisti (%d -> %d); local vector store sifirlaniyor",
+                    self._dimension,
+                    matrix.shape[1],
+                )
+                self._start_generation(self._generation + 1, matrix.shape[1])
+            elif not self._dimension:
+                self._start_generation(self._generation, matrix.shape[1])
+
+            base = self.row_count
+            entries = [
+                {
+                    "row": base + offset,
+                    "chunk_id": chunk.id,
+                    "document_id": chunk.document_id,
+                    "filename": chunk.filename,
+                    "chunk_index": chunk.chunk_index,
+                    "page": chunk.page,
+                    "page_end": chunk.page_end,
+                    "text": chunk.text,
+                }
+                for offset, chunk in enumerate(chunks)
+            ]
+            # Vectors first: on load, meta rows without backing vector bytes are dropped.
+            if self._full_precision:
+                with self._full_path().open("ab") as handle:
+                    handle.write(matrix.tobytes())
+            with self._vectors_path().open("ab") as handle:
+                handle.write(_encode_rows(matrix, self._dtype).tobytes())
+            with self._meta_path().open("a", encoding="utf-8") as handle:
+                handle.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+
+            self._apply_entries(entries)
+            self._open_vectors()
+            should_compact = self._needs_compaction()
+
+        if should_compact:
+            self._start_background_compaction()
 
     def query(
         self,
@@ -150,71 +382,568 @@ class LocalJsonVectorStore:
         document_ids: list[str],
         top_k: int,
     ) -> list[RetrievedChunk]:
-        scored: list[tuple[float, dict[str, Any]]] = []
-        allowed = set(document_ids)
-
-        for payload in self._records.values():
-            if payload.get("document_id") not in allowed:
-                continue
-            embedding = payload.get("embedding")
-            if not isinstance(embedding, list) or not embedding:
-                continue
+        return self.query_many([query_embedding], document_ids, top_k)[0]
 
-            distance = self._cosine_distance(query_embedding, embedding)
-            scored.append((distance, payload))
+    def query_many(
+        self,
+        query_embeddings: list[list[float]],
+        document_ids: list[str],
+        top_k: int,
+    ) -> list[list[RetrievedChunk]]:
+        """Top ``top_k`` hits per query; all queries share one candidate scan."""
+        empty: list[list[RetrievedChunk]] = [[] for _ in query_embeddings]
+        with self._lock:
+            # Snapshot: writers replace these objects (or only append), never mutate rows in place.
+            vectors = self._vectors
+            full_vectors = self._full_vectors
+            dtype = self._dtype
+            dimension = self._dimension
+            alive = self._alive
+            row_meta = self._row_meta
+            ranges = [
+                row_range
+                for document_id in dict.fromkeys(document_ids)
+                for row_range in self._document_ranges.get(document_id, ())
+            ]
+
+        if not ranges or top_k <= 0 or not query_embeddings:
+            return empty
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != dimension:
+            logger.warning(
+                "Sorgu embedding boyutu (%s) index boyutu ile uyusmuyor (%s)",
+                queries.shape[1:],
+                dimension,
+            )
+            return empty
+        queries = _normalize_rows(queries)
+
+        ranges = _coalesce_ranges(ranges)
+        if len(ranges) == 1:
+            start, stop = ranges[0]
+            rows = np.arange(start, stop)
+            candidates = vectors[start:stop]
+        else:
+            rows = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+            candidates = vectors[rows]
+
+        live_mask = alive[rows]
+        live_count = int(live_mask.sum())
+        if live_count == 0:
+            return empty
+
+        # One (candidates x queries) product instead of a pass over the rows per query.
+        similarities = _score_rows(candidates, queries, dtype)
+        similarities[~live_mask] = -np.inf
+
+        k = min(top_k, live_count)
+        shortlist = min(k * _RESCORE_FACTOR, live_count) if full_vectors is not None else k
+        results: list[list[RetrievedChunk]] = []
+        for query, column in zip(queries, similarities.T, strict=True):
+            best = _top_positions(column, shortlist)
+            scores = column[best]
+            if full_vectors is not None:
+                # Quantized scores only pick the shortlist; the float32 rows decide the order.
+                scores = np.asarray(full_vectors[rows[best]] @ query, dtype=np.float32)
+                order = np.argsort(-scores, kind="stable")[:k]
+                best, scores = best[order], scores[order]
+            results.append(
+                [
+                    _retrieved_from_payload(
+                        row_meta[rows[position]],
+                        float(np.clip(1.0 - score, 0.0, 2.0)),
+                    )
+                    for position, score in zip(best, scores, strict=True)
+                ]
+            )
+        return results
+
+    def delete(self, document_ids: list[str]) -> None:
+        with self._lock:
+            present = [
+                document_id
+                for document_id in dict.fromkeys(document_ids)
+                if document_id in self._document_ranges
+            ]
+            if not present:
+                return
+            # Tombstone: replay drops every earlier row of these documents.
+            entry = {"op": "delete", "document_ids": present}
+            with self._meta_path().open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._apply_entries([entry])
+            should_compact = self._needs_compaction()
+
+        if should_compact:
+            self._start_background_compaction()
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, list[float]]:
+        # Stored rows are unit-normalized; cosine search does not need the original scale.
+        with self._lock:
+            rows = {
+                chunk_id: self._chunk_rows[chunk_id]
+                for chunk_id in chunk_ids
+                if chunk_id in self._chunk_rows
+            }
+            if not rows:
+                return {}
+            matrix = self._float_rows(self._vectors, self._full_vectors, self._dtype, list(rows.values()))
+            return {chunk_id: vector.tolist() for chunk_id, vector in zip(rows, matrix, strict=True)}
 
-        scored.sort(key=lambda item: item[0])
+    def ping(self) -> bool:
+        return True
 
-        result: list[RetrievedChunk] = []
-        for distance, payload in scored[:top_k]:
-            result.append(
-                RetrievedChunk(
-                    chunk_id=str(payload.get("chunk_id", "")),
-                    document_id=str(payload.get("document_id", "")),
-                    filename=str(payload.get("filename", "")),
-                    page=payload.get("page"),
-                    text=str(payload.get("text", "")),
-                    distance=distance,
+    def compact(self, *, force: bool = False) -> bool:
+        """Rewrite live rows into a new generation. Returns False if nothing was done.
+
+        The new generation uses the configured storage layout, so ``force`` also converts
+        a store written with another ``storage_dtype`` or ``rescore`` setting.
+        """
+        with self._lock:
+            if not self._dimension or (self.dead_row_count == 0 and not force):
+                return False
+            generation = self._generation
+            dimension = self._dimension
+            vectors = self._vectors
+            full_vectors = self._full_vectors
+            dtype = self._dtype
+            row_meta = self._row_meta
+            snapshot_rows = self.row_count
+            meta_offset = self._meta_path().stat().st_size
+            # Group live rows by document so every document becomes a single row range.
+            live_rows = [
+                row
+                for document_ranges in self._document_ranges.values()
+                for start, stop in document_ranges
+                for row in range(start, stop)
+                if self._alive[row]
+            ]
+
+        new_generation = generation + 1
+        new_dtype, new_full_precision = self._target_layout()
+        vectors_path = self._vectors_path(new_generation, new_dtype)
+        full_path = self._full_path(new_generation)
+        meta_path = self._meta_path(new_generation)
+        with (
+            vectors_path.open("wb") as vector_handle,
+            (full_path.open("wb") if new_full_precision else nullcontext()) as full_handle,
+            meta_path.open("w", encoding="utf-8") as meta_handle,
+        ):
+
+            def write_rows(matrix: np.ndarray) -> None:
+                if full_handle is not None:
+                    full_handle.write(matrix.tobytes())
+                vector_handle.write(_encode_rows(matrix, new_dtype).tobytes())
+
+            for offset in range(0, len(live_rows), _COMPACTION_BATCH_ROWS):
+                batch = live_rows[offset : offset + _COMPACTION_BATCH_ROWS]
+                write_rows(self._float_rows(vectors, full_vectors, dtype, batch))
+                meta_handle.write(
+                    "".join(
+                        json.dumps({**row_meta[row], "row": offset + index}, ensure_ascii=False) + "\n"
+                        for index, row in enumerate(batch)
+                    )
                 )
-            )
-        return result
 
-    def ping(self) -> bool:
+            with self._lock:
+                if self._generation != generation:
+                    # The store was reset (dimension change) while we were copying.
+                    vector_handle.close()
+                    meta_handle.close()
+                    if full_handle is not None:
+                        full_handle.close()
+                    _remove_quietly(vectors_path, full_path, meta_path)
+                    return False
+
+                # Carry over everything appended after the snapshot, renumbering rows.
+                row_shift = len(live_rows) - snapshot_rows
+                tail_rows = list(range(snapshot_rows, self.row_count))
+                if tail_rows:
+                    write_rows(
+                        self._float_rows(self._vectors, self._full_vectors, self._dtype, tail_rows)
+                    )
+                with self._meta_path().open("rb") as old_meta:
+                    old_meta.seek(meta_offset)
+                    for raw_line in old_meta:
+                        entry = json.loads(raw_line)
+                        if "row" in entry:
+                            entry["row"] += row_shift
+                        meta_handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                vector_handle.flush()
+                meta_handle.flush()
+                if full_handle is not None:
+                    full_handle.flush()
+
+                old_paths = (self._vectors_path(), self._full_path(), self._meta_path())
+                self._write_manifest(new_generation, dimension, new_dtype, new_full_precision)
+                self._load()
+
+        _remove_quietly(*old_paths)
+        logger.info(
+            "Local vector store compaction tamamlandi: %d -> %d satir",
+            snapshot_rows,
+            len(live_rows),
+        )
         return True
 
-    def _cosine_distance(self, left: list[float], right: list[float]) -> float:
-        length = min(len(left), len(right))
-        if length == 0:
-            return 1.0
+    def _target_layout(self) -> tuple[str, bool]:
+        # A float32 store is already full precision; a second copy would only cost disk.
+        return self.storage_dtype, self.rescore and self.storage_dtype != "float32"
 
-        dot = sum(left[i] * right[i] for i in range(length))
-        left_norm = math.sqrt(sum(left[i] * left[i] for i in range(length)))
-        right_norm = math.sqrt(sum(right[i] * right[i] for i in range(length)))
-        if left_norm == 0 or right_norm == 0:
-            return 1.0
+    def _convert_layout(self) -> None:
+        logger.info(
+            "Local vector store %s formatina donusturuluyor (%d satir)",
+            self.storage_dtype,
+            self.row_count,
+        )
+        if self.row_count:
+            self.compact(force=True)
+        else:
+            self._start_generation(self._generation + 1, self._dimension)
+
+    @staticmethod
+    def _float_rows(
+        vectors: np.ndarray,
+        full_vectors: np.ndarray | None,
+        dtype: str,
+        rows: list[int],
+    ) -> np.ndarray:
+        if full_vectors is not None:
+            return np.ascontiguousarray(full_vectors[rows], dtype=np.float32)
+        return _decode_rows(vectors[rows], dtype)
+
+    def wait_for_compaction(self, timeout: float | None = None) -> None:
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _needs_compaction(self) -> bool:
+        dead = self.dead_row_count
+        return dead >= self.compact_min_dead_rows and dead >= self.compact_dead_ratio * self.row_count
+
+    def _start_background_compaction(self) -> None:
+        with self._lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(
+                target=self._compact_safely,
+                name="vector-store-compaction",
+                daemon=True,
+            )
+            self._compaction_thread.start()
 
-        similarity = dot / (left_norm * right_norm)
-        return max(0.0, min(2.0, 1.0 - similarity))
+    def _compact_safely(self) -> None:
+        try:
+            self.compact()
+        except Exception:
+            logger.exception("Local vector store compaction basarisiz")
+
+    def _reset_state(self) -> None:
+        self._row_meta: list[dict[str, Any]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._live_rows = 0
+        self._chunk_rows: dict[str, int] = {}
+        self._document_ranges: dict[str, list[tuple[int, int]]] = {}
+        self._vectors: np.ndarray = np.zeros(0, dtype=_row_dtype(self._dtype, self._dimension))
+        self._full_vectors: np.ndarray | None = None
+
+    def _apply_entries(self, entries: list[dict[str, Any]]) -> None:
+        row_entries = [entry for entry in entries if "row" in entry]
+        # Copy-on-write so snapshots taken by concurrent queries stay consistent.
+        alive = np.concatenate([self._alive, np.ones(len(row_entries), dtype=bool)])
+        for entry in entries:
+            if entry.get("op") == "delete":
+                for document_id in entry.get("document_ids", []):
+                    for start, stop in self._document_ranges.pop(str(document_id), ()):
+                        for row in range(start, stop):
+                            if not alive[row]:
+                                continue
+                            alive[row] = False
+                            self._live_rows -= 1
+                            self._chunk_rows.pop(str(self._row_meta[row]["chunk_id"]), None)
+                continue
+            if "row" not in entry:
+                continue
 
-    def _load(self) -> None:
-        if not self.persist_path.exists():
-            self._records = {}
+            row = int(entry["row"])
+            chunk_id = str(entry["chunk_id"])
+            previous = self._chunk_rows.get(chunk_id)
+            if previous is not None and alive[previous]:
+                alive[previous] = False
+                self._live_rows -= 1
+            self._chunk_rows[chunk_id] = row
+            self._row_meta.append(entry)
+            self._live_rows += 1
+
+            ranges = self._document_ranges.setdefault(str(entry["document_id"]), [])
+            if ranges and ranges[-1][1] == row:
+                ranges[-1] = (ranges[-1][0], row + 1)
+            else:
+                ranges.append((row, row + 1))
+        self._alive = alive
+
+    def _open_vectors(self) -> None:
+        rows = self.row_count
+        row_dtype = _row_dtype(self._dtype, self._dimension)
+        if rows == 0 or not self._dimension:
+            self._vectors = np.zeros(0, dtype=row_dtype)
+            self._full_vectors = None
             return
+        self._vectors = np.memmap(self._vectors_path(), dtype=row_dtype, mode="r", shape=(rows,))
+        self._full_vectors = (
+            np.memmap(
+                self._full_path(),
+                dtype=np.float32,
+                mode="r",
+                shape=(rows, self._dimension),
+            )
+            if self._full_precision
+            else None
+        )
 
+    def _load(self) -> None:
+        manifest_path = self.persist_dir / "manifest.json"
         try:
-            loaded = json.loads(self.persist_path.read_text(encoding="utf-8"))
-            if isinstance(loaded, dict):
-                self._records = loaded
-            else:
-                self._records = {}
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            self._generation = int(manifest.get("generation", 0))
+            self._dimension = int(manifest.get("dimension", 0))
+            # Stores written before quantization support have no dtype: plain float32.
+            self._dtype = str(manifest.get("dtype", "float32"))
+            self._full_precision = bool(manifest.get("full_precision", False))
+            if self._dtype not in VECTOR_STORAGE_DTYPES:
+                raise ValueError(f"Bilinmeyen vektor tipi: {self._dtype}")
+        except FileNotFoundError:
+            self._generation, self._dimension = 0, 0
+            self._dtype, self._full_precision = self._target_layout()
         except Exception:
-            self._records = {}
+            logger.exception("Local vector store manifest okunamadi; bos baslatiliyor")
+            self._generation, self._dimension = 0, 0
+            self._dtype, self._full_precision = self._target_layout()
+
+        self._reset_state()
+        self._cleanup_stale_generations()
+        if not self._dimension:
+            return
 
-    def _save(self) -> None:
-        self.persist_path.write_text(
-            json.dumps(self._records, ensure_ascii=False),
+        vectors_path = self._vectors_path()
+        full_path = self._full_path()
+        meta_path = self._meta_path()
+        row_bytes = _row_dtype(self._dtype, self._dimension).itemsize
+        full_row_bytes = 4 * self._dimension
+        rows_on_disk = vectors_path.stat().st_size // row_bytes if vectors_path.exists() else 0
+        if self._full_precision:
+            full_rows = full_path.stat().st_size // full_row_bytes if full_path.exists() else 0
+            rows_on_disk = min(rows_on_disk, full_rows)
+
+        entries: list[dict[str, Any]] = []
+        good_meta_bytes = 0
+        if meta_path.exists():
+            with meta_path.open("rb") as handle:
+                for raw_line in handle:
+                    try:
+                        entry = json.loads(raw_line)
+                    except ValueError:
+                        break
+                    if not raw_line.endswith(b"\n"):
+                        break
+                    if "row" in entry and int(entry["row"]) >= rows_on_disk:
+                        break
+                    entries.append(entry)
+                    good_meta_bytes += len(raw_line)
+
+        self._apply_entries(entries)
+
+        # Drop a torn tail left by a crash mid-append so later appends stay aligned.
+        if meta_path.exists() and meta_path.stat().st_size != good_meta_bytes:
+            with meta_path.open("r+b") as handle:
+                handle.truncate(good_meta_bytes)
+        if vectors_path.exists() and vectors_path.stat().st_size != self.row_count * row_bytes:
+            with vectors_path.open("r+b") as handle:
+                handle.truncate(self.row_count * row_bytes)
+        if self._full_precision and full_path.exists() and full_path.stat().st_size != self.row_count * full_row_bytes:
+            with full_path.open("r+b") as handle:
+                handle.truncate(self.row_count * full_row_bytes)
+
+        self._open_vectors()
+
+    def _start_generation(self, generation: int, dimension: int) -> None:
+        replaced = generation != self._generation
+        old_paths = (self._vectors_path(), self._full_path(), self._meta_path())
+        self._dimension = dimension
+        self._write_manifest(generation, dimension, *self._target_layout())
+        self._vectors_path().touch()
+        if self._full_precision:
+            self._full_path().touch()
+        self._meta_path().touch()
+        self._reset_state()
+        if replaced:
+            _remove_quietly(*old_paths)
+
+    def _write_manifest(self, generation: int, dimension: int, dtype: str, full_precision: bool) -> None:
+        manifest_path = self.persist_dir / "manifest.json"
+        temp_path = manifest_path.with_suffix(".json.tmp")
+        temp_path.write_text(
+            json.dumps(
+                {
+                    "version": 1,
+                    "generation": generation,
+                    "dimension": dimension,
+                    "dtype": dtype,
+                    "full_precision": full_precision,
+                }
+            ),
             encoding="utf-8",
         )
+        os.replace(temp_path, manifest_path)
+        self._generation = generation
+        self._dtype, self._full_precision = dtype, full_precision
+
+    def _cleanup_stale_generations(self) -> None:
+        current = {self._vectors_path().name, self._meta_path().name}
+        if self._full_precision:
+            current.add(self._full_path().name)
+        stale = [
+            path
+            for pattern in ("vectors-*", "full-*.f32", "meta-*.jsonl")
+            for path in self.persist_dir.glob(pattern)
+            if path.name not in current
+        ]
+        _remove_quietly(*stale)
+
+    def _vectors_path(self, generation: int | None = None, dtype: str | None = None) -> Path:
+        generation = self._generation if generation is None else generation
+        return self.persist_dir / f"vectors-{generation}.{_STORAGE_SUFFIXES[dtype or self._dtype]}"
+
+    def _full_path(self, generation: int | None = None) -> Path:
+        return self.persist_dir / f"full-{self._generation if generation is None else generation}.f32"
+
+    def _meta_path(self, generation: int | None = None) -> Path:
+        return self.persist_dir / f"meta-{self._generation if generation is None else generation}.jsonl"
+
+    def _migrate_legacy_json(self, legacy_json_path: Path) -> None:
+        if self.row_count or not legacy_json_path.exists():
+            return
+        try:
+            loaded = json.loads(legacy_json_path.read_text(encoding="utf-8"))
+        except Exception:
+            logger.exception("Eski local_vectors.json okunamadi: %s", legacy_json_path)
+            return
+        if not isinstance(loaded, dict):
+            return
+
+        chunks: list[ChunkPayload] = []
+        embeddings: list[list[float]] = []
+        for payload in loaded.values():
+            embedding = payload.get("embedding")
+            if not isinstance(embedding, list) or not embedding:
+                continue
+            chunks.append(
+                ChunkPayload(
+                    id=str(payload.get("chunk_id", "")),
+                    document_id=str(payload.get("document_id", "")),
+                    filename=str(payload.get("filename", "")),
+                    chunk_index=int(payload.get("chunk_index", 0)),
+                    page=payload.get("page"),
+                    text=str(payload.get("text", "")),
+                )
+            )
+            embeddings.append(embedding)
+
+        # Group by dimension; only the most common one survives, like a model switch would.
+        if chunks:
+            dimension = max({len(e) for e in embeddings}, key=[len(e) for e in embeddings].count)
+            kept = [(c, e) for c, e in zip(chunks, embeddings, strict=True) if len(e) == dimension]
+            self.upsert([c for c, _ in kept], [e for _, e in kept])
+        legacy_json_path.replace(legacy_json_path.with_suffix(".json.migrated"))
+        logger.info("local_vectors.json yeni formata tasindi (%d chunk)", len(chunks))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    if matrix.ndim != 2 or matrix.shape[1] == 0:
+        raise ValueError("Embedding'ler ayni boyutta ve bos olmayan vektorler olmali")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _row_dtype(storage_dtype: str, dimension: int) -> np.dtype:
+    if storage_dtype == "int8":
+        # Per-row scale: components of a normalized high-dimensional vector are small, so
+        # one global scale would use only a few of the 255 levels.
+        return np.dtype([("scale", "<f4"), ("values", "i1", (dimension,))])
+    return np.dtype(("<f2" if storage_dtype == "float16" else "<f4", (dimension,)))
+
+
+def _encode_rows(matrix: np.ndarray, storage_dtype: str) -> np.ndarray:
+    """Storage rows for an L2-normalized float32 ``matrix``."""
+    if storage_dtype == "float16":
+        return matrix.astype(np.float16)
+    if storage_dtype != "int8":
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+    peaks = np.abs(matrix).max(axis=1)
+    scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+    encoded = np.empty(len(matrix), dtype=_row_dtype("int8", matrix.shape[1]))
+    encoded["scale"] = scales
+    encoded["values"] = np.rint(matrix / scales[:, None]).clip(-127, 127)
+    return encoded
+
+
+def _decode_rows(rows: np.ndarray, storage_dtype: str) -> np.ndarray:
+    if storage_dtype == "int8":
+        return rows["values"].astype(np.float32) * rows["scale"][:, None]
+    return np.asarray(rows, dtype=np.float32)
+
+
+def _score_rows(rows: np.ndarray, queries: np.ndarray, storage_dtype: str) -> np.ndarray:
+    """(rows x queries) cosine similarities for normalized ``queries``."""
+    if storage_dtype == "int8":
+        # Scale after the product: one multiply per row and query instead of per component.
+        return (rows["values"].astype(np.float32) @ queries.T) * rows["scale"][:, None]
+    return np.asarray(rows.astype(np.float32, copy=False) @ queries.T, dtype=np.float32)
+
+
+def _top_positions(scores: np.ndarray, count: int) -> np.ndarray:
+    """Indices of the ``count`` highest scores, best first."""
+    if count < len(scores):
+        best = np.argpartition(-scores, count - 1)[:count]
+    else:
+        best = np.arange(len(scores))
+    return best[np.argsort(-scores[best], kind="stable")][:count]
+
+
+def _retrieved_from_payload(payload: dict[str, Any], distance: float) -> RetrievedChunk:
+    return RetrievedChunk(
+        chunk_id=str(payload.get("chunk_id", "")),
+        document_id=str(payload.get("document_id", "")),
+        filename=str(payload.get("filename", "")),
+        page=payload.get("page"),
+        text=str(payload.get("text", "")),
+        distance=distance,
+        page_end=payload.get("page_end"),
+        chunk_index=payload.get("chunk_index"),
+    )
+
+
+def _remove_quietly(*paths: Path) -> None:
+    for path in paths:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            # Windows keeps memory-mapped files locked; a later load cleans them up.
+            logger.debug("Eski dosya silinemedi: %s", path)
+
+
+def _coalesce_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    # Adjacent document ranges collapse into one slice, so selecting many (or all)
+    # documents scores a matrix view instead of gathering rows into a copy.
+    merged: list[tuple[int, int]] = []
+    for start, stop in sorted(ranges):
+        if merged and merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], stop)
+        else:
+            merged.append((start, stop))
+    return merged
 
 
 class UnavailableVectorStore:
@@ -232,5 +961,19 @@ class UnavailableVectorStore:
     ) -> list[RetrievedChunk]:
         raise RuntimeError(self.reason)
 
+    def query_many(
+        self,
+        query_embeddings: list[list[float]],
+        document_ids: list[str],
+        top_k: int,
+    ) -> list[list[RetrievedChunk]]:
+        raise RuntimeError(self.reason)
+
+    def delete(self, document_ids: list[str]) -> None:
+        raise RuntimeError(self.reason)
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, list[float]]:
+        raise RuntimeError(self.reason)
+
     def ping(self) -> bool:
         return False
@@ -22,8 +22,11 @@ const state = {
   selectedFiles: /** @type {File[]} */ ([]),
   documents: /** @type {any[]} */ ([]),
   selectedDocumentIds: new Set(),
+  pollTimer: /** @type {number | null} */ (null),
 };
 
+const PROCESSING_POLL_MS = 2000;
+
 function setHidden(el, hidden) {
   if (!el) return;
   el.classList.toggle("hidden", hidden);
@@ -82,7 +85,8 @@ function renderUploadResult(payload) {
   } else {
     for (const item of accepted) {
       const li = document.createElement("li");
-      li.textContent = `${item.filename} (${item.status})`;
+      const suffix = item.duplicate ? ", zaten yuklu" : "";
+      li.textContent = `${item.filename} (${item.status}${suffix})`;
       acceptedListEl.appendChild(li);
     }
   }
@@ -177,6 +181,11 @@ function renderQaResult(payload) {
   qaMetaEl.appendChild(modePill);
   qaMetaEl.appendChild(conf);
   qaMetaEl.appendChild(used);
+  if (payload.cached) {
+    const cached = document.createElement("span");
+    cached.textContent = "Cache";
+    qaMetaEl.appendChild(cached);
+  }
 
   qaAnswerEl.textContent = payload.answer ?? "";
 
@@ -191,7 +200,8 @@ function renderQaResult(payload) {
       const strong = document.createElement("strong");
       strong.textContent = c.filename;
       li.appendChild(strong);
-      const suffix = c.page ? ` (sayfa ${c.page})` : "";
+      const pages = c.page_end && c.page_end !== c.page ? `${c.page}-${c.page_end}` : c.page;
+      const suffix = c.page ? ` (sayfa ${pages})` : "";
       li.appendChild(document.createTextNode(`${suffix} - ${c.snippet}`));
       qaCitationsEl.appendChild(li);
     }
@@ -200,6 +210,48 @@ function renderQaResult(payload) {
   setHidden(qaResultEl, false);
 }
 
+function renderQaStreamStart(payload) {
+  qaMetaEl.textContent = "";
+  qaCitationsEl.textContent = "";
+  qaAnswerEl.textContent = "";
+
+  const modePill = document.createElement("span");
+  modePill.className = "mode";
+  modePill.textContent = "yaziliyor...";
+
+  const used = document.createElement("span");
+  used.textContent = `Used Chunks: ${payload.used_chunks}`;
+
+  qaMetaEl.appendChild(modePill);
+  qaMetaEl.appendChild(used);
+  setHidden(qaResultEl, false);
+}
+
+async function readEventStream(response, onEvent) {
+  // Minimal text/event-stream reader: EventSource cannot send a POST body.
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+}
+
 async function refreshHealth() {
   if (!healthEl) return;
   try {
@@ -217,10 +269,19 @@ async function refreshDocuments() {
   setError("");
   try {
     refreshBtn.disabled = true;
-    const response = await fetch("/api/documents");
-    if (!response.ok) return parseError(response);
-    state.documents = await response.json();
+    // Pages are linked by X-Next-Cursor; unchanged pages revalidate via ETag (304).
+    const documents = [];
+    let cursor = null;
+    do {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+      const response = await fetch(`/api/documents${query}`);
+      if (!response.ok) return parseError(response);
+      documents.push(...(await response.json()));
+      cursor = response.headers.get("X-Next-Cursor");
+    } while (cursor);
+    state.documents = documents;
     renderDocuments();
+    scheduleProcessingPoll();
   } catch (err) {
     setError(err?.message ?? String(err));
   } finally {
@@ -228,6 +289,16 @@ async function refreshDocuments() {
   }
 }
 
+function scheduleProcessingPoll() {
+  // Ingestion runs in background workers; keep refreshing while any document is in flight.
+  if (state.pollTimer !== null) return;
+  if (!state.documents.some((doc) => doc.status === "processing")) return;
+  state.pollTimer = window.setTimeout(() => {
+    state.pollTimer = null;
+    void refreshDocuments();
+  }, PROCESSING_POLL_MS);
+}
+
 async function uploadDocuments() {
   if (!state.selectedFiles.length) {
     setError("Lutfen en az bir dosya secin.");
@@ -280,14 +351,23 @@ async function askQuestion() {
   try {
     askBtn.disabled = true;
     askBtn.textContent = "Sorgulaniyor...";
-    const response = await fetch("/api/questions", {
+    const response = await fetch("/api/questions/stream", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ question, document_ids: documentIds }),
     });
     if (!response.ok) return parseError(response);
-    const payload = await response.json();
-    renderQaResult(payload);
+    await readEventStream(response, (event, data) => {
+      if (event === "citations") {
+        renderQaStreamStart(data);
+      } else if (event === "token") {
+        qaAnswerEl.textContent += data.text ?? "";
+      } else if (event === "done") {
+        renderQaResult(data);
+      } else if (event === "error") {
+        throw new Error(data.detail ?? "Cevap uretilemedi.");
+      }
+    });
   } catch (err) {
     setError(err?.message ?? String(err));
   } finally {
@@ -26,8 +26,8 @@ def settings(tmp_path: Path) -> Settings:
         gemini_embedding_model="models/text-embedding-004",
         gemini_use_system_proxy=False,
         pdf_min_chars_before_ocr=20,
-        chunk_size=220,
-        chunk_overlap=40,
+        chunk_max_tokens=55,
+        chunk_overlap_tokens=10,
         retrieval_max_distance=0.5,
         max_files_per_request=10,
         max_upload_file_size_bytes=50 * 1024 * 1024,
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import math
+from collections.abc import AsyncIterator
+from pathlib import Path
 
 from backend.app.services.vector_store import RetrievedChunk
 
 
 class FakeGeminiClient:
-    def extract_text_from_image(self, image_bytes: bytes, mime_type: str) -> str:
+    def __init__(self) -> None:
+        self.aio = FakeAsyncGeminiClient(self)
+
+    def extract_text_from_image(self, image_bytes: bytes | Path, mime_type: str) -> str:
         return "Mock OCR metni"
 
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
+    def extract_text_from_pdf(self, pdf_bytes: bytes | Path) -> str:
         return "Mock PDF metni"
 
     def embed_texts(self, texts: list[str], *, task_type: str = "retrieval_document") -> list[list[float]]:
@@ -42,6 +47,9 @@ class FakeGeminiClient:
 
         return {"answer": "Bu bilgi belgede bulunamadi.", "citation_ids": []}
 
+    async def aclose(self) -> None:
+        return None
+
     def _vectorize(self, text: str) -> list[float]:
         lowered = text.lower()
         return [
@@ -52,9 +60,64 @@ class FakeGeminiClient:
         ]
 
 
+class CountingGeminiClient(FakeGeminiClient):
+    """Records what goes to the embedding API: document texts and query batches."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.embedded: list[str] = []
+        self.query_embed_calls: list[list[str]] = []
+
+    def embed_texts(self, texts: list[str], *, task_type: str = "retrieval_document") -> list[list[float]]:
+        if task_type == "retrieval_document":
+            self.embedded.extend(texts)
+        elif task_type == "retrieval_query":
+            self.query_embed_calls.append(list(texts))
+        return super().embed_texts(texts, task_type=task_type)
+
+
+class FakeAsyncGeminiClient:
+    """Awaitable surface of FakeGeminiClient; delegates so subclass overrides apply."""
+
+    def __init__(self, sync_client: FakeGeminiClient) -> None:
+        self._sync = sync_client
+
+    async def extract_text_from_image(self, image_bytes: bytes | Path, mime_type: str) -> str:
+        return self._sync.extract_text_from_image(image_bytes, mime_type)
+
+    async def extract_text_from_pdf(self, pdf_bytes: bytes | Path) -> str:
+        return self._sync.extract_text_from_pdf(pdf_bytes)
+
+    async def embed_texts(self, texts: list[str], *, task_type: str = "retrieval_document") -> list[list[float]]:
+        return self._sync.embed_texts(texts, task_type=task_type)
+
+    async def answer_question(
+        self,
+        question: str,
+        context_items: list[dict[str, object]],
+    ) -> dict[str, object]:
+        return self._sync.answer_question(question, context_items)
+
+    async def stream_answer(
+        self,
+        question: str,
+        context_items: list[dict[str, object]],
+    ) -> AsyncIterator[str]:
+        # Streams the JSON answer word by word, citing context inline like the real model.
+        payload = self._sync.answer_question(question, context_items)
+        markers = "".join(f" [{cid}]" for cid in payload["citation_ids"])  # type: ignore[union-attr]
+        text = str(payload["answer"]).rstrip(".") + markers + "."
+        for word in text.split(" "):
+            yield word + " "
+
+    async def aclose(self) -> None:
+        await self._sync.aclose()
+
+
 class FakeVectorStore:
     def __init__(self) -> None:
         self._records: list[tuple[dict[str, object], list[float]]] = []
+        self.query_many_calls = 0
 
     def upsert(self, chunks: list[object], embeddings: list[list[float]]) -> None:
         for chunk, embedding in zip(chunks, embeddings, strict=True):
@@ -67,6 +130,8 @@ class FakeVectorStore:
                         "document_id": str(chunk.document_id),
                         "filename": str(chunk.filename),
                         "page": chunk.page,
+                        "page_end": chunk.page_end,
+                        "chunk_index": chunk.chunk_index,
                         "text": str(chunk.text),
                     },
                     embedding,
@@ -93,10 +158,34 @@ class FakeVectorStore:
                     page=payload["page"],
                     text=str(payload["text"]),
                     distance=distance,
+                    page_end=payload["page_end"],
+                    chunk_index=payload["chunk_index"],
                 )
             )
         return result
 
+    def query_many(
+        self,
+        query_embeddings: list[list[float]],
+        document_ids: list[str],
+        top_k: int,
+    ) -> list[list[RetrievedChunk]]:
+        self.query_many_calls += 1
+        return [self.query(embedding, document_ids, top_k) for embedding in query_embeddings]
+
+    def delete(self, document_ids: list[str]) -> None:
+        self._records = [
+            record for record in self._records if record[0]["document_id"] not in document_ids
+        ]
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, list[float]]:
+        wanted = set(chunk_ids)
+        return {
+            str(payload["id"]): list(embedding)
+            for payload, embedding in self._records
+            if payload["id"] in wanted
+        }
+
     def ping(self) -> bool:
         return True
 
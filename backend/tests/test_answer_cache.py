@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from backend.app.schemas import AskResponse
+from backend.app.services.answer_cache import AnswerCache
+
+
+def _response(answer: str) -> AskResponse:
+    return AskResponse(
+        answer=answer,
+        mode="grounded_answer",
+        citations=[],
+        confidence=0.9,
+        used_chunks=1,
+    )
+
+
+def test_answer_cache_normalizes_questions_and_scopes_by_documents() -> None:
+    cache = AnswerCache(max_entries=10)
+    scope = cache.make_scope(["d2", "d1"], 5, "gemini-test")
+    cache.put("Merkez  NEREDE?", scope, _response("Ankara"))
+
+    assert cache.get("merkez nerede", cache.make_scope(["d1", "d2"], 5, "gemini-test")).answer == "Ankara"
+    assert cache.get("merkez nerede", cache.make_scope(["d1"], 5, "gemini-test")) is None
+    assert cache.get("merkez nerede", cache.make_scope(["d1", "d2"], 3, "gemini-test")) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_answer_cache_expires_evicts_and_invalidates() -> None:
+    now = [0.0]
+    cache = AnswerCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    scope_a = cache.make_scope(["a"], 5, "m")
+    scope_b = cache.make_scope(["b"], 5, "m")
+
+    cache.put("soru bir", scope_a, _response("1"))
+    cache.put("soru iki", scope_b, _response("2"))
+    cache.get("soru bir", scope_a)
+    cache.put("soru uc", scope_a, _response("3"))
+    # "soru iki" was least recently used.
+    assert cache.get("soru iki", scope_b) is None
+    assert cache.stats()["evictions"] == 1
+
+    assert cache.invalidate_documents(["a"]) == 2
+    assert cache.get("soru bir", scope_a) is None
+
+    cache.put("soru dort", scope_b, _response("4"))
+    now[0] = 11.0
+    assert cache.get("soru dort", scope_b) is None
+
+
+def test_answer_cache_semantic_hit_within_distance() -> None:
+    cache = AnswerCache(semantic_max_distance=0.05)
+    scope = cache.make_scope(["d1"], 5, "m")
+    cache.put("merkez nerede", scope, _response("Ankara"), query_embedding=[1.0, 0.0, 0.1])
+
+    assert cache.find_similar([1.0, 0.0, 0.12], scope).answer == "Ankara"
+    assert cache.find_similar([0.0, 1.0, 0.0], scope) is None
+    assert cache.find_similar([1.0, 0.0, 0.12], cache.make_scope(["d2"], 5, "m")) is None
+    assert cache.stats()["semantic_hits"] == 1
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import json
+import threading
+from dataclasses import replace
 
+import pytest
 from fastapi.testclient import TestClient
 
 from backend.app.config import Settings
 from backend.app.main import create_app
-from backend.tests.fakes import FakeGeminiClient, FakeVectorStore
+from backend.app.models import Document
+from backend.app.repositories import SegmentRepository
+from backend.app.services.extraction import ExtractedSegment
+from backend.tests.fakes import CountingGeminiClient, FakeGeminiClient, FakeVectorStore
 
 SAMPLE_PDF_BASE64 = (
     "JVBERi0xLjMKJZOMi54gUmVwb3J0TGFiIEdlbmVyYXRlZCBQREYgZG9jdW1lbnQgKG9wZW5zb3VyY2UpCjEgMCBvYmoKPDwKL0YxIDIgMCBSCj4+CmVuZG9iagoyIDAgb2JqCjw8Ci9CYXNlRm9udCAvSGVsdmV0aWNhIC9FbmNvZGluZyAvV2luQW5zaUVuY29kaW5nIC9OYW1lIC9GMSAvU3VidHlwZSAvVHlwZTEgL1R5cGUgL0ZvbnQKPj4KZW5kb2JqCjMgMCBvYmoKPDwKL0NvbnRlbnRzIDcgMCBSIC9NZWRpYUJveCBbIDAgMCA1OTUuMjc1NiA4NDEuODg5OCBdIC9QYXJlbnQgNiAwIFIgL1Jlc291cmNlcyA8PAovRm9udCAxIDAgUiAvUHJvY1NldCBbIC9QREYgL1RleHQgL0ltYWdlQiAvSW1hZ2VDIC9JbWFnZUkgXQo+PiAvUm90YXRlIDAgL1RyYW5zIDw8Cgo+PiAKICAvVHlwZSAvUGFnZQo+PgplbmRvYmoKNCAwIG9iago8PAovUGFnZU1vZGUgL1VzZU5vbmUgL1BhZ2VzIDYgMCBSIC9UeXBlIC9DYXRhbG9nCj4+CmVuZG9iago1IDAgb2JqCjw8Ci9BdXRob3IgKGFub255bW91cykgL0NyZWF0aW9uRGF0ZSAoRDoyMDI2MDIwOTAyMDgxMSswMycwMCcpIC9DcmVhdG9yIChhbm9ueW1vdXMpIC9LZXl3b3JkcyAoKSAvTW9kRGF0ZSAoRDoyMDI2MDIwOTAyMDgxMSswMycwMCcpIC9Qcm9kdWNlciAoUmVwb3J0TGFiIFBERiBMaWJyYXJ5IC0gXChvcGVuc291cmNlXCkpIAogIC9TdWJqZWN0ICh1bnNwZWNpZmllZCkgL1RpdGxlICh1bnRpdGxlZCkgL1RyYXBwZWQgL0ZhbHNlCj4+CmVuZG9iago2IDAgb2JqCjw8Ci9Db3VudCAxIC9LaWRzIFsgMyAwIFIgXSAvVHlwZSAvUGFnZXMKPj4KZW5kb2JqCjcgMCBvYmoKPDwKL0ZpbHRlciBbIC9BU0NJSTg1RGVjb2RlIC9GbGF0ZURlY29kZSBdIC9MZW5ndGggMTIxCj4+CnN0cmVhbQpHYXBRaDBFPUYsMFVcSDNUXHBOWVReUUtrP3RjPklQLDtXI1UxXjIzaWhQRU1fP0NXNEtJU2k8IVs3YCNPQl9zS09PLkNVQCJtQ2NVP3BDMDlFaUpMbSk1VmRvcCFDWmJUXTJFS29kaj4mMXJ1TSJZS2UpUFNkT34+ZW5kc3RyZWFtCmVuZG9iagp4cmVmCjAgOAowMDAwMDAwMDAwIDY1NTM1IGYgCjAwMDAwMDAwNjEgMDAwMDAgbiAKMDAwMDAwMDA5MiAwMDAwMCBuIAowMDAwMDAwMTk5IDAwMDAwIG4gCjAwMDAwMDA0MDIgMDAwMDAgbiAKMDAwMDAwMDQ3MCAwMDAwMCBuIAowMDAwMDAwNzMxIDAwMDAwIG4gCjAwMDAwMDA3OTAgMDAwMDAgbiAKdHJhaWxlcgo8PAovSUQgCls8NDFlNWIxZjcxNDU1ZTBiZTExOTg0NzRiNTY0MzdhNDQ+PDQxZTViMWY3MTQ1NWUwYmUxMTk4NDc0YjU2NDM3YTQ0Pl0KJSBSZXBvcnRMYWIgZ2VuZXJhdGVkIFBERiBkb2N1bWVudCAtLSBkaWdlc3QgKG9wZW5zb3VyY2UpCgovSW5mbyA1IDAgUgovUm9vdCA0IDAgUgovU2l6ZSA4Cj4+CnN0YXJ0eHJlZgoxMDAxCiUlRU9GCg=="
@@ -17,6 +25,10 @@ def create_pdf_bytes() -> bytes:
     return base64.b64decode(SAMPLE_PDF_BASE64)
 
 
+def wait_for_ingestion(client: TestClient) -> None:
+    assert client.app.state.ingestion_queue.join(timeout=10)
+
+
 def test_upload_accepts_supported_files_and_rejects_unsupported(client: TestClient) -> None:
     good_pdf = create_pdf_bytes()
     files = [
@@ -30,7 +42,9 @@ def test_upload_accepts_supported_files_and_rejects_unsupported(client: TestClie
 
     assert len(payload["accepted_files"]) == 1
     assert len(payload["rejected_files"]) == 1
-    assert payload["accepted_files"][0]["status"] == "indexed"
+    assert payload["accepted_files"][0]["status"] == "processing"
+
+    wait_for_ingestion(client)
 
     list_response = client.get("/api/documents")
     assert list_response.status_code == 200
@@ -46,6 +60,7 @@ def test_ask_returns_grounded_answer_with_citation(client: TestClient) -> None:
         files=[("files", ("ankara.pdf", good_pdf, "application/pdf"))],
     )
     assert upload_response.status_code == 200
+    wait_for_ingestion(client)
     document_id = upload_response.json()["document_ids"][0]
 
     ask_response = client.post(
@@ -71,6 +86,7 @@ def test_ask_returns_no_evidence_for_missing_information(client: TestClient) ->
         files=[("files", ("scope.pdf", good_pdf, "application/pdf"))],
     )
     assert upload_response.status_code == 200
+    wait_for_ingestion(client)
     document_id = upload_response.json()["document_ids"][0]
 
     ask_response = client.post(
@@ -103,8 +119,8 @@ def test_missing_api_key_fails_fast_on_upload(tmp_path) -> None:
         gemini_embedding_model="models/text-embedding-004",
         gemini_use_system_proxy=False,
         pdf_min_chars_before_ocr=20,
-        chunk_size=220,
-        chunk_overlap=40,
+        chunk_max_tokens=55,
+        chunk_overlap_tokens=10,
         retrieval_max_distance=0.5,
         max_files_per_request=10,
         max_upload_file_size_bytes=50 * 1024 * 1024,
@@ -138,8 +154,8 @@ def test_upload_indexes_short_native_pdf_text_even_when_ocr_threshold_high(tmp_p
         gemini_embedding_model="models/text-embedding-004",
         gemini_use_system_proxy=False,
         pdf_min_chars_before_ocr=10_000,
-        chunk_size=220,
-        chunk_overlap=40,
+        chunk_max_tokens=55,
+        chunk_overlap_tokens=10,
         retrieval_max_distance=0.5,
         max_files_per_request=10,
         max_upload_file_size_bytes=50 * 1024 * 1024,
@@ -158,9 +174,13 @@ def test_upload_indexes_short_native_pdf_text_even_when_ocr_threshold_high(tmp_p
         files=[("files", ("ankara.pdf", good_pdf, "application/pdf"))],
     )
     assert upload_response.status_code == 200
+    wait_for_ingestion(client)
     payload = upload_response.json()
     assert payload["accepted_files"]
-    assert payload["accepted_files"][0]["status"] == "indexed"
+
+    status_response = client.get(f"/api/documents/{payload['document_ids'][0]}")
+    assert status_response.status_code == 200
+    assert status_response.json()["status"] == "indexed"
 
 
 def test_root_serves_static_ui(client: TestClient) -> None:
@@ -210,8 +230,8 @@ def test_upload_rejects_too_large_file(tmp_path) -> None:
         gemini_embedding_model="models/text-embedding-004",
         gemini_use_system_proxy=False,
         pdf_min_chars_before_ocr=20,
-        chunk_size=220,
-        chunk_overlap=40,
+        chunk_max_tokens=55,
+        chunk_overlap_tokens=10,
         retrieval_max_distance=0.5,
         max_files_per_request=10,
         max_upload_file_size_bytes=100,
@@ -235,6 +255,8 @@ def test_upload_rejects_too_large_file(tmp_path) -> None:
     assert payload["accepted_files"] == []
     assert payload["rejected_files"]
     assert "cok buyuk" in payload["rejected_files"][0]["reason"].lower()
+    # The partially streamed temp file must not be left behind.
+    assert list(settings.upload_dir.iterdir()) == []
 
 
 def test_ask_ignores_invalid_document_ids(client: TestClient) -> None:
@@ -244,6 +266,7 @@ def test_ask_ignores_invalid_document_ids(client: TestClient) -> None:
         files=[("files", ("ankara.pdf", good_pdf, "application/pdf"))],
     )
     assert upload_response.status_code == 200
+    wait_for_ingestion(client)
     document_id = upload_response.json()["document_ids"][0]
 
     ask_response = client.post(
@@ -260,3 +283,491 @@ def test_ask_ignores_invalid_document_ids(client: TestClient) -> None:
     assert payload["mode"] == "grounded_answer"
     assert payload["citations"]
     assert "Ankara" in payload["answer"]
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_ask_stream_emits_citations_tokens_and_final_answer(client: TestClient) -> None:
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+
+    response = client.post(
+        "/api/questions/stream",
+        json={
+            "question": "Belgede Ankara ile ilgili hangi bilgi geciyor?",
+            "document_ids": [document_id],
+            "top_k": 5,
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "citations"
+    assert names[-1] == "done"
+    assert "token" in names
+
+    candidates = events[0][1]["citations"]
+    assert candidates and candidates[0]["cid"] == "C1"
+
+    streamed = "".join(data["text"] for name, data in events if name == "token")
+    assert "[C1]" in streamed
+
+    final = events[-1][1]
+    assert final["mode"] == "grounded_answer"
+    assert final["answer"] == "Belgeye gore Ankara bilgisi mevcut."
+    assert final["citations"][0]["chunk_id"] == candidates[0]["chunk_id"]
+    assert final["confidence"] > 0
+
+
+def test_ask_stream_reports_no_evidence(client: TestClient) -> None:
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+
+    response = client.post(
+        "/api/questions/stream",
+        json={"question": "Mars gorevi ne zaman?", "document_ids": [document_id]},
+    )
+    final_name, final = parse_sse(response.text)[-1]
+    assert final_name == "done"
+    assert final["mode"] == "no_evidence"
+    assert final["citations"] == []
+
+
+def test_repeated_question_is_served_from_answer_cache_until_reindex(client: TestClient) -> None:
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+    body = {"question": "Belgede Ankara ile ilgili hangi bilgi geciyor?", "document_ids": [document_id]}
+
+    first = client.post("/api/questions", json=body).json()
+    second = client.post(
+        "/api/questions",
+        json={**body, "question": "  belgede ankara ile ilgili hangi bilgi geciyor  "},
+    ).json()
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["answer"] == first["answer"]
+
+    assert client.post(f"/api/documents/{document_id}/reindex").status_code == 202
+    wait_for_ingestion(client)
+    assert client.post("/api/questions", json=body).json()["cached"] is False
+
+
+def test_ask_falls_back_to_lexical_hits_when_query_embedding_fails(settings: Settings) -> None:
+    class _QueryEmbeddingDownClient(FakeGeminiClient):
+        def embed_texts(self, texts: list[str], *, task_type: str = "retrieval_document") -> list[list[float]]:
+            if task_type == "retrieval_query":
+                raise ConnectionError("embedding servisi yanit vermiyor")
+            return super().embed_texts(texts, task_type=task_type)
+
+    app = create_app(
+        settings=settings,
+        vector_store=FakeVectorStore(),
+        gemini_client=_QueryEmbeddingDownClient(),
+    )
+    client = TestClient(app)
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+
+    ask_response = client.post(
+        "/api/questions",
+        json={"question": "Ankara", "document_ids": [document_id], "top_k": 5},
+    )
+    assert ask_response.status_code == 200
+    payload = ask_response.json()
+    assert payload["mode"] == "grounded_answer"
+    assert payload["citations"]
+
+
+def test_duplicate_upload_returns_existing_document_and_records_alias(
+    client: TestClient,
+    settings: Settings,
+) -> None:
+    first = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    ).json()
+    wait_for_ingestion(client)
+    document_id = first["document_ids"][0]
+
+    second = client.post(
+        "/api/documents",
+        files=[
+            ("files", ("ankara-kopya.pdf", create_pdf_bytes(), "application/pdf")),
+            ("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf")),
+        ],
+    ).json()
+
+    assert second["document_ids"] == [document_id]
+    assert [item["duplicate"] for item in second["accepted_files"]] == [True, True]
+    assert all(item["status"] == "indexed" for item in second["accepted_files"])
+    assert len(client.get("/api/documents").json()) == 1
+    assert len(list(settings.upload_dir.iterdir())) == 1
+
+    detail = client.get(f"/api/documents/{document_id}").json()
+    assert detail["aliases"] == ["ankara-kopya.pdf"]
+
+    assert client.delete(f"/api/documents/{document_id}").status_code == 204
+    third = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    ).json()
+    assert third["accepted_files"][0]["duplicate"] is False
+    wait_for_ingestion(client)
+
+
+@pytest.mark.parametrize("stale_storage_path", [False, True])
+def test_duplicate_upload_of_failed_document_requeues_it(
+    client: TestClient,
+    settings: Settings,
+    stale_storage_path: bool,
+) -> None:
+    first = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    ).json()
+    wait_for_ingestion(client)
+    document_id = first["document_ids"][0]
+
+    with client.app.state.database.session_factory() as session:
+        document = session.get(Document, document_id)
+        document.status = "failed"
+        document.error_message = "PDF okunamadi."
+        if stale_storage_path:
+            # e.g. the upload directory moved since the document was stored.
+            document.storage_path = str(settings.upload_dir.parent / "eski-yuklemeler" / "ankara.pdf")
+        session.commit()
+    for path in settings.upload_dir.iterdir():
+        path.unlink()
+
+    second = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    ).json()
+
+    assert second["document_ids"] == [document_id]
+    assert second["accepted_files"][0]["duplicate"] is True
+    assert second["accepted_files"][0]["status"] == "processing"
+    wait_for_ingestion(client)
+
+    detail = client.get(f"/api/documents/{document_id}").json()
+    assert detail["status"] == "indexed"
+    assert detail["error_message"] is None
+    assert len(list(settings.upload_dir.iterdir())) == 1
+
+
+def test_document_listing_pages_filters_and_revalidates(client: TestClient) -> None:
+    files = [("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))] + [
+        ("files", (f"tarama-{index}.png", f"png-{index}".encode(), "image/png")) for index in range(3)
+    ]
+    client.post("/api/documents", files=files)
+    wait_for_ingestion(client)
+
+    first = client.get("/api/documents", params={"limit": 3})
+    assert first.status_code == 200
+    assert len(first.json()) == 3
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/api/documents", params={"limit": 3, "cursor": cursor})
+    assert "X-Next-Cursor" not in second.headers
+    listed = [doc["id"] for doc in first.json() + second.json()]
+    assert len(set(listed)) == 4
+
+    pngs = client.get("/api/documents", params={"file_type": "png"}).json()
+    assert sorted(doc["filename"] for doc in pngs) == ["tarama-0.png", "tarama-1.png", "tarama-2.png"]
+    assert client.get("/api/documents", params={"status": "failed"}).json() == []
+    assert client.get("/api/documents", params={"cursor": "bozuk"}).status_code == 400
+
+    etag = first.headers["ETag"]
+    cached = client.get("/api/documents", params={"limit": 3}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    other_query = client.get("/api/documents", headers={"If-None-Match": etag})
+    assert other_query.status_code == 200
+
+    client.delete(f"/api/documents/{listed[0]}")
+    changed = client.get("/api/documents", params={"limit": 3}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_document_status_endpoint_reports_job_state(client: TestClient) -> None:
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    assert upload_response.status_code == 200
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+
+    response = client.get(f"/api/documents/{document_id}")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["id"] == document_id
+    assert payload["status"] == "indexed"
+    assert payload["queued"] is False
+    assert payload["error_message"] is None
+
+    assert client.get("/api/documents/does-not-exist").status_code == 404
+
+
+def test_unknown_reranker_fails_at_startup(settings: Settings) -> None:
+    with pytest.raises(ValueError, match="lexical-mmr"):
+        create_app(
+            settings=replace(settings, reranker="lexical-mmr"),
+            vector_store=FakeVectorStore(),
+            gemini_client=FakeGeminiClient(),
+        )
+
+
+def test_unfinished_jobs_are_resumed_on_startup(settings: Settings) -> None:
+    first_app = create_app(
+        settings=settings,
+        vector_store=FakeVectorStore(),
+        gemini_client=FakeGeminiClient(),
+    )
+    # Simulate a crash between accepting the upload and running the pipeline.
+    first_app.state.ingestion_queue.submit = lambda document_id: False
+    first_client = TestClient(first_app)
+    upload_response = first_client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    document_id = upload_response.json()["document_ids"][0]
+    assert first_client.get(f"/api/documents/{document_id}").json()["status"] == "processing"
+
+    second_app = create_app(
+        settings=settings,
+        vector_store=FakeVectorStore(),
+        gemini_client=FakeGeminiClient(),
+    )
+    with TestClient(second_app) as second_client:
+        wait_for_ingestion(second_client)
+        response = second_client.get(f"/api/documents/{document_id}")
+
+    assert response.json()["status"] == "indexed"
+
+
+@pytest.mark.parametrize(("grace_seconds", "expected_status"), [(30.0, "indexed"), (0.001, "processing")])
+def test_shutdown_lets_running_ingestion_finish_or_leaves_it_resumable(
+    settings: Settings,
+    grace_seconds: float,
+    expected_status: str,
+) -> None:
+    gemini_client = FakeGeminiClient()
+    embed_started = threading.Event()
+    embed_texts = gemini_client.aio.embed_texts
+
+    async def slow_embed(texts: list[str], *, task_type: str = "retrieval_document") -> list[list[float]]:
+        embed_started.set()
+        await asyncio.sleep(0.3)
+        return await embed_texts(texts, task_type=task_type)
+
+    gemini_client.aio.embed_texts = slow_embed  # type: ignore[method-assign]
+    settings = replace(settings, ingestion_shutdown_timeout_seconds=grace_seconds)
+    app = create_app(settings=settings, vector_store=FakeVectorStore(), gemini_client=gemini_client)
+    with TestClient(app) as client:
+        upload_response = client.post(
+            "/api/documents",
+            files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+        )
+        document_id = upload_response.json()["document_ids"][0]
+        assert embed_started.wait(timeout=10)
+
+    assert app.state.ingestion_queue.join(timeout=10)
+    with app.state.database.session_factory() as session:
+        document = session.get(Document, document_id)
+        assert document.status == expected_status
+        assert document.error_message is None
+
+
+def test_delete_document_removes_rows_vectors_and_file(client: TestClient, settings: Settings) -> None:
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    assert upload_response.status_code == 200
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+    assert list(settings.upload_dir.iterdir())
+
+    response = client.delete(f"/api/documents/{document_id}")
+    assert response.status_code == 204
+
+    assert client.get(f"/api/documents/{document_id}").status_code == 404
+    assert client.get("/api/documents").json() == []
+    assert client.app.state.vector_store.query([1.0, 0.0, 0.0, 0.1], [document_id], 5) == []
+    assert list(settings.upload_dir.iterdir()) == []
+    assert client.delete(f"/api/documents/{document_id}").status_code == 404
+
+
+def test_reindex_document_rebuilds_chunks_without_stale_vectors(client: TestClient) -> None:
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    assert upload_response.status_code == 200
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+    vector_store = client.app.state.vector_store
+    before = {hit.chunk_id for hit in vector_store.query([1.0, 0.0, 0.0, 0.1], [document_id], 50)}
+
+    response = client.post(f"/api/documents/{document_id}/reindex", params={"full": "true"})
+    assert response.status_code == 202
+    assert response.json()["status"] == "processing"
+    wait_for_ingestion(client)
+
+    assert client.get(f"/api/documents/{document_id}").json()["status"] == "indexed"
+    after = {hit.chunk_id for hit in vector_store.query([1.0, 0.0, 0.0, 0.1], [document_id], 50)}
+    # Same text after re-extraction: chunks keep their ids and nothing stale is left behind.
+    assert after == before
+    assert client.post("/api/documents/missing/reindex").status_code == 404
+
+
+def test_incremental_reindex_embeds_only_changed_chunks(settings: Settings) -> None:
+    gemini_client = CountingGeminiClient()
+    vector_store = FakeVectorStore()
+    # Pages chunked on their own, so a new page cannot change the first page's chunk.
+    settings = replace(settings, chunk_across_pages=False)
+    client = TestClient(create_app(settings=settings, vector_store=vector_store, gemini_client=gemini_client))
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+    first_run = list(gemini_client.embedded)
+    assert first_run
+
+    gemini_client.embedded.clear()
+    response = client.post("/api/documents/reindex")
+    assert response.status_code == 202
+    assert response.json() == {"document_ids": [document_id], "skipped_document_ids": []}
+    wait_for_ingestion(client)
+    assert client.get(f"/api/documents/{document_id}").json()["status"] == "indexed"
+    assert gemini_client.embedded == []
+
+    # A new page in the stored segments: only its chunk goes to the embedding API, and the
+    # uploaded file is not needed.
+    with client.app.state.database.session_factory() as session:
+        segments = SegmentRepository(session)
+        stored = [
+            ExtractedSegment(page=segment.page, source=segment.source, text=segment.text)
+            for segment in segments.list_for_document(document_id)
+        ]
+        extra = ExtractedSegment(page=2, source="native", text="EKLER\nUcak bakim plani ikinci sayfada.")
+        segments.replace_for_document(document_id, [*stored, extra])
+    for path in settings.upload_dir.iterdir():
+        path.unlink()
+
+    assert client.post(f"/api/documents/{document_id}/reindex").status_code == 202
+    wait_for_ingestion(client)
+    assert client.get(f"/api/documents/{document_id}").json()["status"] == "indexed"
+    assert gemini_client.embedded == ["EKLER\n\nUcak bakim plani ikinci sayfada."]
+    hits = vector_store.query([1.0, 0.0, 0.0, 0.1], [document_id], 50)
+    assert len(hits) == len(first_run) + 1
+
+    # A full reindex needs the uploaded file again.
+    assert client.post(f"/api/documents/{document_id}/reindex", params={"full": "true"}).status_code == 410
+
+
+def test_batch_questions_share_retrieval_and_stream_ndjson(settings: Settings) -> None:
+    gemini_client = CountingGeminiClient()
+    vector_store = FakeVectorStore()
+    settings = replace(settings, qa_batch_max_questions=3)
+    client = TestClient(create_app(settings=settings, vector_store=vector_store, gemini_client=gemini_client))
+    upload_response = client.post(
+        "/api/documents",
+        files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+    )
+    wait_for_ingestion(client)
+    document_id = upload_response.json()["document_ids"][0]
+    questions = ["Ankara nerede?", "Mars'ta su var mi?", "TUSAS merkezi nerede?"]
+
+    response = client.post(
+        "/api/questions/batch",
+        json={"questions": questions, "document_ids": [document_id], "top_k": 3},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {item["index"]: item for item in items}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["question"] == questions[0]
+    assert by_index[0]["mode"] == "grounded_answer"
+    assert by_index[0]["citations"][0]["document_id"] == document_id
+    assert by_index[1]["mode"] == "no_evidence"
+    assert gemini_client.query_embed_calls == [questions]
+    assert vector_store.query_many_calls == 1
+
+    # Answers are cached like single questions.
+    ask_response = client.post(
+        "/api/questions",
+        json={"question": questions[0], "document_ids": [document_id], "top_k": 3},
+    )
+    assert ask_response.json()["cached"] is True
+
+    too_many = client.post(
+        "/api/questions/batch",
+        json={"questions": [*questions, "Bir soru daha?"], "document_ids": [document_id]},
+    )
+    assert too_many.status_code == 400
+
+
+def test_lifespan_routes_gemini_calls_through_async_client_and_closes_it(settings: Settings) -> None:
+    class _RecordingClient(FakeGeminiClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.async_embed_calls = 0
+            self.closed = False
+            embed_texts = self.aio.embed_texts
+
+            async def recording_embed(texts: list[str], *, task_type: str = "retrieval_document"):  # noqa: ANN202
+                self.async_embed_calls += 1
+                return await embed_texts(texts, task_type=task_type)
+
+            self.aio.embed_texts = recording_embed  # type: ignore[method-assign]
+
+        async def aclose(self) -> None:
+            self.closed = True
+
+    gemini_client = _RecordingClient()
+    app = create_app(settings=settings, vector_store=FakeVectorStore(), gemini_client=gemini_client)
+    with TestClient(app) as client:
+        upload_response = client.post(
+            "/api/documents",
+            files=[("files", ("ankara.pdf", create_pdf_bytes(), "application/pdf"))],
+        )
+        wait_for_ingestion(client)
+        document_id = upload_response.json()["document_ids"][0]
+        ask_response = client.post(
+            "/api/questions",
+            json={"question": "Ankara nerede?", "document_ids": [document_id], "top_k": 3},
+        )
+
+    assert ask_response.json()["mode"] == "grounded_answer"
+    # One call from the ingestion worker (via the app loop) and one query embedding.
+    assert gemini_client.async_embed_calls == 2
+    assert gemini_client.closed
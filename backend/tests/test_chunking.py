@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.app.services.chunking import ChunkBuilder, estimate_tokens
+from backend.app.services.extraction import ExtractedSegment
+
+
+def _chunks(builder: ChunkBuilder, text: str, page: int | None = 1) -> list[str]:
+    segments = [ExtractedSegment(page=page, source="native", text=text)]
+    return [chunk.text for chunk in builder.build(document_id="d", filename="f.pdf", segments=segments)]
+
+
+def test_chunks_respect_token_budget_and_keep_paragraph_breaks() -> None:
+    builder = ChunkBuilder(max_tokens=40, overlap_tokens=0)
+    text = (
+        "Birinci paragraf ucak bakim proseduru hakkindadir.\n"
+        "Satir burada kirildi ama cumle devam ediyor.\n\n"
+        "Ikinci paragraf baska bir konuyu anlatir."
+    )
+
+    chunks = _chunks(builder, text)
+
+    assert chunks == [
+        "Birinci paragraf ucak bakim proseduru hakkindadir. "
+        "Satir burada kirildi ama cumle devam ediyor.\n\n"
+        "Ikinci paragraf baska bir konuyu anlatir."
+    ]
+
+    long_text = " ".join(f"Cumle numarasi {i} burada bitiyor." for i in range(60))
+    for chunk in _chunks(builder, long_text):
+        assert estimate_tokens(chunk) <= 40
+        # Splits land on sentence boundaries.
+        assert chunk.endswith(".")
+
+
+def test_headings_start_new_chunks_and_lists_and_tables_stay_line_based() -> None:
+    builder = ChunkBuilder(max_tokens=60, overlap_tokens=0)
+    text = (
+        "1.1 Kapsam\n"
+        "Bu bolum bakim kapsamini tanimlar ve yeterince uzun bir paragraf icerir "
+        "ki baslik bir sonraki bolumu ayirsin.\n"
+        "1.2 Malzemeler\n"
+        "- vida\n"
+        "- somun\n\n"
+        "Parca | Adet\n"
+        "Vida  | 10\n"
+    )
+
+    chunks = _chunks(builder, text)
+
+    assert chunks[0].startswith("1.1 Kapsam\n\n")
+    assert chunks[1] == "1.2 Malzemeler\n\n- vida\n- somun\n\nParca | Adet\nVida | 10"
+
+
+def test_overlap_repeats_trailing_sentences_and_oversized_sentences_are_windowed() -> None:
+    builder = ChunkBuilder(max_tokens=20, overlap_tokens=6)
+    text = "Ilk cumle kisa. " + " ".join(f"Cumle {i} burada." for i in range(10))
+
+    chunks = _chunks(builder, text)
+
+    assert len(chunks) > 1
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split(". ")[0] in previous
+
+    windows = _chunks(builder, "kelime " * 200)
+    assert all(estimate_tokens(window) <= 20 for window in windows)
+    assert sum(window.count("kelime") for window in windows) >= 200
+
+
+def test_runs_without_spaces_are_cut_to_the_budget() -> None:
+    builder = ChunkBuilder(max_tokens=40, overlap_tokens=8)
+    url = "https://example.com/" + "a1b2c3d4" * 6000
+    text = f"Kaynak: {url} sonunda."
+
+    chunks = _chunks(builder, text)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 40 for chunk in chunks)
+    assert all(len(chunk) <= 40 * 4 for chunk in chunks)
+    # Without overlap the cut pieces add up to the original text.
+    plain = _chunks(ChunkBuilder(max_tokens=40, overlap_tokens=0), text)
+    assert "".join(plain).replace(" ", "") == text.replace(" ", "")
+
+
+def test_chunker_rejects_overlap_not_smaller_than_budget() -> None:
+    with pytest.raises(ValueError):
+        ChunkBuilder(max_tokens=10, overlap_tokens=10)
+
+
+def test_document_mode_continues_sentences_across_pages_and_records_page_range() -> None:
+    builder = ChunkBuilder(max_tokens=60, overlap_tokens=0)
+    segments = [
+        ExtractedSegment(page=1, source="native", text="Giris metni.\nBu cumle sayfa sonunda devam"),
+        ExtractedSegment(page=2, source="native", text="ediyor ve burada bitiyor."),
+        ExtractedSegment(page=3, source="native", text="Kisa sayfa."),
+        ExtractedSegment(page=4, source="native", text="2.1 YENI BOLUM\nIcerik burada."),
+    ]
+
+    chunks = builder.build(document_id="d", filename="f.pdf", segments=segments)
+
+    assert [(chunk.page, chunk.page_end) for chunk in chunks] == [(1, 3), (4, 4)]
+    assert "sayfa sonunda devam ediyor ve burada bitiyor." in chunks[0].text
+    assert [chunk.chunk_index for chunk in chunks] == [0, 1]
+
+    per_page = ChunkBuilder(max_tokens=60, overlap_tokens=0, across_pages=False)
+    pages = per_page.build(document_id="d", filename="f.pdf", segments=segments)
+    assert [(chunk.page, chunk.page_end) for chunk in pages] == [(1, 1), (2, 2), (3, 3), (4, 4)]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from backend.app.config import Settings
+from backend.app.database import Database
+from backend.app.models import Document
+from backend.app.repositories import ChunkRepository, DocumentRepository
+from backend.app.services.chunking import ChunkPayload
+
+
+def test_init_schema_adds_new_columns_to_existing_tables(tmp_path: Path) -> None:
+    db_path = tmp_path / "legacy.db"
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        "CREATE TABLE documents ("
+        " id VARCHAR(64) PRIMARY KEY, filename VARCHAR(255) NOT NULL,"
+        " file_type VARCHAR(16) NOT NULL, mime_type VARCHAR(64) NOT NULL,"
+        " storage_path VARCHAR(512) NOT NULL, file_size INTEGER NOT NULL,"
+        " language VARCHAR(16) NOT NULL, status VARCHAR(32) NOT NULL,"
+        " error_message TEXT, created_at DATETIME NOT NULL)"
+    )
+    connection.execute(
+        "CREATE TABLE document_chunks ("
+        " id VARCHAR(64) PRIMARY KEY, document_id VARCHAR(64), chunk_index INTEGER NOT NULL,"
+        " page INTEGER, text TEXT NOT NULL, char_count INTEGER NOT NULL,"
+        " created_at DATETIME NOT NULL)"
+    )
+    connection.execute(
+        "INSERT INTO documents VALUES"
+        " ('d1', 'eski.pdf', 'pdf', 'application/pdf', '/tmp/eski.pdf', 10, 'tr', 'indexed', NULL,"
+        " '2025-01-01 00:00:00')"
+    )
+    connection.commit()
+    connection.close()
+
+    database = Database(f"sqlite:///{db_path}")
+    database.init_schema()
+    database.init_schema()
+
+    inspector = inspect(database.engine)
+    assert "content_hash" in {column["name"] for column in inspector.get_columns("documents")}
+    assert "document_aliases" in inspector.get_table_names()
+    with database.engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT content_hash FROM documents").scalar_one() is None
+    chunk_columns = {column["name"] for column in inspector.get_columns("document_chunks")}
+    assert {"page_end", "content_hash"} <= chunk_columns
+
+
+def test_chunk_bulk_insert_streams_rows_and_joins_caller_transaction(tmp_path: Path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'app.db'}")
+    database.init_schema()
+    session = database.session_factory()
+    documents = DocumentRepository(session)
+    documents.create(
+        Document(
+            id="d1",
+            filename="buyuk.pdf",
+            file_type="pdf",
+            mime_type="application/pdf",
+            storage_path=str(tmp_path / "buyuk.pdf"),
+            file_size=1,
+            status="processing",
+        )
+    )
+    chunks = ChunkRepository(session)
+
+    def generate(count: int):
+        for index in range(count):
+            yield ChunkPayload(
+                id=f"c{index}",
+                document_id="d1",
+                filename="buyuk.pdf",
+                chunk_index=index,
+                page=1,
+                text=f"parca {index}",
+            )
+
+    assert chunks.replace_for_document("d1", generate(2500), commit=False) == 2500
+    session.rollback()
+    assert chunks.list_for_documents(["d1"]) == []
+
+    chunks.replace_for_document("d1", generate(2500), commit=False)
+    documents.update_status("d1", status="indexed")
+    session.close()
+
+    session = database.session_factory()
+    stored = ChunkRepository(session).list_for_documents(["d1"])
+    assert len(stored) == 2500
+    assert all(chunk.created_at is not None for chunk in stored)
+    assert DocumentRepository(session).get("d1").status == "indexed"
+    session.close()
+
+
+def test_sqlite_connections_use_wal_and_tuned_pragmas(tmp_path: Path) -> None:
+    database = Database(f"sqlite:///{tmp_path / 'app.db'}", sqlite_busy_timeout_ms=1234)
+
+    with database.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar_one() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar_one() == 1
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar_one() == 1234
+    assert database.engine.pool.size() == 5
+    database.dispose()
+
+
+def test_database_url_setting_overrides_sqlite_path(settings: Settings) -> None:
+    assert settings.database_url.startswith("sqlite:///")
+    external = replace(settings, external_database_url="postgresql+psycopg://app@db/belgeler")
+    assert external.database_url == "postgresql+psycopg://app@db/belgeler"
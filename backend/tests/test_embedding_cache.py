@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app.services.embedding_cache import EmbeddingCache
+from backend.app.services.gemini import GeminiClient
+
+
+class _Embedding:
+    def __init__(self, values: list[float]) -> None:
+        self.values = values
+
+
+class _EmbedResponse:
+    def __init__(self, embeddings: list[_Embedding]) -> None:
+        self.embeddings = embeddings
+
+
+class _CountingModels:
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+        self.dimensions: list[int | None] = []
+
+    def embed_content(self, *, model: str, contents: list[str], config) -> _EmbedResponse:  # noqa: ANN001
+        self.embedded.extend(contents)
+        self.dimensions.append(config.output_dimensionality)
+        return _EmbedResponse([_Embedding([float(len(text)), 0.5]) for text in contents])
+
+
+class _Client:
+    def __init__(self) -> None:
+        self.models = _CountingModels()
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = EmbeddingCache(tmp_path / "cache.db", max_entries=2)
+    cache.put_many("m", "RETRIEVAL_DOCUMENT", ["a", "b"], [[1.0], [2.0]])
+    # Touch "a" so "b" becomes the eviction candidate.
+    assert cache.get_many("m", "RETRIEVAL_DOCUMENT", ["a"]) == [[1.0]]
+    cache.put_many("m", "RETRIEVAL_DOCUMENT", ["c"], [[3.0]])
+
+    assert cache.get_many("m", "RETRIEVAL_DOCUMENT", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+    # Same text under a different task type is a different key.
+    assert cache.get_many("m", "RETRIEVAL_QUERY", ["a"]) == [None]
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+
+
+def test_embed_texts_serves_repeated_texts_from_cache(tmp_path: Path) -> None:
+    cache = EmbeddingCache(tmp_path / "cache.db")
+    client = GeminiClient(
+        api_key="test-key",
+        model_name="gemini-test",
+        embedding_model="embedding-test",
+        embedding_cache=cache,
+    )
+    stub = _Client()
+    client._client = stub  # type: ignore[attr-defined]
+
+    first = client.embed_texts(["ortak sayfa", "ilk belge", "ortak sayfa"])
+    second = client.embed_texts(["ortak sayfa", "ikinci belge"])
+
+    assert first == [[11.0, 0.5], [9.0, 0.5], [11.0, 0.5]]
+    assert second == [[11.0, 0.5], [12.0, 0.5]]
+    assert stub.models.embedded == ["ortak sayfa", "ilk belge", "ikinci belge"]
+
+    # Persisted across instances.
+    reopened = EmbeddingCache(tmp_path / "cache.db")
+    assert reopened.get_many("embedding-test", "RETRIEVAL_DOCUMENT", ["ilk belge"]) == [[9.0, 0.5]]
+
+
+def test_embedding_dimensions_are_requested_and_cached_separately(tmp_path: Path) -> None:
+    cache = EmbeddingCache(tmp_path / "cache.db")
+    clients = [
+        GeminiClient(
+            api_key="test-key",
+            model_name="gemini-test",
+            embedding_model="embedding-test",
+            embedding_cache=cache,
+            embedding_dimensions=dimensions,
+        )
+        for dimensions in (0, 768)
+    ]
+    stubs = [_Client(), _Client()]
+    for client, stub in zip(clients, stubs, strict=True):
+        client._client = stub  # type: ignore[attr-defined]
+        client.embed_texts(["ayni metin"])
+
+    assert [stub.models.dimensions for stub in stubs] == [[None], [768]]
+    assert clients[1].embedding_space == "embedding-test@768"
+    assert cache.get_many("embedding-test@768", "RETRIEVAL_DOCUMENT", ["ayni metin"]) != [None]
+
+
+def test_health_reports_embedding_cache_counters(client: TestClient) -> None:
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    stats = response.json()["caches"]["embeddings"]
+    assert stats["hits"] == 0
+    assert stats["entries"] == 0
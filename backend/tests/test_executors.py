@@ -0,0 +1,46 @@
+import asyncio
+import os
+import threading
+
+from backend.app.services.executors import ExecutorPools
+
+
+def test_run_cpu_runs_inline_without_process_pool():
+    pools = ExecutorPools(cpu_workers=0, blocking_io_workers=2)
+    try:
+        assert pools.cpu is None
+        assert pools.run_cpu(os.getpid) == os.getpid()
+    finally:
+        pools.shutdown()
+
+
+def test_run_cpu_uses_worker_process():
+    pools = ExecutorPools(cpu_workers=1, blocking_io_workers=1)
+    try:
+        assert pools.run_cpu(os.getpid) != os.getpid()
+        assert pools.run_cpu(sorted, [3, 1, 2], reverse=True) == [3, 2, 1]
+    finally:
+        pools.shutdown()
+
+
+def test_run_blocking_keeps_event_loop_free():
+    pools = ExecutorPools(cpu_workers=0, blocking_io_workers=2)
+    release = threading.Event()
+
+    async def scenario() -> tuple[str, list[str]]:
+        ticks: list[str] = []
+        blocked = asyncio.ensure_future(pools.run_blocking(release.wait, 5))
+        for _ in range(3):
+            await asyncio.sleep(0)
+            ticks.append("tick")
+        release.set()
+        await blocked
+        name = await pools.run_blocking(lambda: threading.current_thread().name)
+        return name, ticks
+
+    try:
+        name, ticks = asyncio.run(scenario())
+        assert ticks == ["tick", "tick", "tick"]
+        assert name.startswith("blocking-io")
+    finally:
+        pools.shutdown()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import io
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from backend.app.services import extraction
+from backend.app.services.extraction import DocumentExtractor, _PageScan
+from backend.tests.fakes import FakeGeminiClient
+from backend.tests.test_api import create_pdf_bytes
+
+
+class _SlowOcrClient(FakeGeminiClient):
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def extract_text_from_image(self, image_bytes: bytes, mime_type: str) -> str:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later pages finish first so ordering cannot come from completion order.
+        time.sleep(0.05 / int(image_bytes.decode()))
+        with self._lock:
+            self.in_flight -= 1
+        return f"OCR sayfa {image_bytes.decode()} metni"
+
+
+def test_concurrent_ocr_respects_limit_and_keeps_page_order(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    scans = [
+        _PageScan(page=page, native_text="", image=(str(page).encode(), "image/png"), native_seconds=0.0)
+        for page in range(1, 9)
+    ]
+    monkeypatch.setattr(extraction, "_scan_pdf_pages", lambda *args: scans)
+
+    client = _SlowOcrClient()
+    extractor = DocumentExtractor(client, min_chars_before_ocr=20, ocr_max_concurrency=3)
+    report = extractor.extract_with_report(tmp_path / "scan.pdf", "pdf")
+
+    assert [segment.page for segment in report.segments] == list(range(1, 9))
+    assert report.segments[4].text == "OCR sayfa 5 metni"
+    assert all(segment.source == "ocr" for segment in report.segments)
+    assert 1 < client.max_in_flight <= 3
+    assert [timing.page for timing in report.page_timings] == list(range(1, 9))
+    assert all(timing.ocr_seconds > 0 for timing in report.page_timings)
+
+
+def test_process_pool_extraction_matches_serial_order(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    source = PdfReader(io.BytesIO(create_pdf_bytes()))
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_page(source.pages[0])
+    pdf_path = tmp_path / "multi.pdf"
+    with pdf_path.open("wb") as handle:
+        writer.write(handle)
+
+    # One page per task so the three pages really are spread over separate submissions.
+    monkeypatch.setattr(extraction, "_PAGES_PER_TASK", 1)
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        extractor = DocumentExtractor(
+            FakeGeminiClient(),
+            min_chars_before_ocr=5,
+            page_executor=pool,
+            parallel_min_pages=1,
+        )
+        segments = extractor.extract(pdf_path, "pdf")
+
+    serial = DocumentExtractor(FakeGeminiClient(), min_chars_before_ocr=5).extract(pdf_path, "pdf")
+    assert [(s.page, s.source, s.text) for s in segments] == [
+        (s.page, s.source, s.text) for s in serial
+    ]
+    assert [segment.page for segment in segments] == [1, 2, 3]
@@ -1,5 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from backend.app.services import gemini
 from backend.app.services.gemini import GeminiClient
 
 
@@ -45,3 +52,210 @@ def test_embed_texts_splits_large_batches() -> None:
     assert len(vectors) == 205
     assert stub.models.batch_sizes == [100, 100, 5]
 
+
+
+class _OrderedModels:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_content(self, *, model: str, contents: list[str], config) -> _EmbedResponse:  # noqa: ANN001
+        self.calls += 1
+        # Earlier batches respond slower so completion order differs from input order.
+        first_index = int(contents[0].split("-")[1])
+        time.sleep(0.02 if first_index == 0 else 0.0)
+        return _EmbedResponse([_Embedding([float(text.split("-")[1])]) for text in contents])
+
+
+class _FlakyModels:
+    def __init__(self, failures: int, code: int = 500, error: Exception | None = None) -> None:
+        self.failures = failures
+        self.code = code
+        self.error = error
+        self.calls = 0
+
+    def embed_content(self, *, model: str, contents: list[str], config) -> _EmbedResponse:  # noqa: ANN001
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error or _ApiError(self.code)
+        return _EmbedResponse([_Embedding([1.0]) for _ in contents])
+
+
+class _ApiError(Exception):
+    def __init__(self, code: int) -> None:
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def _make_client(**kwargs) -> GeminiClient:  # noqa: ANN003
+    return GeminiClient(
+        api_key="test-key",
+        model_name="gemini-test",
+        embedding_model="embedding-test",
+        use_system_proxy=False,
+        **kwargs,
+    )
+
+
+def test_embed_texts_concurrent_batches_keep_input_order() -> None:
+    client = _make_client(embed_max_concurrency=4)
+    stub = _Client()
+    stub.models = _OrderedModels()
+    client._client = stub  # type: ignore[attr-defined]
+
+    texts = [f"chunk-{i}" for i in range(350)]
+    vectors = client.embed_texts(texts)
+
+    assert [vector[0] for vector in vectors] == [float(i) for i in range(350)]
+    assert stub.models.calls == 4
+
+
+def test_embed_texts_retries_rate_limit_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr(gemini, "_sleep", sleeps.append)
+
+    client = _make_client(embed_max_retries=3)
+    stub = _Client()
+    stub.models = _FlakyModels(failures=2, code=429)
+    client._client = stub  # type: ignore[attr-defined]
+
+    assert client.embed_texts(["a", "b"]) == [[1.0], [1.0]]
+    assert stub.models.calls == 3
+    assert len(sleeps) == 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [httpx.ReadTimeout("read timed out"), httpx.ConnectError("connection refused")],
+)
+def test_embed_texts_retries_httpx_transport_errors(monkeypatch: pytest.MonkeyPatch, error: Exception) -> None:
+    monkeypatch.setattr(gemini, "_sleep", lambda seconds: None)
+
+    client = _make_client(embed_max_retries=3)
+    stub = _Client()
+    stub.models = _FlakyModels(failures=1, error=error)
+    client._client = stub  # type: ignore[attr-defined]
+
+    assert client.embed_texts(["a"]) == [[1.0]]
+    assert stub.models.calls == 2
+
+
+def test_embed_texts_does_not_retry_client_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(gemini, "_sleep", lambda seconds: None)
+
+    client = _make_client(embed_max_retries=3)
+    stub = _Client()
+    stub.models = _FlakyModels(failures=1, code=400)
+    client._client = stub  # type: ignore[attr-defined]
+
+    with pytest.raises(_ApiError):
+        client.embed_texts(["a"])
+    assert stub.models.calls == 1
+
+
+def test_rate_limiter_waits_for_window_when_budget_exhausted(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(gemini, "_sleep", fake_sleep)
+    limiter = gemini._RateLimiter(requests_per_minute=2, tokens_per_minute=0, clock=lambda: now[0])
+
+    limiter.acquire(10)
+    limiter.acquire(10)
+    assert sleeps == []
+
+    limiter.acquire(10)
+    assert sleeps and now[0] >= 60.0
+
+
+class _AsyncModels:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def embed_content(self, *, model: str, contents: list[str], config) -> _EmbedResponse:  # noqa: ANN001
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise _ApiError(503)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        first_index = int(contents[0].split("-")[1])
+        await asyncio.sleep(0.02 if first_index == 0 else 0.0)
+        self.in_flight -= 1
+        return _EmbedResponse([_Embedding([float(text.split("-")[1])]) for text in contents])
+
+
+class _AsyncClient:
+    def __init__(self, models: object) -> None:
+        self.aio = type("_Aio", (), {"models": models, "files": None})()
+
+
+def test_async_embed_texts_keeps_order_and_bounds_concurrency() -> None:
+    client = _make_client(embed_max_concurrency=8, max_concurrency=2)
+    models = _AsyncModels()
+    client._client = _AsyncClient(models)  # type: ignore[attr-defined]
+
+    texts = [f"chunk-{i}" for i in range(450)]
+    vectors = asyncio.run(client.aio.embed_texts(texts))
+
+    assert [vector[0] for vector in vectors] == [float(i) for i in range(450)]
+    assert models.calls == 5
+    assert models.max_in_flight == 2
+
+
+def test_async_embed_texts_retries_without_blocking(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(gemini, "_async_sleep", fake_sleep)
+    client = _make_client(embed_max_retries=3)
+    models = _AsyncModels(failures=2)
+    client._client = _AsyncClient(models)  # type: ignore[attr-defined]
+
+    assert asyncio.run(client.aio.embed_texts(["chunk-1"])) == [[1.0]]
+    assert models.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_async_call_times_out() -> None:
+    client = _make_client(request_timeout_seconds=0.01)
+
+    class _HangingModels:
+        async def generate_content(self, **kwargs) -> None:  # noqa: ANN003
+            await asyncio.sleep(1)
+
+    client._client = _AsyncClient(_HangingModels())  # type: ignore[attr-defined]
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(client.aio.answer_question("soru", []))
+
+
+def test_ocr_calls_use_their_own_timeout() -> None:
+    client = _make_client(request_timeout_seconds=0.01)
+    configs: list[object] = []
+
+    class _SlowModels:
+        async def generate_content(self, *, model: str, contents: list[object], config) -> object:  # noqa: ANN001
+            configs.append(config)
+            await asyncio.sleep(0.05)
+            return type("_Response", (), {"text": "sayfa metni"})()
+
+    client._client = _AsyncClient(_SlowModels())  # type: ignore[attr-defined]
+
+    # Slower than the request timeout, which only bounds embedding and answer calls.
+    assert asyncio.run(client.aio.extract_text_from_image(b"png", "image/png")) == "sayfa metni"
+    assert configs[0].http_options is None
+    assert client._embed_config("RETRIEVAL_DOCUMENT").http_options.timeout == 10
+
+    bounded = _make_client(request_timeout_seconds=0.01, ocr_timeout_seconds=0.02)
+    bounded._client = _AsyncClient(_SlowModels())  # type: ignore[attr-defined]
+    with pytest.raises(TimeoutError):
+        asyncio.run(bounded.aio.extract_text_from_image(b"png", "image/png"))
+    assert configs[1].http_options.timeout == 20
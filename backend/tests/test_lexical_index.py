@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from backend.app.services.chunking import ChunkPayload
+from backend.app.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from backend.app.services.vector_store import RetrievedChunk
+
+
+def _chunk(chunk_id: str, document_id: str, text: str) -> ChunkPayload:
+    return ChunkPayload(
+        id=chunk_id,
+        document_id=document_id,
+        filename=f"{document_id}.pdf",
+        chunk_index=0,
+        page=1,
+        text=text,
+    )
+
+
+def _hit(chunk_id: str) -> RetrievedChunk:
+    return RetrievedChunk(
+        chunk_id=chunk_id,
+        document_id="d1",
+        filename="d1.pdf",
+        page=1,
+        text=chunk_id,
+        distance=0.1,
+    )
+
+
+def test_lexical_index_matches_exact_terms_and_filters_documents(tmp_path: Path) -> None:
+    index = LexicalIndex(tmp_path / "lexical.db")
+    index.replace_document(
+        "d1",
+        [
+            _chunk("c1", "d1", "Parca numarasi TX-4471 montaj talimati."),
+            _chunk("c2", "d1", "Genel bakim plani ve ISTANBUL tesisi."),
+        ],
+    )
+    index.replace_document("d2", [_chunk("c3", "d2", "TX-4471 baska bir belgede de geciyor.")])
+
+    hits = index.search("TX-4471 nedir?", ["d1"], top_k=5)
+    assert [hit.chunk_id for hit in hits] == ["c1"]
+    assert hits[0].text.startswith("Parca numarasi")
+
+    # Case and Turkish dotted/dotless i differences must not prevent a match.
+    assert [hit.chunk_id for hit in index.search("istanbul", ["d1", "d2"], top_k=5)] == ["c2"]
+    # FTS5 syntax in user input is treated as plain text.
+    assert index.search('"AND (NEAR', ["d1"], top_k=5) == []
+
+    index.delete(["d1"])
+    assert [hit.chunk_id for hit in index.search("TX-4471", ["d1", "d2"], top_k=5)] == ["c3"]
+    index.close()
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    fused = reciprocal_rank_fusion([[_hit("a"), _hit("b"), _hit("c")], [_hit("c"), _hit("d")]])
+
+    ids = [chunk.chunk_id for chunk, _ in fused]
+    assert ids[0] == "c"
+    assert set(ids) == {"a", "b", "c", "d"}
+    assert ids.index("a") < ids.index("d")
+
+
+def test_lexical_index_keeps_page_range_and_rebuilds_legacy_table(tmp_path: Path) -> None:
+    db_path = tmp_path / "lexical.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(
+        "CREATE VIRTUAL TABLE chunk_fts USING fts5("
+        " content, chunk_id UNINDEXED, document_id UNINDEXED, filename UNINDEXED,"
+        " page UNINDEXED, text UNINDEXED)"
+    )
+    legacy.execute("INSERT INTO chunk_fts VALUES ('eski', 'c0', 'd1', 'd1.pdf', 1, 'eski')")
+    legacy.commit()
+    legacy.close()
+
+    index = LexicalIndex(db_path)
+    # The old table had no page_end/chunk_index columns; it is dropped so startup backfill
+    # rebuilds it.
+    assert index.is_empty()
+
+    chunk = _chunk("c1", "d1", "sayfa sonunda devam eden tork degeri")
+    chunk.page_end = 2
+    index.replace_document("d1", [chunk])
+    [hit] = index.search("tork", ["d1"], top_k=1)
+    assert (hit.page, hit.page_end, hit.chunk_index) == (1, 2, 0)
+    index.close()
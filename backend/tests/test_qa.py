@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from backend.app.services.qa import QAService, _AnswerContext
+from backend.app.services.reranking import LexicalMMRReranker
+from backend.app.services.vector_store import RetrievedChunk
+from backend.tests.fakes import FakeGeminiClient
+
+
+class _IndexedDocuments:
+    def list_by_ids(self, document_ids: list[str]) -> list[SimpleNamespace]:
+        return [SimpleNamespace(id=document_id, status="indexed") for document_id in document_ids]
+
+
+class _RankedStore:
+    """Returns a fixed ranking, truncated to top_k, and records the requested sizes."""
+
+    def __init__(self, hits: list[RetrievedChunk]) -> None:
+        self.hits = hits
+        self.requested: list[int] = []
+
+    def query(self, query_embedding: list[float], document_ids: list[str], top_k: int) -> list[RetrievedChunk]:
+        self.requested.append(top_k)
+        return self.hits[:top_k]
+
+
+class _FixedLexicalIndex:
+    def __init__(self, hits: list[RetrievedChunk]) -> None:
+        self.hits = hits
+
+    def search(self, query: str, document_ids: list[str], top_k: int) -> list[RetrievedChunk]:
+        return self.hits[:top_k]
+
+
+def _hit(
+    chunk_id: str,
+    text: str,
+    *,
+    chunk_index: int,
+    distance: float = 0.1,
+    page: int = 1,
+) -> RetrievedChunk:
+    return RetrievedChunk(
+        chunk_id=chunk_id,
+        document_id="d1",
+        filename="d1.pdf",
+        page=page,
+        text=text,
+        distance=distance,
+        chunk_index=chunk_index,
+    )
+
+
+def _service(store: _RankedStore, **kwargs: object) -> QAService:
+    return QAService(
+        document_repository=_IndexedDocuments(),
+        vector_store=store,
+        ai_client=FakeGeminiClient(),
+        retrieval_max_distance=0.5,
+        **{"retrieval_mode": "vector", **kwargs},
+    )
+
+
+def _build_context(service: QAService, question: str, top_k: int, **kwargs: object) -> _AnswerContext:
+    context = asyncio.run(service._abuild_context(question, ["d1"], top_k, **kwargs))
+    assert isinstance(context, _AnswerContext)
+    return context
+
+
+def test_context_merges_adjacent_chunks_without_repeating_overlap() -> None:
+    overlap = "Tork degeri 45 Nm olarak uygulanir."
+    store = _RankedStore(
+        [
+            _hit("c3", f"{overlap} Civatalar capraz sirayla sikilir.", chunk_index=3, page=2),
+            _hit("c2", f"Montaj adimlari asagidadir. {overlap}", chunk_index=2, distance=0.2),
+            _hit("c7", "Bakim periyodu 600 ucus saatidir.", chunk_index=7, distance=0.3, page=4),
+        ]
+    )
+
+    context = _build_context(_service(store), "tork degeri nedir", 3)
+
+    assert [item["chunk_id"] for item in context.context_items] == ["c2", "c7"]
+    merged = context.context_items[0]
+    assert merged["text"] == f"Montaj adimlari asagidadir. {overlap} Civatalar capraz sirayla sikilir."
+    assert (merged["page"], merged["page_end"]) == (1, 2)
+    # The merged item keeps its best member's distance.
+    assert context.chunks[0].distance == 0.1
+
+
+def test_context_drops_near_duplicates_and_widens_fetch_once() -> None:
+    boilerplate = "Bu belge TUSAS gizlilik kurallarina tabidir ve izinsiz cogaltilamaz."
+    hits = [_hit(f"b{index}", boilerplate, chunk_index=index * 10) for index in range(4)]
+    hits.append(_hit("u1", "Kanat bakim talimati ikinci bolumdedir.", chunk_index=41))
+    store = _RankedStore(hits)
+
+    context = _build_context(_service(store), "gizlilik", 2)
+
+    # 4 hits, all passing but only one distinct: the second pass reaches u1.
+    assert store.requested == [4, 12]
+    assert [item["chunk_id"] for item in context.context_items] == ["b0", "u1"]
+
+
+def test_context_does_not_widen_when_cut_off_fails_threshold() -> None:
+    store = _RankedStore(
+        [
+            _hit("a", "Motor yagi her 50 saatte kontrol edilir.", chunk_index=0),
+            _hit("b", "Alakasiz bir paragraf.", chunk_index=5, distance=0.9),
+        ]
+    )
+
+    context = _build_context(_service(store), "motor yagi", 1)
+
+    assert store.requested == [2]
+    assert [item["chunk_id"] for item in context.context_items] == ["a"]
+
+
+def test_hybrid_widening_ignores_lexical_hit_ranked_last() -> None:
+    boilerplate = "Bu belge TUSAS gizlilik kurallarina tabidir ve izinsiz cogaltilamaz."
+    repeats = [_hit(f"b{index}", boilerplate, chunk_index=index * 10) for index in range(3)]
+    store = _RankedStore([*repeats, _hit("x", "Alakasiz bir paragraf.", chunk_index=50, distance=0.9)])
+    lexical_only = _hit("lex", boilerplate, chunk_index=60, distance=-3.0)
+    service = _service(
+        store,
+        retrieval_mode="hybrid",
+        lexical_index=_FixedLexicalIndex([repeats[0], repeats[1], lexical_only]),
+    )
+
+    context = _build_context(service, "gizlilik", 2)
+
+    # Fused order is b0, b1, b2, lex: the lexical hit sits last at the threshold, but the
+    # vector hits already reach past it, so a wider pass would add nothing usable.
+    assert store.requested == [4]
+    assert [item["chunk_id"] for item in context.context_items] == ["b0"]
+
+
+def test_context_respects_token_budget_but_keeps_best_chunk() -> None:
+    long_text = " ".join(["uzunkelime"] * 40)
+    store = _RankedStore(
+        [
+            _hit("a", long_text, chunk_index=0),
+            _hit("b", "Ikinci parca kisa bir aciklamadir.", chunk_index=5),
+        ]
+    )
+
+    limited = _build_context(_service(store, context_max_tokens=20), "soru", 2)
+    unlimited = _build_context(_service(store, context_max_tokens=0), "soru", 2)
+
+    assert [item["chunk_id"] for item in limited.context_items] == ["a"]
+    assert [item["chunk_id"] for item in unlimited.context_items] == ["a", "b"]
+
+
+def test_context_is_reranked_and_trimmed_to_rerank_top_n() -> None:
+    store = _RankedStore(
+        [
+            _hit("a", "Kanat montaji icin genel aciklama.", chunk_index=0),
+            _hit("b", "Parca numarasi TX-4471 olan civata kullanilir.", chunk_index=5, distance=0.2),
+            _hit("c", "Boya kuruma suresi 24 saattir.", chunk_index=9, distance=0.3),
+        ]
+    )
+    service = _service(store, reranker=LexicalMMRReranker(mmr_lambda=1.0), rerank_top_n=1)
+
+    timings: dict[str, float] = {}
+    context = _build_context(service, "TX-4471 civata", 3, timings=timings)
+
+    assert [item["chunk_id"] for item in context.context_items] == ["b"]
+    assert {"vector", "rerank"} <= timings.keys()
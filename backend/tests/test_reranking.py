@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.app.services.reranking import LexicalMMRReranker, PassthroughReranker, create_reranker
+from backend.app.services.vector_store import RetrievedChunk
+
+
+class _EmbeddingStore:
+    def __init__(self, embeddings: dict[str, list[float]]) -> None:
+        self.embeddings = embeddings
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, list[float]]:
+        return {chunk_id: self.embeddings[chunk_id] for chunk_id in chunk_ids if chunk_id in self.embeddings}
+
+
+def _chunk(chunk_id: str, text: str, distance: float = 0.2) -> RetrievedChunk:
+    return RetrievedChunk(
+        chunk_id=chunk_id,
+        document_id="d1",
+        filename="d1.pdf",
+        page=1,
+        text=text,
+        distance=distance,
+    )
+
+
+def test_lexical_reranker_prefers_exact_term_match() -> None:
+    chunks = [
+        _chunk("a", "Kanat montaji icin genel aciklama.", distance=0.10),
+        _chunk("b", "Parca numarasi TX-4471 olan civata kullanilir.", distance=0.15),
+        _chunk("c", "Boya kuruma suresi 24 saattir.", distance=0.20),
+    ]
+
+    ranked = LexicalMMRReranker(mmr_lambda=1.0).rerank("TX-4471 numarali civata", chunks, 2)
+
+    assert [chunk.chunk_id for chunk in ranked] == ["b", "a"]
+
+
+def test_mmr_skips_redundant_chunks_using_stored_embeddings() -> None:
+    chunks = [
+        _chunk("a", "Motor yagi her 50 saatte kontrol edilir.", distance=0.10),
+        _chunk("b", "Motor yagi 50 saatte bir kontrol edilmelidir.", distance=0.11),
+        _chunk("c", "Motor yagi filtresi 100 saatte degistirilir.", distance=0.25),
+    ]
+    store = _EmbeddingStore({"a": [1.0, 0.0], "b": [0.99, 0.05], "c": [0.2, 1.0]})
+
+    ranked = LexicalMMRReranker(store, mmr_lambda=0.5).rerank("motor yagi", chunks, 2)
+    relevance_only = LexicalMMRReranker(store, mmr_lambda=1.0).rerank("motor yagi", chunks, 2)
+
+    assert [chunk.chunk_id for chunk in ranked] == ["a", "c"]
+    assert [chunk.chunk_id for chunk in relevance_only] == ["a", "b"]
+
+
+def test_mmr_falls_back_to_word_overlap_without_embeddings() -> None:
+    repeated = "Bu belge gizlilik kurallarina tabidir ve izinsiz cogaltilamaz."
+    chunks = [
+        _chunk("a", repeated, distance=0.10),
+        _chunk("b", repeated, distance=0.10),
+        _chunk("c", "Gizlilik derecesi kapak sayfasinda belirtilir.", distance=0.30),
+    ]
+
+    ranked = LexicalMMRReranker(_EmbeddingStore({}), mmr_lambda=0.5).rerank("gizlilik", chunks, 2)
+
+    assert [chunk.chunk_id for chunk in ranked] == ["a", "c"]
+
+
+def test_create_reranker_supports_passthrough() -> None:
+    chunks = [_chunk("a", "bir"), _chunk("b", "iki"), _chunk("c", "uc")]
+
+    assert isinstance(create_reranker("none"), PassthroughReranker)
+    assert create_reranker("none").rerank("soru", chunks, 2) == chunks[:2]
+    assert isinstance(create_reranker("lexical_mmr"), LexicalMMRReranker)
+    with pytest.raises(ValueError, match="lexical-mmr"):
+        create_reranker("lexical-mmr")
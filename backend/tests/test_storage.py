@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from backend.app.services.storage import FileStorageService
+
+
+def test_staged_upload_hashes_and_renames_atomically(tmp_path: Path) -> None:
+    storage = FileStorageService(tmp_path / "uploads")
+    staged = storage.stage()
+    staged.write(b"ilk parca ")
+    staged.write(b"ikinci parca")
+    assert staged.temp_path.parent == storage.upload_dir
+
+    saved = staged.commit("doc1", "rapor (son).pdf")
+
+    assert saved.storage_path == storage.upload_dir / "doc1_rapor__son_.pdf"
+    assert saved.storage_path.read_bytes() == b"ilk parca ikinci parca"
+    assert saved.file_size == 22
+    assert saved.sha256 == hashlib.sha256(b"ilk parca ikinci parca").hexdigest()
+    assert not staged.temp_path.exists()
+
+
+def test_discarded_and_stale_partial_uploads_are_removed(tmp_path: Path) -> None:
+    upload_dir = tmp_path / "uploads"
+    storage = FileStorageService(upload_dir)
+    staged = storage.stage()
+    staged.write(b"yarim")
+    staged.discard()
+    assert list(upload_dir.iterdir()) == []
+
+    stale = storage.stage()
+    stale.write(b"coken worker")
+    old = time.time() - 7200
+    os.utime(stale.temp_path, (old, old))
+    fresh = storage.stage()
+
+    FileStorageService(upload_dir)
+    assert not stale.temp_path.exists()
+    assert fresh.temp_path.exists()
+    fresh.discard()
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
 from backend.app.services.chunking import ChunkPayload
-from backend.app.services.vector_store import ChromaVectorStore
+from backend.app.services.vector_store import ChromaVectorStore, LocalVectorStore
 
 
 class _StubCollection:
@@ -42,3 +48,282 @@ def test_chroma_upsert_omits_none_metadata_values() -> None:
     assert "page" not in store.collection.metadatas[0]
     assert store.collection.metadatas[1]["page"] == 3
 
+
+
+def _chunk(chunk_id: str, document_id: str, index: int = 0) -> ChunkPayload:
+    return ChunkPayload(
+        id=chunk_id,
+        document_id=document_id,
+        filename=f"{document_id}.pdf",
+        chunk_index=index,
+        page=index + 1,
+        text=f"text {chunk_id}",
+    )
+
+
+def test_local_store_ranks_by_cosine_within_selected_documents(tmp_path: Path) -> None:
+    store = LocalVectorStore(tmp_path / "vectors")
+    store.upsert(
+        [_chunk("a1", "doc-a", 0), _chunk("a2", "doc-a", 1), _chunk("a3", "doc-a", 2)],
+        [[1.0, 0.0], [0.6, 0.8], [0.0, 2.0]],
+    )
+    store.upsert([_chunk("b1", "doc-b")], [[1.0, 0.01]])
+
+    hits = store.query([1.0, 0.0], ["doc-a"], top_k=2)
+    assert [hit.chunk_id for hit in hits] == ["a1", "a2"]
+    assert abs(hits[0].distance) < 1e-6
+    assert abs(hits[1].distance - 0.4) < 1e-6
+
+    both = store.query([1.0, 0.0], ["doc-a", "doc-b", "missing"], top_k=10)
+    assert [hit.chunk_id for hit in both] == ["a1", "b1", "a2", "a3"]
+    assert abs(both[-1].distance - 1.0) < 1e-6
+
+    assert store.query([1.0, 0.0], ["missing"], top_k=3) == []
+
+
+def test_local_store_reindexes_replaced_chunks_and_reloads(tmp_path: Path) -> None:
+    path = tmp_path / "vectors"
+    store = LocalVectorStore(path)
+    store.upsert([_chunk("a1", "doc-a"), _chunk("b1", "doc-b")], [[1.0, 0.0], [0.0, 1.0]])
+    store.upsert([_chunk("a1", "doc-a")], [[0.0, 1.0]])
+
+    reloaded = LocalVectorStore(path)
+    hits = reloaded.query([0.0, 1.0], ["doc-a", "doc-b"], top_k=5)
+    assert {hit.chunk_id for hit in hits} == {"a1", "b1"}
+    assert all(abs(hit.distance) < 1e-6 for hit in hits)
+
+
+def test_local_store_appends_and_compacts_dead_rows(tmp_path: Path) -> None:
+    path = tmp_path / "vectors"
+    store = LocalVectorStore(path, compact_min_dead_rows=1, compact_dead_ratio=0.4)
+    store.upsert([_chunk("a1", "doc-a"), _chunk("a2", "doc-a", 1)], [[1.0, 0.0], [0.0, 1.0]])
+    vectors_file = next(path.glob("vectors-*.f32"))
+    assert vectors_file.stat().st_size == 2 * 2 * 4
+
+    store.upsert([_chunk("b1", "doc-b")], [[1.0, 1.0]])
+    assert vectors_file.stat().st_size == 3 * 2 * 4
+    assert store.dead_row_count == 0
+
+    # Re-upserting both chunks of doc-a supersedes 2 of 5 rows and triggers compaction.
+    store.upsert([_chunk("a1", "doc-a"), _chunk("a2", "doc-a", 1)], [[0.0, 1.0], [1.0, 0.0]])
+    store.wait_for_compaction(timeout=10)
+    assert store.row_count == 3
+    assert store.dead_row_count == 0
+
+    reloaded = LocalVectorStore(path)
+    hits = reloaded.query([1.0, 0.0], ["doc-a", "doc-b"], top_k=3)
+    assert [hit.chunk_id for hit in hits] == ["a2", "b1", "a1"]
+    assert len(list(path.glob("vectors-*.f32"))) == 1
+
+
+def test_local_store_ignores_torn_tail_and_migrates_legacy_json(tmp_path: Path) -> None:
+    legacy = tmp_path / "local_vectors.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "c1": {
+                    "chunk_id": "c1",
+                    "document_id": "doc-a",
+                    "filename": "a.pdf",
+                    "page": 1,
+                    "text": "eski kayit",
+                    "embedding": [0.0, 3.0],
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    path = tmp_path / "vectors"
+    store = LocalVectorStore(path, legacy_json_path=legacy)
+    assert not legacy.exists()
+    assert [hit.text for hit in store.query([0.0, 1.0], ["doc-a"], top_k=1)] == ["eski kayit"]
+
+    # Simulate a crash that wrote a partial metadata line after the vector bytes.
+    meta_file = next(path.glob("meta-*.jsonl"))
+    with meta_file.open("a", encoding="utf-8") as handle:
+        handle.write('{"row": 1, "chunk_id": "half')
+
+    reloaded = LocalVectorStore(path)
+    assert reloaded.row_count == 1
+    reloaded.upsert([_chunk("c2", "doc-a", 1)], [[1.0, 0.0]])
+    assert LocalVectorStore(path).row_count == 2
+
+
+def test_local_store_delete_writes_tombstone_that_survives_reload(tmp_path: Path) -> None:
+    path = tmp_path / "vectors"
+    store = LocalVectorStore(path)
+    store.upsert([_chunk("a1", "doc-a"), _chunk("b1", "doc-b")], [[1.0, 0.0], [1.0, 0.1]])
+    store.delete(["doc-a", "missing"])
+
+    assert store.query([1.0, 0.0], ["doc-a"], top_k=5) == []
+    assert store.dead_row_count == 1
+
+    # Re-adding the document after the tombstone must keep the new rows alive.
+    store.upsert([_chunk("a2", "doc-a")], [[0.0, 1.0]])
+    reloaded = LocalVectorStore(path)
+    assert [hit.chunk_id for hit in reloaded.query([1.0, 0.0], ["doc-a", "doc-b"], 5)] == ["b1", "a2"]
+    assert reloaded.compact()
+    assert [hit.chunk_id for hit in reloaded.query([1.0, 0.0], ["doc-a", "doc-b"], 5)] == ["b1", "a2"]
+    assert reloaded.dead_row_count == 0
+
+
+def test_local_store_returns_stored_embeddings_by_chunk_id(tmp_path: Path) -> None:
+    store = LocalVectorStore(tmp_path / "vectors")
+    store.upsert([_chunk("a", "d1"), _chunk("b", "d1", 1)], [[3.0, 4.0], [0.0, 2.0]])
+
+    embeddings = store.get_embeddings(["a", "b", "missing"])
+
+    assert set(embeddings) == {"a", "b"}
+    assert embeddings["a"] == pytest.approx([0.6, 0.8])
+    assert embeddings["b"] == pytest.approx([0.0, 1.0])
+    store.delete(["d1"])
+    assert store.get_embeddings(["a"]) == {}
+
+
+def test_local_store_query_many_matches_single_queries(tmp_path: Path) -> None:
+    store = LocalVectorStore(tmp_path / "vectors")
+    store.upsert(
+        [_chunk("a", "d1"), _chunk("b", "d1", 1), _chunk("c", "d2")],
+        [[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]],
+    )
+    store.delete(["d2"])
+    queries = [[1.0, 0.1], [0.0, 3.0], [0.0, 0.0]]
+
+    batched = store.query_many(queries, ["d1", "d2"], top_k=2)
+
+    assert batched == [store.query(query, ["d1", "d2"], top_k=2) for query in queries]
+    assert [hit.chunk_id for hit in batched[1]] == ["b", "a"]
+    assert store.query_many(queries, ["missing"], top_k=2) == [[], [], []]
+
+
+def _random_store(path: Path, rows: int = 300, dimension: int = 64, **kwargs: object) -> LocalVectorStore:
+    rng = np.random.default_rng(7)
+    store = LocalVectorStore(path, **kwargs)
+    store.upsert(
+        [_chunk(f"c{index}", f"d{index % 3}", index) for index in range(rows)],
+        rng.normal(size=(rows, dimension)).tolist(),
+    )
+    return store
+
+
+@pytest.mark.parametrize(("dtype", "row_bytes"), [("float16", 64 * 2), ("int8", 64 + 4)])
+def test_local_store_quantized_rows_keep_ranking_with_rescoring(
+    tmp_path: Path,
+    dtype: str,
+    row_bytes: int,
+) -> None:
+    exact = _random_store(tmp_path / "exact")
+    rescored = _random_store(tmp_path / dtype, storage_dtype=dtype)
+    approximate = _random_store(tmp_path / f"{dtype}-approx", storage_dtype=dtype, rescore=False)
+    queries = np.random.default_rng(11).normal(size=(20, 64)).tolist()
+    documents = ["d0", "d1", "d2"]
+
+    assert exact.vector_bytes == 300 * 64 * 4
+    assert rescored.vector_bytes == 300 * row_bytes
+    assert not list((tmp_path / f"{dtype}-approx").glob("full-*.f32"))
+
+    expected = exact.query_many(queries, documents, top_k=10)
+    rescored_hits = rescored.query_many(queries, documents, top_k=10)
+    assert [[hit.chunk_id for hit in hits] for hits in rescored_hits] == [
+        [hit.chunk_id for hit in hits] for hits in expected
+    ]
+    assert rescored_hits[0][0].distance == pytest.approx(expected[0][0].distance, abs=1e-6)
+
+    # Without rescoring the ranking is approximate; recall@10 stays high.
+    found = approximate.query_many(queries, documents, top_k=10)
+    recall = np.mean(
+        [
+            len({hit.chunk_id for hit in hits} & {hit.chunk_id for hit in truth}) / 10
+            for hits, truth in zip(found, expected, strict=True)
+        ]
+    )
+    assert recall >= 0.9
+    assert found[0][0].distance == pytest.approx(expected[0][0].distance, abs=0.01)
+
+
+def test_local_store_converts_storage_layout_on_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "vectors"
+    store = _random_store(path, rows=20, dimension=8)
+    expected = store.query([1.0] * 8, ["d0", "d1", "d2"], top_k=5)
+
+    quantized = LocalVectorStore(path, storage_dtype="int8")
+    assert [file.suffix for file in sorted(path.glob("*-*.*"))] == [".f32", ".jsonl", ".i8"]
+    assert quantized.query([1.0] * 8, ["d0", "d1", "d2"], top_k=5) == expected
+    assert quantized.get_embeddings(["c1"])["c1"] == pytest.approx(store.get_embeddings(["c1"])["c1"])
+
+    # Back to float32 from the full-precision copy, not the int8 rows.
+    restored = LocalVectorStore(path)
+    assert sorted(file.name for file in path.glob("*-*.*")) == ["meta-2.jsonl", "vectors-2.f32"]
+    assert restored.query([1.0] * 8, ["d0", "d1", "d2"], top_k=5) == expected
+
+
+def _query_counting_chroma(
+    tmp_path: Path,
+    exact_search_max_chunks: int,
+    ann_limit: int | None = None,
+) -> tuple[ChromaVectorStore, list[int], list[list[str]]]:
+    """Chroma store that records ANN calls and embedding fetches; ``ann_limit`` fakes HNSW misses."""
+    store = ChromaVectorStore(tmp_path / "chroma", exact_search_max_chunks=exact_search_max_chunks)
+    store.upsert(
+        [_chunk("a", "d1"), _chunk("b", "d1", 1), _chunk("c", "d2")],
+        [[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]],
+    )
+    ann_calls: list[int] = []
+    embedding_fetches: list[list[str]] = []
+    collection_query = store.collection.query
+    collection_get = store.collection.get
+
+    def counting_query(**kwargs):  # noqa: ANN003, ANN202
+        ann_calls.append(len(kwargs["query_embeddings"]))
+        result = collection_query(**kwargs)
+        if ann_limit is not None:
+            for key in ("ids", "metadatas", "documents", "distances"):
+                result[key] = [row[:ann_limit] for row in result[key]]
+        return result
+
+    def counting_get(**kwargs):  # noqa: ANN003, ANN202
+        if "embeddings" in kwargs.get("include", []):
+            embedding_fetches.append(list(kwargs["ids"]))
+        return collection_get(**kwargs)
+
+    store.collection.query = counting_query
+    store.collection.get = counting_get
+    return store, ann_calls, embedding_fetches
+
+
+def test_chroma_full_ann_results_skip_exact_search(tmp_path: Path) -> None:
+    store, ann_calls, embedding_fetches = _query_counting_chroma(tmp_path, exact_search_max_chunks=2)
+
+    hits = store.query_many([[1.0, 0.1], [0.0, 2.0]], ["d1"], top_k=2)
+
+    assert ann_calls == [2]
+    assert [[hit.chunk_id for hit in query_hits] for query_hits in hits] == [["a", "b"], ["b", "a"]]
+    assert hits[0][0].document_id == "d1"
+    assert hits[0][0].page == 1
+    assert hits[1][0].distance == pytest.approx(0.2)
+    # Fewer chunks than top_k in the selection: nothing is missing, so no fallback either.
+    assert len(store.query([1.0, 0.0], ["d1"], top_k=5)) == 2
+    assert store.query([1.0, 0.0], ["missing"], top_k=5) == []
+    assert embedding_fetches == []
+
+
+def test_chroma_short_ann_results_fall_back_to_exact_search(tmp_path: Path) -> None:
+    store, ann_calls, embedding_fetches = _query_counting_chroma(tmp_path, exact_search_max_chunks=2, ann_limit=1)
+
+    hits = store.query_many([[1.0, 0.1], [0.0, 2.0]], ["d1"], top_k=2)
+
+    assert ann_calls == [2]
+    assert [sorted(ids) for ids in embedding_fetches] == [["a", "b"]]
+    assert [[hit.chunk_id for hit in query_hits] for query_hits in hits] == [["a", "b"], ["b", "a"]]
+    assert hits[1][0].distance == pytest.approx(0.2)
+    assert hits[1][1].chunk_index == 0
+
+
+def test_chroma_large_selection_keeps_short_ann_results(tmp_path: Path) -> None:
+    store, ann_calls, embedding_fetches = _query_counting_chroma(tmp_path, exact_search_max_chunks=2, ann_limit=1)
+
+    hits = store.query_many([[1.0, 0.1], [0.0, 2.0]], ["d1", "d2"], top_k=2)
+
+    assert ann_calls == [2]
+    assert embedding_fetches == []
+    assert [[hit.chunk_id for hit in query_hits] for query_hits in hits] == [["a"], ["c"]]
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { askQuestion, fetchDocuments, uploadDocuments } from "./api";
+import { askQuestionStream, fetchDocuments, uploadDocuments } from "./api";
 import type { AskResponse, DocumentSummary, UploadResponse } from "./types";
 
 import { DocumentList } from "./components/DocumentList";
@@ -13,6 +13,7 @@ function App() {
 
   const [uploadResult, setUploadResult] = useState<UploadResponse | null>(null);
   const [qaResult, setQaResult] = useState<AskResponse | null>(null);
+  const [streamingAnswer, setStreamingAnswer] = useState<string | null>(null);
 
   const [loadingDocuments, setLoadingDocuments] = useState(false);
   const [uploading, setUploading] = useState(false);
@@ -35,6 +36,14 @@ function App() {
     void refreshDocuments();
   }, []);
 
+  // Ingestion runs in background workers; poll while any document is still processing.
+  const hasProcessing = documents.some((doc) => doc.status === "processing");
+  useEffect(() => {
+    if (!hasProcessing) return;
+    const timer = window.setTimeout(() => void refreshDocuments(), 2000);
+    return () => window.clearTimeout(timer);
+  }, [documents, hasProcessing]);
+
   async function handleUpload(): Promise<void> {
     if (!selectedFiles.length) return;
 
@@ -62,18 +71,26 @@ function App() {
 
     setErrorMessage(null);
     setQaResult(null);
+    setStreamingAnswer(null);
 
     try {
       setAsking(true);
-      const result = await askQuestion({
-        question: question.trim(),
-        document_ids: selectedDocumentIds,
-      });
+      const result = await askQuestionStream(
+        {
+          question: question.trim(),
+          document_ids: selectedDocumentIds,
+        },
+        {
+          onCitations: () => setStreamingAnswer(""),
+          onToken: (text) => setStreamingAnswer(prev => (prev ?? "") + text),
+        },
+      );
       setQaResult(result);
     } catch (error) {
       setErrorMessage((error as Error).message);
     } finally {
       setAsking(false);
+      setStreamingAnswer(null);
     }
   }
 
@@ -155,6 +172,7 @@ function App() {
                 onAsk={handleAsk}
                 isAsking={asking}
                 result={qaResult}
+                streamingAnswer={streamingAnswer}
                 selectedDocCount={selectedDocumentIds.length}
               />
             </section>
@@ -1,4 +1,10 @@
-import type { AskRequest, AskResponse, DocumentSummary, UploadResponse } from "./types";
+import type {
+  AskRequest,
+  AskResponse,
+  AskStreamHandlers,
+  DocumentSummary,
+  UploadResponse,
+} from "./types";
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL ?? "http://localhost:8000";
 
@@ -16,11 +22,19 @@ async function parseError(response: Response): Promise<never> {
 }
 
 export async function fetchDocuments(): Promise<DocumentSummary[]> {
-  const response = await fetch(`${API_BASE}/api/documents`);
-  if (!response.ok) {
-    return parseError(response);
-  }
-  return (await response.json()) as DocumentSummary[];
+  // The listing is paginated via X-Next-Cursor; unchanged pages revalidate via ETag (304).
+  const documents: DocumentSummary[] = [];
+  let cursor: string | null = null;
+  do {
+    const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const response = await fetch(`${API_BASE}/api/documents${query}`);
+    if (!response.ok) {
+      return parseError(response);
+    }
+    documents.push(...((await response.json()) as DocumentSummary[]));
+    cursor = response.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return documents;
 }
 
 export async function uploadDocuments(files: File[]): Promise<UploadResponse> {
@@ -56,3 +70,70 @@ export async function askQuestion(payload: AskRequest): Promise<AskResponse> {
 
   return (await response.json()) as AskResponse;
 }
+
+export async function askQuestionStream(
+  payload: AskRequest,
+  handlers: AskStreamHandlers,
+): Promise<AskResponse> {
+  const response = await fetch(`${API_BASE}/api/questions/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify(payload),
+  });
+
+  if (!response.ok || !response.body) {
+    return parseError(response);
+  }
+
+  // EventSource only supports GET, so read the text/event-stream body by hand.
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result: AskResponse | null = null;
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) {
+          event = line.slice(7);
+        } else if (line.startsWith("data: ")) {
+          data += line.slice(6);
+        }
+      }
+      if (!data) {
+        continue;
+      }
+
+      const parsed = JSON.parse(data);
+      if (event === "citations") {
+        handlers.onCitations?.(parsed);
+      } else if (event === "token") {
+        handlers.onToken?.(String(parsed.text ?? ""));
+      } else if (event === "done") {
+        result = parsed as AskResponse;
+      } else if (event === "error") {
+        throw new Error(String(parsed.detail ?? "Cevap uretilemedi."));
+      }
+    }
+  }
+
+  if (!result) {
+    throw new Error("Cevap akisi beklenmedik sekilde kesildi.");
+  }
+  return result;
+}
@@ -5,10 +5,11 @@ interface ChatInterfaceProps {
   onAsk: (question: string) => Promise<void>;
   isAsking: boolean;
   result: AskResponse | null;
+  streamingAnswer: string | null;
   selectedDocCount: number;
 }
 
-export function ChatInterface({ onAsk, isAsking, result, selectedDocCount }: ChatInterfaceProps) {
+export function ChatInterface({ onAsk, isAsking, result, streamingAnswer, selectedDocCount }: ChatInterfaceProps) {
   const [input, setInput] = useState("");
 
   const handleSubmit = (e: React.FormEvent) => {
@@ -37,17 +38,26 @@ export function ChatInterface({ onAsk, isAsking, result, selectedDocCount }: Cha
           </div>
         )}
 
-        {isAsking && (
+        {isAsking && streamingAnswer === null && (
           <div className="thinking-state">
             <div className="scanner"></div>
             <p>Belgeler taranıyor ve anlamlandırılıyor...</p>
           </div>
         )}
 
+        {isAsking && streamingAnswer !== null && (
+          <div className="result-card">
+            <div className="answer-text streaming">
+              {streamingAnswer}
+            </div>
+          </div>
+        )}
+
         {result && !isAsking && (
           <div className="result-card">
             <div className={`confidence-badge ${result.confidence > 0.7 ? "high" : "low"}`}>
               Güven Skoru: %{(result.confidence * 100).toFixed(0)}
+              {result.cached && " · Önbellekten"}
             </div>
 
             <div className="answer-text">
@@ -62,7 +72,12 @@ export function ChatInterface({ onAsk, isAsking, result, selectedDocCount }: Cha
                     <div key={idx} className="citation-card">
                       <div className="cit-header">
                         <span className="cit-file">{cit.filename}</span>
-                        {cit.page && <span className="cit-page">Sayfa {cit.page}</span>}
+                        {cit.page && (
+                          <span className="cit-page">
+                            Sayfa {cit.page}
+                            {cit.page_end && cit.page_end !== cit.page ? `-${cit.page_end}` : ""}
+                          </span>
+                        )}
                       </div>
                       <p className="cit-snippet">"...{cit.snippet}..."</p>
                     </div>
@@ -4,6 +4,7 @@ export type UploadResponse = {
     document_id: string;
     filename: string;
     status: string;
+    duplicate: boolean;
   }>;
   rejected_files: Array<{
     filename: string;
@@ -20,6 +21,13 @@ export type DocumentSummary = {
   created_at: string;
 };
 
+export type DocumentDetail = DocumentSummary & {
+  file_size: number;
+  error_message: string | null;
+  queued: boolean;
+  aliases: string[];
+};
+
 export type AskRequest = {
   question: string;
   document_ids: string[];
@@ -32,6 +40,7 @@ export type Citation = {
   page: number | null;
   chunk_id: string;
   snippet: string;
+  page_end?: number | null;
 };
 
 export type AskResponse = {
@@ -40,6 +49,17 @@ export type AskResponse = {
   citations: Citation[];
   confidence: number;
   used_chunks: number;
+  cached: boolean;
+};
+
+export type StreamCitations = {
+  used_chunks: number;
+  citations: Array<Citation & { cid: string }>;
+};
+
+export type AskStreamHandlers = {
+  onCitations?: (payload: StreamCitations) => void;
+  onToken?: (text: string) => void;
 };
 
 export type HealthResponse = {